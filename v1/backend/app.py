@@ -4,8 +4,11 @@ Point d'entrée de l'API Backend
 """
 from datetime import datetime
 
+import click
 from flask import Flask, jsonify
 from flask_cors import CORS
+from flask_migrate import Migrate
+from sqlalchemy import inspect, text
 
 # Import de la configuration
 from config import get_config
@@ -17,15 +20,28 @@ from models import (
     WorkoutExercise,
     Exercise,
     ExerciseSet,
-    SyncQueue,
     db
 )
 from routes.exercises import exercises_bp
 from routes.stats import stats_bp
 # Import des routes
 from routes.sync import sync_bp
+from services.bulk_import import IMPORT_CHUNK_SIZE, import_history
+from services.logic import update_user_level, update_user_total_xp
+from services.personal_bests import recompute_personal_bests
+from services.progression import refresh_daily_progress
+from services.refresh_tokens import purge_expired_refresh_tokens
+from services.sync_engine import next_change_seq
+from services.sync_queue import drain_sync_queue, init_sync_worker, requeue_stalled_batches
+from services.user_stats import rebuild_user_stats
 # Import des utilitaires
 from utils.auth import auth_bp
+from utils.database import add_missing_columns, describe_engine, install_sqlite_pragmas
+from utils.passwords import benchmark_logins, get_password_service, init_password_service
+from utils.response_cache import get_response_cache, init_response_cache, invalidate_user_cache
+
+# Migrations Alembic (flask db migrate / upgrade), batch pour SQLite
+migrate = Migrate()
 
 
 def create_app(config_name='development'):
@@ -44,18 +60,29 @@ def create_app(config_name='development'):
 
     # Initialiser les extensions
     db.init_app(app)
+    migrate.init_app(app, db, render_as_batch=True)
+    init_response_cache(app)
+    init_password_service(app)
+    init_sync_worker(app)
     CORS(app, resources={
         r"/api/*": {
             "origins": app.config['CORS_ORIGINS'],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "Prefer"]
         }
     })
 
     # Créer les tables si nécessaire
     with app.app_context():
-        db.create_all()
-        _seed_default_exercises()
+        install_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
+        if app.config['AUTO_CREATE_TABLES']:
+            db.create_all()
+            # Base SQLite d'une version précédente : colonnes ajoutées depuis
+            for column in add_missing_columns(db.engine, db.metadata):
+                print(f'🔧 Colonne ajoutée : {column}')
+        # Schéma à jour seulement (flask db upgrade pas encore passé sinon)
+        if _table_is_current(Exercise.__table__):
+            _seed_default_exercises()
 
     # ═══════════════════════════════════════════════════════════
     # BLUEPRINTS
@@ -66,6 +93,78 @@ def create_app(config_name='development'):
     app.register_blueprint(exercises_bp, url_prefix='/api')
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
 
+    # ═══════════════════════════════════════════════════════════
+    # COMMANDES CLI
+    # ═══════════════════════════════════════════════════════════
+
+    @app.cli.command('rebuild-stats')
+    @click.option('--user', 'user_uuid', default=None, help="UUID d'un seul utilisateur")
+    def rebuild_stats_command(user_uuid):
+        """Recalcule les agrégats UserStats, les records, la progression et l'XP depuis l'historique"""
+        query = User.query
+        if user_uuid:
+            query = query.filter_by(uuid=user_uuid)
+
+        users = []
+        for user in query:
+            rebuild_user_stats(user.id)
+            recompute_personal_bests(user.id)
+            refresh_daily_progress(user.id)
+            update_user_total_xp(user)
+            update_user_level(user)
+            # Nouvelle version des données : les ETags déjà émis expirent
+            next_change_seq(user)
+            users.append(user.uuid)
+
+        db.session.commit()
+        for user_uuid in users:
+            invalidate_user_cache(user_uuid)
+        click.echo(f'✅ Statistiques recalculées pour {len(users)} utilisateur(s)')
+
+    @app.cli.command('import-history')
+    @click.argument('path', type=click.File('r', encoding='utf-8'))
+    @click.option('--user', 'user_uuid', required=True, help="UUID de l'utilisateur")
+    @click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True, help='Éléments par transaction')
+    def import_history_command(path, user_uuid, chunk_size):
+        """Importe un historique NDJSON (un élément de sync par ligne)"""
+        user = User.query.filter_by(uuid=user_uuid).first()
+        if not user:
+            raise click.ClickException('Utilisateur introuvable')
+
+        summary = import_history(user, path, chunk_size)
+        click.echo(f"✅ {summary['synced']} élément(s) importé(s), {summary['errors']} erreur(s)")
+
+    @app.cli.command('drain-sync-queue')
+    @click.option('--requeue', is_flag=True, help='Remet d\'abord en attente les lots restés en cours')
+    def drain_sync_queue_command(requeue):
+        """Applique les push asynchrones en attente (sans worker dans l'API)"""
+        if requeue:
+            click.echo(f'↩️  {requeue_stalled_batches()} élément(s) remis en attente')
+        count = drain_sync_queue()
+        click.echo(f'✅ {count} lot(s) appliqué(s)')
+
+    @app.cli.command('purge-refresh-tokens')
+    def purge_refresh_tokens_command():
+        """Supprime les refresh tokens expirés"""
+        count = purge_expired_refresh_tokens()
+        db.session.commit()
+        click.echo(f'✅ {count} refresh token(s) expiré(s) supprimé(s)')
+
+    @app.cli.command('benchmark-passwords')
+    @click.option('--logins', default=100, show_default=True, help='Vérifications mesurées')
+    def benchmark_passwords_command(logins):
+        """Mesure les connexions par seconde (Argon2) avec les paramètres actuels"""
+        result = benchmark_logins(get_password_service(), logins)
+        click.echo(
+            f"Argon2id t={result['time_cost']} m={result['memory_cost_kib']} KiB p={result['parallelism']}"
+            f" ({result['cores']} cœurs, pool de {result['workers']} threads)"
+        )
+        click.echo(f"  1 thread : {result['single_thread_per_second']} connexions/s")
+        click.echo(
+            f"  pool     : {result['pool_per_second']} connexions/s"
+            f" ({result['pool_per_second_per_core']} par cœur)"
+        )
+
     # ═══════════════════════════════════════════════════════════
     # ROUTES GÉNÉRALES
     # ═══════════════════════════════════════════════════════════
@@ -79,6 +178,35 @@ def create_app(config_name='development'):
             'version': '1.0.0'
         }), 200
 
+    @app.route('/api/health/db', methods=['GET'])
+    def health_db():
+        """
+        État de la base (SELECT 1) ; moteur, pool et PRAGMAs actifs
+        seulement si HEALTH_DIAGNOSTICS est activé
+        """
+        try:
+            db.session.execute(text('SELECT 1'))
+            online = True
+        except Exception:
+            db.session.rollback()
+            online = False
+
+        data = {'status': 'online' if online else 'offline', 'database': online}
+        if online and app.config['HEALTH_DIAGNOSTICS']:
+            data['database'] = describe_engine(db.engine)
+        return jsonify(data), 200 if online else 503
+
+    @app.route('/api/health/cache', methods=['GET'])
+    def health_cache():
+        """
+        État du cache des réponses ; magasin et compteurs hits/misses
+        seulement si HEALTH_DIAGNOSTICS est activé
+        """
+        data = {'status': 'online', 'cache': True}
+        if app.config['HEALTH_DIAGNOSTICS']:
+            data['cache'] = get_response_cache().describe()
+        return jsonify(data), 200
+
     # ═══════════════════════════════════════════════════════════
     # GESTION DES ERREURS
     # ═══════════════════════════════════════════════════════════
@@ -95,6 +223,15 @@ def create_app(config_name='development'):
     return app
 
 
+def _table_is_current(table):
+    """La table existe et a toutes les colonnes du modèle"""
+    inspector = inspect(db.engine)
+    if not inspector.has_table(table.name):
+        return False
+    existing = {column['name'] for column in inspector.get_columns(table.name)}
+    return set(table.columns.keys()) <= existing
+
+
 def _seed_default_exercises():
     """Charge les exercices par défaut dans la base de données"""
     # Vérifier si des exercices existent déjà
@@ -12,20 +12,72 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv()
 
 
+def normalize_database_url(url):
+    """Accepte l'ancien schéma postgres:// (Heroku, Render...) pour SQLAlchemy 2"""
+    if url and url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
 class Config:
     """Configuration de base"""
 
     # Clé secrète pour sessions/JWT
     SECRET_KEY = os.environ['SECRET_KEY']
 
-    # Base de données SQLite (chemin absolu)
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
+    # Base de données : SQLite par défaut (chemin absolu), PostgreSQL via DATABASE_URL
+    SQLALCHEMY_DATABASE_URI = normalize_database_url(os.environ.get('DATABASE_URL')) or \
                               'sqlite:///' + os.path.join(basedir, 'instance', 'fitness.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # create_all() au démarrage ; à désactiver quand le schéma est géré
+    # par les migrations (flask db upgrade)
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', '1') == '1'
+
+    # PRAGMAs SQLite appliqués à chaque connexion (voir utils/database.py)
+    SQLITE_PRAGMAS = {}
+
+    # Cache des réponses de stats (voir utils/response_cache.py) :
+    # memory:// = LRU/TTL par processus, redis://... = partagé entre workers
+    RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL', 'memory://')
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+
+    # Catalogue d'exercices global gardé en mémoire (secondes avant relecture)
+    EXERCISE_CATALOG_TTL = int(os.environ.get('EXERCISE_CATALOG_TTL', 300))
+
+    # Push asynchrone (?async=1) : threads par worker qui vident la file
+    # sync_queue ; 0 = file vidée uniquement par flask drain-sync-queue
+    SYNC_QUEUE_WORKERS = int(os.environ.get('SYNC_QUEUE_WORKERS', 2))
+    # Bail d'un lot réservé : passé ce délai (worker arrêté pendant le lot),
+    # il est remis en attente ; à garder au-dessus du lot le plus long
+    SYNC_QUEUE_LEASE_SECONDS = int(os.environ.get('SYNC_QUEUE_LEASE_SECONDS', 300))
+
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or SECRET_KEY
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=4)  # Token valide 4 heures
+    # Token d'accès courte durée, renouvelé par /api/auth/refresh ; le
+    # refresh token glisse (rotation) et expire après 30 jours sans usage
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
+
+    # Argon2id : profil RFC 9106 "low memory" par défaut (t=3, 64 MiB, p=4)
+    ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', 3))
+    ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', 65536))  # KiB
+    ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', 4))
+
+    # Pool de hachage : threads par worker et calculs en cours ou en attente
+    # au-delà desquels /login et /register répondent 503 (Retry-After)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+
+    # Utilisateurs authentifiés gardés en mémoire (délai max de propagation
+    # d'une révocation aux autres workers)
+    AUTH_CACHE_TTL = int(os.environ.get('AUTH_CACHE_TTL', 60))
+    AUTH_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_CACHE_MAX_ENTRIES', 10000))
+
+    # /api/health/db et /api/health/cache (sans authentification) : détail
+    # du pool, des PRAGMAs et des compteurs du cache, sinon simple état
+    HEALTH_DIAGNOSTICS = os.environ.get('HEALTH_DIAGNOSTICS', '0') == '1'
 
     # CORS (Cross-Origin Resource Sharing)
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
@@ -47,6 +99,7 @@ class DevelopmentConfig(Config):
 
     # Logs détaillés
     SQLALCHEMY_ECHO = True
+    HEALTH_DIAGNOSTICS = True
 
 
 class ProductionConfig(Config):
@@ -60,6 +113,26 @@ class ProductionConfig(Config):
     # Logs minimaux
     SQLALCHEMY_ECHO = False
 
+    # SQLite : journal WAL (lectures concurrentes pendant un push), attente
+    # sur verrou au lieu de "database is locked", cache et mmap en mémoire
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'foreign_keys': 'ON',
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_KB', 20000)),  # Négatif = en KiB
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    }
+
+    # Pool de connexions
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+    }
+
     # Restreindre CORS en production
     # CORS_ORIGINS = ['https://votre-domaine.com']
 
@@ -69,8 +142,17 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
 
-    # Base de données en mémoire pour tests
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # Hachage rapide : le coût réel est mesuré par flask benchmark-passwords
+    ARGON2_TIME_COST = 1
+    ARGON2_MEMORY_COST = 8192
+    ARGON2_PARALLELISM = 1
+
+    # Pas de thread sur la base en mémoire : les tests vident la file eux-mêmes
+    SYNC_QUEUE_WORKERS = 0
+
+    # Base de données en mémoire pour tests (ou PostgreSQL via TEST_DATABASE_URL)
+    SQLALCHEMY_DATABASE_URI = normalize_database_url(os.environ.get('TEST_DATABASE_URL')) or 'sqlite:///:memory:'
+    AUTO_CREATE_TABLES = True
 
 
 # Dictionnaire des configurations
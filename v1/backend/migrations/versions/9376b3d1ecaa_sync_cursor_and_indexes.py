@@ -0,0 +1,117 @@
+"""sync cursor and indexes
+
+Ajouts au schéma de base : curseur de sync (change_seq) et suppressions
+(sync_tombstones), agrégat UserStats par utilisateur, index composites.
+
+Revision ID: 9376b3d1ecaa
+Revises: 5b0d4c1e2f3a
+Create Date: 2026-10-18 02:24:20.314127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9376b3d1ecaa'
+down_revision = '5b0d4c1e2f3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Lignes existantes : change_seq à 0, renvoyées par la restauration complète
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('exercises', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_exercises_change_seq'), ['change_seq'], unique=False)
+        batch_op.create_index('ix_exercises_user_seq', ['user_id', 'change_seq'], unique=False)
+
+    op.create_table('sync_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(length=50), nullable=False),
+    sa.Column('entity_uuid', sa.String(length=36), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('sync_tombstones', schema=None) as batch_op:
+        batch_op.create_index('ix_sync_tombstones_user_seq', ['user_id', 'change_seq'], unique=False)
+
+    with op.batch_alter_table('workouts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_workouts_change_seq'), ['change_seq'], unique=False)
+        batch_op.create_index('ix_workouts_user_completed_date', ['user_id', 'is_completed', 'workout_date'], unique=False)
+        batch_op.create_index('ix_workouts_user_seq', ['user_id', 'change_seq'], unique=False)
+
+    # Une seule ligne d'agrégat par utilisateur : garder la plus récente
+    # (flask rebuild-stats la recalcule depuis l'historique)
+    op.execute(
+        'DELETE FROM user_stats WHERE id NOT IN '
+        '(SELECT MAX(id) FROM user_stats GROUP BY user_id)'
+    )
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('workouts_this_month', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('month_start', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('streak_days', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('streak_last_date', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('best_1rm_exercise_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_user_stats_best_1rm_exercise_id', 'exercises', ['best_1rm_exercise_id'], ['id'])
+        batch_op.create_unique_constraint('uq_user_stats_user_id', ['user_id'])
+
+    with op.batch_alter_table('workout_exercises', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_workout_exercises_change_seq'), ['change_seq'], unique=False)
+        batch_op.create_index('ix_workout_exercises_exercise', ['exercise_id', 'workout_id'], unique=False)
+        batch_op.create_index('ix_workout_exercises_workout', ['workout_id', 'order_index'], unique=False)
+
+    with op.batch_alter_table('exercise_sets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_exercise_sets_change_seq'), ['change_seq'], unique=False)
+        batch_op.create_index('ix_exercise_sets_pr', ['workout_exercise_id'], unique=False, sqlite_where=sa.text('is_pr = 1'), postgresql_where=sa.text('is_pr'))
+        batch_op.create_index('ix_exercise_sets_workout_exercise', ['workout_exercise_id', 'set_number'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('exercise_sets', schema=None) as batch_op:
+        batch_op.drop_index('ix_exercise_sets_workout_exercise')
+        batch_op.drop_index('ix_exercise_sets_pr', sqlite_where=sa.text('is_pr = 1'), postgresql_where=sa.text('is_pr'))
+        batch_op.drop_index(batch_op.f('ix_exercise_sets_change_seq'))
+        batch_op.drop_column('change_seq')
+
+    with op.batch_alter_table('workout_exercises', schema=None) as batch_op:
+        batch_op.drop_index('ix_workout_exercises_workout')
+        batch_op.drop_index('ix_workout_exercises_exercise')
+        batch_op.drop_index(batch_op.f('ix_workout_exercises_change_seq'))
+        batch_op.drop_column('change_seq')
+
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_user_stats_user_id', type_='unique')
+        batch_op.drop_constraint('fk_user_stats_best_1rm_exercise_id', type_='foreignkey')
+        batch_op.drop_column('best_1rm_exercise_id')
+        batch_op.drop_column('streak_last_date')
+        batch_op.drop_column('streak_days')
+        batch_op.drop_column('month_start')
+        batch_op.drop_column('workouts_this_month')
+
+    with op.batch_alter_table('workouts', schema=None) as batch_op:
+        batch_op.drop_index('ix_workouts_user_seq')
+        batch_op.drop_index('ix_workouts_user_completed_date')
+        batch_op.drop_index(batch_op.f('ix_workouts_change_seq'))
+        batch_op.drop_column('change_seq')
+
+    with op.batch_alter_table('sync_tombstones', schema=None) as batch_op:
+        batch_op.drop_index('ix_sync_tombstones_user_seq')
+
+    op.drop_table('sync_tombstones')
+    with op.batch_alter_table('exercises', schema=None) as batch_op:
+        batch_op.drop_index('ix_exercises_user_seq')
+        batch_op.drop_index(batch_op.f('ix_exercises_change_seq'))
+        batch_op.drop_column('change_seq')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('change_seq')
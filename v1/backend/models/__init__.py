@@ -11,3 +11,7 @@ from .workoutexercise import WorkoutExercise
 from .exercise import Exercise
 from .exerciseset import ExerciseSet
 from .sync import SyncQueue
+from .tombstone import SyncTombstone
+from .personal_best import PersonalBest
+from .progress import ExerciseDailyProgress
+from .refresh_token import RefreshToken
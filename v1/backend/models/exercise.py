@@ -25,9 +25,15 @@ class Exercise(db.Model):
 
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    change_seq = db.Column(db.BigInteger, default=0, nullable=False, index=True)  # Curseur de sync (User.change_seq)
 
     # Relations
     workout_exercises = db.relationship('WorkoutExercise', back_populates='exercise_info')
 
+    __table_args__ = (
+        # Catalogue d'un utilisateur et pull incrémental de ses exercices
+        db.Index('ix_exercises_user_seq', 'user_id', 'change_seq'),
+    )
+
     def __repr__(self):
         return f'<Exercise {self.name}>'
@@ -26,9 +26,19 @@ class ExerciseSet(db.Model):
     rest_seconds = db.Column(db.Integer)  # Temps de repos après cette série
 
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    change_seq = db.Column(db.BigInteger, default=0, nullable=False, index=True)  # Curseur de sync (User.change_seq)
 
     # Relations
     workout_exercise = db.relationship('WorkoutExercise', back_populates='sets')
+
+    __table_args__ = (
+        # Séries d'un exercice de séance (pull, agrégats, cascade)
+        db.Index('ix_exercise_sets_workout_exercise', 'workout_exercise_id', 'set_number'),
+        # Index partiel : seules les séries record (personal-records)
+        db.Index('ix_exercise_sets_pr', 'workout_exercise_id',
+                 sqlite_where=is_pr == True, postgresql_where=db.text('is_pr')),
+    )
+
     def __repr__(self):
         return f'<Set {self.set_number}: {self.weight_kg}kg × {self.reps}>'
 
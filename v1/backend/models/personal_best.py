@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+from . import db
+
+
+class PersonalBest(db.Model):
+    """Records d'un utilisateur sur un exercice, maintenus à chaque push"""
+    __tablename__ = 'personal_bests'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), nullable=False)
+
+    # Meilleur 1RM estimé et série qui l'a établi
+    best_1rm = db.Column(db.Float)
+    best_1rm_set_id = db.Column(db.Integer, db.ForeignKey('exercise_sets.id', ondelete='SET NULL'), nullable=True)
+
+    # Charge la plus lourde et meilleur volume sur une série (hors échauffement)
+    heaviest_weight = db.Column(db.Float)
+    best_volume = db.Column(db.Float)
+
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    # Relations
+    exercise = db.relationship('Exercise')
+    best_1rm_set = db.relationship('ExerciseSet')
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'exercise_id', name='uq_personal_bests_user_exercise'),
+    )
+
+    def __repr__(self):
+        return f'<PersonalBest user:{self.user_id} exercise:{self.exercise_id} 1RM:{self.best_1rm}>'
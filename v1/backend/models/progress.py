@@ -0,0 +1,27 @@
+from . import db
+
+
+class ExerciseDailyProgress(db.Model):
+    """Cumul journalier d'un exercice (séances complétées, hors échauffement), maintenu à chaque push"""
+    __tablename__ = 'exercise_daily_progress'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    total_sets = db.Column(db.Integer, nullable=False, default=0)
+    total_volume = db.Column(db.Float, nullable=False, default=0)
+    best_1rm = db.Column(db.Float)
+    top_weight = db.Column(db.Float)
+
+    __table_args__ = (
+        # Série d'un exercice par date (graphiques), unicité du cumul
+        db.UniqueConstraint('user_id', 'exercise_id', 'day', name='uq_exercise_daily_progress'),
+        # Rafraîchissement des jours touchés par un push
+        db.Index('ix_exercise_daily_progress_user_day', 'user_id', 'day'),
+    )
+
+    def __repr__(self):
+        return f'<ExerciseDailyProgress user:{self.user_id} exercise:{self.exercise_id} {self.day}>'
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from . import db
+
+
+class RefreshToken(db.Model):
+    """
+    Refresh token d'une session (seul son HMAC est stocké)
+    Chaque rafraîchissement révoque le token présenté et en émet un
+    nouveau dans la même famille ; un token révoqué présenté à nouveau
+    révoque toute la famille (token volé).
+    """
+    __tablename__ = 'refresh_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)  # HMAC-SHA256 hexadécimal
+    family_id = db.Column(db.String(36), nullable=False, index=True)  # Session d'origine (login)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=True)
+
+    # Relations
+    user = db.relationship('User')
+
+    def __repr__(self):
+        return f'<RefreshToken user:{self.user_id} family:{self.family_id}>'
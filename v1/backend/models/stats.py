@@ -7,26 +7,36 @@ class UserStats(db.Model):
     __tablename__ = 'user_stats'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    stat_date = db.Column(db.Date, nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+    stat_date = db.Column(db.Date, nullable=False, index=True)  # Dernière mise à jour de l'agrégat
 
     # Statistiques RPG
     strength_stat = db.Column(db.Integer, default=0)
     endurance_stat = db.Column(db.Integer, default=0)
 
-    # Statistiques d'entraînement
+    # Statistiques d'entraînement (séances complétées)
     total_workouts = db.Column(db.Integer, default=0)
     total_volume = db.Column(db.Float, default=0)
     total_sets = db.Column(db.Integer, default=0)
 
+    # Séances du mois en cours (month_start = 1er jour du mois compté)
+    workouts_this_month = db.Column(db.Integer, default=0)
+    month_start = db.Column(db.Date)
+
+    # Série de jours consécutifs avec séance, terminée le streak_last_date
+    streak_days = db.Column(db.Integer, default=0)
+    streak_last_date = db.Column(db.Date)
+
     # Records personnels
     heaviest_lift = db.Column(db.Float)
     best_1rm = db.Column(db.Float)
+    best_1rm_exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), nullable=True)
 
     calculated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
     # Relations
     user = db.relationship('User', back_populates='stats')
+    best_1rm_exercise = db.relationship('Exercise')
 
     def __repr__(self):
         return f'<UserStats {self.stat_date} - STR:{self.strength_stat} END:{self.endurance_stat}>'
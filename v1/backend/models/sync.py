@@ -1,18 +1,18 @@
-"""
-Modèles de base de données pour FitnessRPG
-Architecture: Stockage serveur pour synchronisation et backup
-"""
-from datetime import datetime, timezone
-from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
 
-db = SQLAlchemy()
+from . import db
 
 
 class SyncQueue(db.Model):
-    """File d'attente de synchronisation (logs des syncs)"""
+    """
+    File des push asynchrones : un élément de sync par ligne, tel que reçu
+    Les lignes d'un même push partagent un batch_id et sont appliquées
+    ensemble par le worker (services/sync_queue.py).
+    """
     __tablename__ = 'sync_queue'
 
     id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.String(36), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
     # Données de synchronisation
@@ -21,12 +21,18 @@ class SyncQueue(db.Model):
     action = db.Column(db.String(20), nullable=False)  # create, update, delete
 
     # Métadonnées
-    sync_status = db.Column(db.String(20), default='pending')  # pending, synced, failed
-    payload = db.Column(db.Text)  # JSON des données
+    sync_status = db.Column(db.String(20), nullable=False, default='pending')  # pending, processing, synced, failed
+    payload = db.Column(db.Text)  # JSON de l'élément complet
     error_message = db.Column(db.Text)
 
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime)  # Début du bail du worker (processing)
     synced_at = db.Column(db.DateTime)
 
+    __table_args__ = (
+        db.Index('ix_sync_queue_batch', 'batch_id'),
+        db.Index('ix_sync_queue_status_id', 'sync_status', 'id'),
+    )
+
     def __repr__(self):
-        return f'<SyncQueue {self.entity_type} - {self.action}>'
\ No newline at end of file
+        return f'<SyncQueue {self.batch_id} {self.entity_type} - {self.action}>'
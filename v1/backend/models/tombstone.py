@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+
+from . import db
+
+
+class SyncTombstone(db.Model):
+    """Trace d'une suppression, renvoyée par le pull incrémental"""
+    __tablename__ = 'sync_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    entity_type = db.Column(db.String(50), nullable=False)  # workout, workout_exercise, exercise_set, exercise
+    entity_uuid = db.Column(db.String(36), nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+
+    deleted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.Index('ix_sync_tombstones_user_seq', 'user_id', 'change_seq'),
+    )
+
+    def __repr__(self):
+        return f'<SyncTombstone {self.entity_type} {self.entity_uuid} @{self.change_seq}>'
@@ -1,12 +1,8 @@
 from datetime import datetime, timezone
 
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from utils.passwords import hash_password, verify_password
 from . import db
 
-# On prépare notre outil une seule fois pour tout le fichier
-ph = PasswordHasher()
-
 
 class User(db.Model):
 
@@ -25,6 +21,8 @@ class User(db.Model):
     # Métadonnées
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     last_sync = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    change_seq = db.Column(db.BigInteger, default=0, nullable=False)  # Incrémenté à chaque push
+    token_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Incrémenté pour révoquer les tokens
 
     # Relations
     stats = db.relationship('UserStats', back_populates='user', uselist=False)
@@ -35,11 +33,8 @@ class User(db.Model):
 
     def set_password(self, password):
         """Hache le mot de passe et l'enregistre dans l'objet"""
-        self.password_hash = ph.hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         """Vérifie si le mot de passe fourni correspond au hash"""
-        try:
-            return ph.verify(self.password_hash, password)
-        except VerifyMismatchError:
-            return False
+        return verify_password(self.password_hash, password)
@@ -25,9 +25,18 @@ class Workout(db.Model):
     is_completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    change_seq = db.Column(db.BigInteger, default=0, nullable=False, index=True)  # Curseur de sync (User.change_seq)
 
     # Relations
     user = db.relationship('User', back_populates='workouts')
     workout_exercises = db.relationship('WorkoutExercise', back_populates='workout', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # Séances complétées par date (dashboard, série, progression, coach)
+        db.Index('ix_workouts_user_completed_date', 'user_id', 'is_completed', 'workout_date'),
+        # Pull incrémental (change_seq > curseur)
+        db.Index('ix_workouts_user_seq', 'user_id', 'change_seq'),
+    )
+
     def __repr__(self):
         return f'<Workout {self.name} - {self.workout_date.date()}>'
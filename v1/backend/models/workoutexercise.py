@@ -23,11 +23,19 @@ class WorkoutExercise(db.Model):
     # Métadonnées
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    change_seq = db.Column(db.BigInteger, default=0, nullable=False, index=True)  # Curseur de sync (User.change_seq)
 
     # Relations
     workout = db.relationship('Workout', back_populates='workout_exercises')
     exercise_info = db.relationship('Exercise', back_populates='workout_exercises')
     sets = db.relationship('ExerciseSet', back_populates='workout_exercise', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # Graphe d'une séance (pull, cascade des suppressions)
+        db.Index('ix_workout_exercises_workout', 'workout_id', 'order_index'),
+        # Progression d'un exercice
+        db.Index('ix_workout_exercises_exercise', 'exercise_id', 'workout_id'),
+    )
+
     def __repr__(self):
         return f'<WorkoutExercise {self.exercise_info.name} - {self.total_sets} sets>'
\ No newline at end of file
@@ -1,27 +1,36 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, make_response, request
 
-from models import exercise
+from services.exercise_catalog import (
+    catalog_version, get_custom_exercises, get_global_catalog, render_catalog
+)
+from utils.auth import optional_token
 
 exercises_bp = Blueprint('exercises', __name__)
 
+# Catalogue global seul : partageable, relu au plus toutes les 5 minutes
+PUBLIC_CACHE_CONTROL = 'public, max-age=300'
+
 
 @exercises_bp.route('/exercises', methods=['GET'])
-def get_exercises():
-    exercises = Exercise.query.filter_by(is_custom=False, is_archived=False)
-
-    exercises_data = [
-        {
-            'uuid': e.uuid,
-            'name': e.name,
-            'category': e.category,
-            'muscle_group': e.muscle_group,
-            'stat_type': e.stat_type,
-            'xp_multiplier': e.xp_multiplier
-        }
-        for e in exercises
-    ]
-    return jsonify({
-        'success': True,
-        'exercises': exercises_data,
-        'total': len(exercises_data)
-    }), 200
+@optional_token
+def get_exercises(current_user):
+    """
+    Catalogue d'exercices : globaux, plus ceux de l'utilisateur s'il est connecté
+    ?since_version=<version> : liste vide si le client a déjà cette version
+    """
+    parts = [get_global_catalog()]
+    if current_user:
+        parts.append(get_custom_exercises(current_user.uuid))
+
+    version = catalog_version(parts)
+
+    if request.if_none_match.contains_weak(version):
+        response = make_response('', 304)
+    else:
+        response = make_response(render_catalog(parts, request.args.get('since_version')), 200)
+        response.mimetype = 'application/json'
+
+    response.set_etag(version)
+    response.headers['Cache-Control'] = 'private, no-cache' if current_user else PUBLIC_CACHE_CONTROL
+    response.vary.add('Authorization')
+    return response
@@ -3,10 +3,15 @@ FitnessRPG - Routes de Statistiques
 Calculs lourds côté serveur pour analytics avancés
 """
 from flask import Blueprint, request, jsonify
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from sqlalchemy import func, desc
-from models import db, User, Workout, WorkoutExercise, ExerciseSet, exercise
+from sqlalchemy.orm import selectinload
+from models import db, User, Workout, WorkoutExercise, ExerciseSet, Exercise, PersonalBest
+from services.progression import BUCKETS, get_progression_series
+from services.user_stats import current_streak, get_user_stats, serialize_best_1rm
 from utils.auth import token_required
+from utils.http_cache import etag_cached
+from utils.response_cache import cached_response
 from utils.calculations import (
     calculate_strength_stat, calculate_endurance_stat,
     calculate_level, suggest_progression, should_deload
@@ -14,6 +19,10 @@ from utils.calculations import (
 
 stats_bp = Blueprint('stats', __name__, url_prefix='/api/stats')
 
+# Points de progression par page (défaut, maximum)
+PROGRESSION_DEFAULT_LIMIT = 365
+PROGRESSION_MAX_LIMIT = 1000
+
 
 # ═══════════════════════════════════════════════════════════
 # DASHBOARD - Statistiques générales
@@ -21,55 +30,22 @@ stats_bp = Blueprint('stats', __name__, url_prefix='/api/stats')
 
 @stats_bp.route('/dashboard', methods=['GET'])
 @token_required
+@etag_cached(daily=True)
+@cached_response(daily=True)
 def get_dashboard(current_user):
     """Retourne les stats principales pour le dashboard"""
-    user = User.query.filter_by(uuid=current_user['uuid']).first()
+    user = db.session.get(User, current_user.id)
     if not user:
         return jsonify({'error': 'Utilisateur introuvable'}), 404
 
     # Calculer le niveau
     level_data = calculate_level(user.total_xp)
 
-    # Total des séances
-    total_workouts = Workout.query.filter_by(user_id=user.id, is_completed=True).count()
+    # Agrégats maintenus à chaque push (une seule ligne lue)
+    stats = get_user_stats(user.id)
 
-    # Volume total soulevé (toutes séances)
-    total_volume = db.session.query(func.sum(Workout.total_volume)).filter_by(
-        user_id=user.id,
-        is_completed=True
-    ).scalar() or 0
-
-    # Séances ce mois-ci
-    start_of_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    workouts_this_month = Workout.query.filter(
-        Workout.user_id == user.id,
-        Workout.is_completed == True,
-        Workout.workout_date >= start_of_month
-    ).count()
-
-    # Meilleur 1RM toutes séances
-    best_1rm_record = db.session.query(
-        ExerciseSet.estimated_1rm,
-        Exercise.name
-    ).join(
-        WorkoutExercise, ExerciseSet.workout_exercise_id == WorkoutExercise.id
-    ).join(
-        Exercise, WorkoutExercise.exercise_id == Exercise.id
-    ).join(
-        Workout, WorkoutExercise.workout_id == Workout.id
-    ).filter(
-        Workout.user_id == user.id
-    ).order_by(desc(ExerciseSet.estimated_1rm)).first()
-
-    best_1rm = None
-    if best_1rm_record:
-        best_1rm = {
-            'value': round(best_1rm_record[0], 2),
-            'exercise': best_1rm_record[1]
-        }
-
-    # Série de séances (streak)
-    streak = _calculate_workout_streak(user.id)
+    # Série de séances (streak), maintenue avec les agrégats
+    streak = current_streak(stats)
 
     return jsonify({
         'success': True,
@@ -82,10 +58,10 @@ def get_dashboard(current_user):
             'progress': round(level_data['progress'], 1)
         },
         'stats': {
-            'total_workouts': total_workouts,
-            'total_volume_kg': round(total_volume, 2),
-            'workouts_this_month': workouts_this_month,
-            'best_1rm': best_1rm,
+            'total_workouts': stats.total_workouts,
+            'total_volume_kg': round(stats.total_volume or 0, 2),
+            'workouts_this_month': stats.workouts_this_month,
+            'best_1rm': serialize_best_1rm(stats),
             'current_streak': streak
         }
     }), 200
@@ -97,57 +73,47 @@ def get_dashboard(current_user):
 
 @stats_bp.route('/progression/<exercise_uuid>', methods=['GET'])
 @token_required
+@etag_cached()
+@cached_response()
 def get_exercise_progression(current_user, exercise_uuid):
-    """Retourne l'historique de progression pour un exercice"""
-    user = User.query.filter_by(uuid=current_user['uuid']).first()
-    if not user:
-        return jsonify({'error': 'Utilisateur introuvable'}), 404
-
+    """
+    Retourne la progression d'un exercice, lue dans les cumuls journaliers
+    Paramètres : from / to (AAAA-MM-JJ, inclus), bucket=day|week|month,
+    limit (points par page) et cursor (next_cursor de la page précédente)
+    """
     exercise = Exercise.query.filter_by(uuid=exercise_uuid).first()
     if not exercise:
         return jsonify({'error': 'Exercice introuvable'}), 404
 
-    # Récupérer toutes les séances avec cet exercice
-    workout_exercises = db.session.query(WorkoutExercise).join(
-        Workout, WorkoutExercise.workout_id == Workout.id
-    ).filter(
-        Workout.user_id == user.id,
-        WorkoutExercise.exercise_id == exercise.id,
-        Workout.is_completed == True
-    ).order_by(Workout.workout_date.asc()).all()
-
-    progression_data = []
-
-    for we in workout_exercises:
-        sets_data = [
-            {
-                'set_number': s.set_number,
-                'weight_kg': s.weight_kg,
-                'reps': s.reps,
-                'volume': s.volume,
-                'estimated_1rm': s.estimated_1rm,
-                'is_pr': s.is_pr
-            }
-            for s in we.sets if not s.is_warmup
-        ]
-
-        progression_data.append({
-            'date': we.workout.workout_date.isoformat(),
-            'total_volume': we.total_volume,
-            'best_1rm': we.estimated_1rm,
-            'total_sets': we.total_sets,
-            'sets': sets_data
-        })
-
-    # Calculer les tendances
-    if len(progression_data) >= 2:
-        first_volume = progression_data[0]['total_volume']
-        last_volume = progression_data[-1]['total_volume']
-        volume_improvement = ((last_volume - first_volume) / first_volume * 100) if first_volume > 0 else 0
-
-        first_1rm = progression_data[0]['best_1rm']
-        last_1rm = progression_data[-1]['best_1rm']
-        strength_improvement = ((last_1rm - first_1rm) / first_1rm * 100) if first_1rm > 0 else 0
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return jsonify({'error': 'bucket invalide (day, week ou month)'}), 400
+
+    try:
+        start = _date_arg('from')
+        end = _date_arg('to')
+        cursor = _date_arg('cursor')
+        limit = int(request.args.get('limit', PROGRESSION_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'Paramètre invalide'}), 400
+
+    limit = max(1, min(limit, PROGRESSION_MAX_LIMIT))
+
+    series = get_progression_series(
+        current_user.id, exercise.id, bucket,
+        start=start, end=end, cursor=cursor, limit=limit
+    )
+    points = series['points']
+
+    # Tendances entre le premier et le dernier point de la page
+    if len(points) >= 2:
+        first_volume = points[0]['total_volume']
+        last_volume = points[-1]['total_volume']
+        volume_improvement = ((last_volume - first_volume) / first_volume * 100) if first_volume else 0
+
+        first_1rm = points[0]['best_1rm']
+        last_1rm = points[-1]['best_1rm']
+        strength_improvement = ((last_1rm - first_1rm) / first_1rm * 100) if first_1rm and last_1rm is not None else 0
     else:
         volume_improvement = 0
         strength_improvement = 0
@@ -159,8 +125,10 @@ def get_exercise_progression(current_user, exercise_uuid):
             'name': exercise.name,
             'category': exercise.category
         },
-        'total_sessions': len(progression_data),
-        'progression': progression_data,
+        'bucket': bucket,
+        'total_sessions': sum(point['sessions'] for point in points),
+        'progression': points,
+        'next_cursor': series['next_cursor'],
         'trends': {
             'volume_improvement_percent': round(volume_improvement, 1),
             'strength_improvement_percent': round(strength_improvement, 1)
@@ -168,22 +136,28 @@ def get_exercise_progression(current_user, exercise_uuid):
     }), 200
 
 
+def _date_arg(name):
+    """Paramètre de date AAAA-MM-JJ optionnel (ValueError si mal formé)"""
+    value = request.args.get(name)
+    return date.fromisoformat(value) if value else None
+
+
 # ═══════════════════════════════════════════════════════════
 # SMART COACH - Recommandations
 # ═══════════════════════════════════════════════════════════
 
 @stats_bp.route('/recommendations', methods=['GET'])
 @token_required
+@etag_cached(daily=True)
+@cached_response(daily=True)
 def get_recommendations(current_user):
     """Retourne des recommandations basées sur l'historique"""
-    user = User.query.filter_by(uuid=current_user['uuid']).first()
-    if not user:
-        return jsonify({'error': 'Utilisateur introuvable'}), 404
-
     # Récupérer les 5 dernières séances
     recent_workouts = Workout.query.filter_by(
-        user_id=user.id,
+        user_id=current_user.id,
         is_completed=True
+    ).options(
+        selectinload(Workout.workout_exercises)
     ).order_by(desc(Workout.workout_date)).limit(5).all()
 
     recommendations = []
@@ -220,7 +194,7 @@ def get_recommendations(current_user):
     # Suggestions d'exercices peu pratiqués
     # (exercices non faits depuis longtemps)
     all_exercises = Exercise.query.filter(
-        (Exercise.user_id == user.id) | (Exercise.user_id == None)
+        (Exercise.user_id == current_user.id) | (Exercise.user_id == None)
     ).all()
 
     recent_exercise_ids = set()
@@ -252,37 +226,42 @@ def get_recommendations(current_user):
 
 @stats_bp.route('/personal-records', methods=['GET'])
 @token_required
+@etag_cached()
+@cached_response()
 def get_personal_records(current_user):
     """Retourne tous les records personnels de l'utilisateur"""
-    user = User.query.filter_by(uuid=current_user['uuid']).first()
-    if not user:
-        return jsonify({'error': 'Utilisateur introuvable'}), 404
-
-    # Récupérer tous les PRs
+    # Un record par exercice (table maintenue à chaque push) ; la série
+    # du meilleur 1RM et sa séance sont jointes par clé primaire
     prs = db.session.query(
+        PersonalBest,
+        Exercise,
         ExerciseSet,
-        Exercise.name,
         Workout.workout_date
     ).join(
+        Exercise, PersonalBest.exercise_id == Exercise.id
+    ).outerjoin(
+        ExerciseSet, PersonalBest.best_1rm_set_id == ExerciseSet.id
+    ).outerjoin(
         WorkoutExercise, ExerciseSet.workout_exercise_id == WorkoutExercise.id
-    ).join(
-        Exercise, WorkoutExercise.exercise_id == Exercise.id
-    ).join(
+    ).outerjoin(
         Workout, WorkoutExercise.workout_id == Workout.id
     ).filter(
-        Workout.user_id == user.id,
-        ExerciseSet.is_pr == True
+        PersonalBest.user_id == current_user.id,
+        PersonalBest.best_1rm.isnot(None)
     ).order_by(desc(Workout.workout_date)).all()
 
     pr_data = [
         {
-            'exercise': pr[1],
-            'weight_kg': pr[0].weight_kg,
-            'reps': pr[0].reps,
-            'estimated_1rm': round(pr[0].estimated_1rm, 2),
-            'date': pr[2].isoformat()
+            'exercise': exercise.name,
+            'exercise_uuid': exercise.uuid,
+            'weight_kg': best_set.weight_kg if best_set else None,
+            'reps': best_set.reps if best_set else None,
+            'estimated_1rm': round(pb.best_1rm, 2),
+            'date': workout_date.isoformat() if workout_date else None,
+            'heaviest_weight': pb.heaviest_weight,
+            'best_volume': pb.best_volume
         }
-        for pr in prs
+        for pb, exercise, best_set, workout_date in prs
     ]
 
     return jsonify({
@@ -291,33 +270,3 @@ def get_personal_records(current_user):
         'records': pr_data
     }), 200
 
-
-# ═══════════════════════════════════════════════════════════
-# HELPER FUNCTIONS
-# ═══════════════════════════════════════════════════════════
-
-def _calculate_workout_streak(user_id):
-    """Calcule le nombre de jours consécutifs avec séance"""
-    workouts = Workout.query.filter_by(
-        user_id=user_id,
-        is_completed=True
-    ).order_by(desc(Workout.workout_date)).all()
-
-    if not workouts:
-        return 0
-
-    streak = 0
-    current_date = datetime.now().date()
-
-    # Vérifier les jours consécutifs
-    for workout in workouts:
-        workout_date = workout.workout_date.date()
-        days_diff = (current_date - workout_date).days
-
-        if days_diff <= 1:  # Aujourd'hui ou hier
-            streak += 1
-            current_date = workout_date
-        else:
-            break
-
-    return streak
\ No newline at end of file
@@ -2,17 +2,24 @@
 FitnessRPG - Routes de Synchronisation
 API pour sync Local-First (IndexedDB ↔ SQLite)
 """
-from flask import Blueprint, request, jsonify
-from datetime import datetime
-from models import db, User, Workout, WorkoutExercise, ExerciseSet, Exercise, SyncQueue
+import json
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context, url_for
+from sqlalchemy import select
+from models import db, User, Workout, WorkoutExercise, ExerciseSet, Exercise, SyncTombstone
+from services.logic import load_user_workouts, serialize_workout_for_sync, with_workout_graph
+from services.sync_queue import apply_push, enqueue_push, get_batch_status, get_sync_worker
 from utils.auth import token_required
-from utils.calculations import (
-    calculate_1rm, calculate_volume, calculate_xp,
-    aggregate_workout_stats, calculate_level
-)
+from utils.http_cache import etag_cached
+from utils.response_cache import invalidate_user_cache
 
 sync_bp = Blueprint('sync', __name__, url_prefix='/api/sync')
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Séances chargées par paquet en mode streaming
+STREAM_BATCH_SIZE = 100
+
 
 # ═══════════════════════════════════════════════════════════
 # SYNC PRINCIPAL - Upload des données locales vers serveur
@@ -24,6 +31,8 @@ def sync_push(current_user):
     """
     Reçoit les données du client et les enregistre sur le serveur
     Body: { items: [{entity_type, entity_uuid, action, data}, ...] }
+    ?async=1 ou Prefer: respond-async : 202 immédiat avec un batch_id,
+    le lot est appliqué en arrière-plan (état : GET /push/<batch_id>)
     """
     data = request.get_json()
 
@@ -31,52 +40,38 @@ def sync_push(current_user):
         return jsonify({'error': 'Données manquantes'}), 400
 
     items = data['items']
-    results = []
-    errors = []
+
+    # Mode asynchrone : lot mis en file, appliqué par le worker
+    if _wants_async():
+        if not isinstance(items, list):
+            return jsonify({'error': 'items doit être une liste'}), 400
+
+        batch_id = enqueue_push(current_user.id, items)
+        get_sync_worker().notify()
+
+        status_url = url_for('sync.sync_push_status', batch_id=batch_id)
+        return jsonify({
+            'success': True,
+            'status': 'pending',
+            'batch_id': batch_id,
+            'queued': len(items),
+            'status_url': status_url
+        }), 202, {'Location': status_url}
 
     # Récupérer l'utilisateur
-    user = User.query.filter_by(uuid=current_user['uuid']).first()
+    user = db.session.get(User, current_user.id)
     if not user:
         return jsonify({'error': 'Utilisateur introuvable'}), 404
 
-    # Traiter chaque élément de la queue
-    for item in items:
-        try:
-            entity_type = item.get('entity_type')
-            entity_uuid = item.get('entity_uuid')
-            action = item.get('action')  # create, update, delete
-            entity_data = item.get('data', {})
-
-            if entity_type == 'workout':
-                result = _sync_workout(user.id, entity_uuid, action, entity_data)
-            elif entity_type == 'workout_exercise':
-                result = _sync_workout_exercise(user.id, entity_uuid, action, entity_data)
-            elif entity_type == 'exercise_set':
-                result = _sync_exercise_set(user.id, entity_uuid, action, entity_data)
-            elif entity_type == 'exercise':
-                result = _sync_exercise(user.id, entity_uuid, action, entity_data)
-            else:
-                result = {'status': 'skipped', 'reason': f'Type inconnu: {entity_type}'}
-
-            results.append({
-                'entity_uuid': entity_uuid,
-                'status': result.get('status', 'success')
-            })
-
-        except Exception as e:
-            errors.append({
-                'entity_uuid': item.get('entity_uuid'),
-                'error': str(e)
-            })
-
-    # Mettre à jour la date de dernière sync
-    user.last_sync = datetime.utcnow()
-
-    # Recalculer l'XP total et le niveau
-    _update_user_stats(user)
+    # Appliquer tout le lot (requêtes IN groupées, écritures groupées),
+    # puis les agrégats du dashboard, l'XP et la date de dernière sync
+    results, errors = apply_push(user, items)
 
     db.session.commit()
 
+    # Les réponses de stats en cache ne reflètent plus les données
+    invalidate_user_cache(user.uuid)
+
     return jsonify({
         'success': True,
         'synced': len(results),
@@ -91,219 +86,245 @@ def sync_push(current_user):
     }), 200
 
 
+@sync_bp.route('/push/<batch_id>', methods=['GET'])
+@token_required
+def sync_push_status(current_user, batch_id):
+    """
+    État d'un push asynchrone : pending, processing, puis synced,
+    partial ou failed (avec le détail des erreurs)
+    """
+    status = get_batch_status(current_user.id, batch_id)
+    if status is None:
+        return jsonify({'error': 'Lot introuvable'}), 404
+
+    if status['done']:
+        user = db.session.execute(
+            select(User.total_xp, User.current_level, User.last_sync).where(User.id == current_user.id)
+        ).one()
+        status['user'] = {
+            'total_xp': user.total_xp,
+            'level': user.current_level,
+            'last_sync': user.last_sync.isoformat() if user.last_sync else None
+        }
+
+    return jsonify({'success': True, **status}), 200
+
+
 # ═══════════════════════════════════════════════════════════
 # SYNC - Téléchargement des données serveur vers client
 # ═══════════════════════════════════════════════════════════
 
 @sync_bp.route('/pull', methods=['GET'])
 @token_required
+@etag_cached()
 def sync_pull(current_user):
     """
-    Envoie toutes les données de l'utilisateur au client
-    Utilisé pour restauration ou synchronisation complète
+    Envoie les données de l'utilisateur au client
+    - sans paramètre : restauration complète (séances imbriquées)
+    - ?since=<curseur> : seulement les lignes créées, modifiées ou
+      supprimées après ce curseur, à plat, avec le nouveau curseur
+    - ?stream=1 ou Accept: application/x-ndjson : restauration complète
+      en flux NDJSON, une ligne par séance (mémoire constante)
     """
-    user = User.query.filter_by(uuid=current_user['uuid']).first()
+    user = db.session.get(User, current_user.id)
     if not user:
         return jsonify({'error': 'Utilisateur introuvable'}), 404
 
-    # Récupérer toutes les séances
-    workouts = Workout.query.filter_by(user_id=user.id).order_by(Workout.workout_date.desc()).all()
-
-    workouts_data = []
-    for workout in workouts:
-        workout_exercises = []
-
-        for we in workout.workout_exercises:
-            sets_data = [
-                {
-                    'uuid': s.uuid,
-                    'set_number': s.set_number,
-                    'weight_kg': s.weight_kg,
-                    'reps': s.reps,
-                    'rpe': s.rpe,
-                    'volume': s.volume,
-                    'estimated_1rm': s.estimated_1rm,
-                    'is_warmup': s.is_warmup,
-                    'is_pr': s.is_pr,
-                    'rest_seconds': s.rest_seconds,
-                    'created_at': s.created_at.isoformat()
-                }
-                for s in we.sets
-            ]
-
-            workout_exercises.append({
-                'uuid': we.uuid,
-                'exercise_uuid': we.exercise.uuid,
-                'exercise_name': we.exercise.name,
-                'order_index': we.order_index,
-                'total_sets': we.total_sets,
-                'total_volume': we.total_volume,
-                'estimated_1rm': we.estimated_1rm,
-                'sets': sets_data
-            })
-
-        workouts_data.append({
-            'uuid': workout.uuid,
-            'name': workout.name,
-            'workout_date': workout.workout_date.isoformat(),
-            'duration_minutes': workout.duration_minutes,
-            'total_volume': workout.total_volume,
-            'xp_earned': workout.xp_earned,
-            'is_completed': workout.is_completed,
-            'notes': workout.notes,
-            'exercises': workout_exercises
-        })
+    since = request.args.get('since')
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({'error': 'Curseur invalide'}), 400
+
+    # Curseur lu avant les données : une écriture concurrente sera
+    # simplement renvoyée au pull suivant
+    cursor = user.change_seq
+    user_data = {
+        'uuid': user.uuid,
+        'username': user.username,
+        'total_xp': user.total_xp,
+        'current_level': user.current_level,
+        'last_sync': user.last_sync.isoformat() if user.last_sync else None
+    }
+
+    # Un curseur du futur (base réinitialisée) impose une restauration complète
+    if since is not None and 0 <= since <= cursor:
+        return jsonify({
+            'success': True,
+            'mode': 'delta',
+            'user': user_data,
+            'since': since,
+            'cursor': cursor,
+            'changes': _collect_changes(user.id, since),
+            'deleted': _collect_tombstones(user.id, since)
+        }), 200
+
+    if _wants_stream():
+        return Response(
+            stream_with_context(_stream_full_pull(user.id, user_data, cursor)),
+            mimetype=NDJSON_MIMETYPE
+        )
+
+    # Récupérer toutes les séances (graphe complet en requêtes fixes)
+    workouts_data = [
+        serialize_workout_for_sync(workout)
+        for workout in load_user_workouts(user.id)
+    ]
 
     return jsonify({
         'success': True,
-        'user': {
-            'uuid': user.uuid,
-            'username': user.username,
-            'total_xp': user.total_xp,
-            'current_level': user.current_level,
-            'last_sync': user.last_sync.isoformat() if user.last_sync else None
-        },
+        'mode': 'full',
+        'user': user_data,
+        'cursor': cursor,
         'workouts': workouts_data,
         'total_workouts': len(workouts_data)
     }), 200
 
 
 # ═══════════════════════════════════════════════════════════
-# FONCTIONS HELPER - Sync par type d'entité
+# FONCTIONS HELPER
 # ═══════════════════════════════════════════════════════════
 
-def _sync_workout(user_id, uuid, action, data):
-    """Synchronise une séance"""
-    if action == 'delete':
-        workout = Workout.query.filter_by(uuid=uuid).first()
-        if workout:
-            db.session.delete(workout)
-        return {'status': 'deleted'}
-
-    # Create ou Update
-    workout = Workout.query.filter_by(uuid=uuid).first()
-
-    if not workout:
-        workout = Workout(uuid=uuid, user_id=user_id)
-
-    # Mettre à jour les champs
-    workout.name = data.get('name')
-    workout.workout_date = datetime.fromisoformat(data.get('workout_date').replace('Z', '+00:00'))
-    workout.duration_minutes = data.get('duration_minutes')
-    workout.total_volume = data.get('total_volume', 0)
-    workout.xp_earned = data.get('xp_earned', 0)
-    workout.is_completed = data.get('is_completed', False)
-    workout.notes = data.get('notes')
-    workout.updated_at = datetime.utcnow()
-
-    db.session.add(workout)
-    return {'status': 'synced'}
-
-
-def _sync_workout_exercise(user_id, uuid, action, data):
-    """Synchronise un exercice dans une séance"""
-    if action == 'delete':
-        we = WorkoutExercise.query.filter_by(uuid=uuid).first()
-        if we:
-            db.session.delete(we)
-        return {'status': 'deleted'}
-
-    we = WorkoutExercise.query.filter_by(uuid=uuid).first()
-
-    if not we:
-        we = WorkoutExercise(uuid=uuid)
-
-    # Trouver la séance et l'exercice
-    workout = Workout.query.filter_by(uuid=data.get('workout_uuid')).first()
-    exercise = Exercise.query.filter_by(uuid=data.get('exercise_uuid')).first()
-
-    if not workout or not exercise:
-        raise ValueError('Workout ou Exercise introuvable')
-
-    we.workout_id = workout.id
-    we.exercise_id = exercise.id
-    we.order_index = data.get('order_index', 0)
-    we.total_sets = data.get('total_sets', 0)
-    we.total_reps = data.get('total_reps', 0)
-    we.total_volume = data.get('total_volume', 0)
-    we.estimated_1rm = data.get('estimated_1rm')
-    we.notes = data.get('notes')
-
-    db.session.add(we)
-    return {'status': 'synced'}
-
-
-def _sync_exercise_set(user_id, uuid, action, data):
-    """Synchronise une série individuelle"""
-    if action == 'delete':
-        s = ExerciseSet.query.filter_by(uuid=uuid).first()
-        if s:
-            db.session.delete(s)
-        return {'status': 'deleted'}
-
-    s = ExerciseSet.query.filter_by(uuid=uuid).first()
-
-    if not s:
-        s = ExerciseSet(uuid=uuid)
-
-    # Trouver le WorkoutExercise parent
-    we = WorkoutExercise.query.filter_by(uuid=data.get('workout_exercise_uuid')).first()
-    if not we:
-        raise ValueError('WorkoutExercise introuvable')
-
-    s.workout_exercise_id = we.id
-    s.set_number = data.get('set_number')
-    s.weight_kg = data.get('weight_kg')
-    s.reps = data.get('reps')
-    s.rpe = data.get('rpe')
-    s.is_warmup = data.get('is_warmup', False)
-    s.is_pr = data.get('is_pr', False)
-    s.rest_seconds = data.get('rest_seconds')
-
-    # Calculs automatiques
-    s.volume = calculate_volume(s.weight_kg, s.reps)
-    s.estimated_1rm = calculate_1rm(s.weight_kg, s.reps)
-
-    db.session.add(s)
-    return {'status': 'synced'}
-
-
-def _sync_exercise(user_id, uuid, action, data):
-    """Synchronise un exercice personnalisé"""
-    if action == 'delete':
-        exercise = Exercise.query.filter_by(uuid=uuid).first()
-        if exercise and exercise.is_custom:
-            db.session.delete(exercise)
-        return {'status': 'deleted'}
-
-    exercise = Exercise.query.filter_by(uuid=uuid).first()
-
-    if not exercise:
-        exercise = Exercise(uuid=uuid, user_id=user_id)
-
-    exercise.name = data.get('name')
-    exercise.category = data.get('category')
-    exercise.muscle_group = data.get('muscle_group')
-    exercise.xp_multiplier = data.get('xp_multiplier', 1.0)
-    exercise.stat_type = data.get('stat_type', 'strength')
-    exercise.is_custom = data.get('is_custom', True)
-    exercise.is_archived = data.get('is_archived', False)
-    exercise.updated_at = datetime.utcnow()
-
-    db.session.add(exercise)
-    return {'status': 'synced'}
-
-
-def _update_user_stats(user):
-    """Recalcule les stats globales de l'utilisateur"""
-    # Calculer l'XP total de toutes les séances
-    total_xp = db.session.query(db.func.sum(Workout.xp_earned)).filter_by(
-        user_id=user.id,
-        is_completed=True
-    ).scalar() or 0
-
-    user.total_xp = int(total_xp)
-
-    # Calculer le niveau
-    level_data = calculate_level(user.total_xp)
-    user.current_level = level_data['level']
\ No newline at end of file
+def _wants_async():
+    """Le client demande-t-il un push asynchrone ?"""
+    if request.args.get('async') == '1':
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+
+def _wants_stream():
+    """Le client demande-t-il le pull en flux NDJSON ?"""
+    if request.args.get('stream') == '1':
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def _stream_full_pull(user_id, user_data, cursor):
+    """
+    Génère la restauration complète en NDJSON :
+    - {"type": "user", ...} en tête
+    - {"type": "workout", "workout": {...}} par séance
+    - {"type": "end", "total_workouts": n} en fin de flux
+    Les séances sont lues par paquets (yield_per) avec leur graphe
+    préchargé paquet par paquet : la mémoire ne dépend pas de l'historique.
+    """
+    yield json.dumps({'type': 'user', 'user': user_data, 'cursor': cursor}) + '\n'
+
+    query = with_workout_graph(
+        select(Workout).filter_by(user_id=user_id)
+    ).order_by(Workout.workout_date.desc()).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    total = 0
+    for workout in db.session.scalars(query):
+        yield json.dumps({'type': 'workout', 'workout': serialize_workout_for_sync(workout)}) + '\n'
+        total += 1
+
+    yield json.dumps({'type': 'end', 'total_workouts': total}) + '\n'
+
+
+def _collect_changes(user_id, since):
+    """Lignes de l'utilisateur modifiées après le curseur, à plat"""
+    exercises = Exercise.query.filter(
+        Exercise.user_id == user_id,
+        Exercise.change_seq > since
+    ).all()
+
+    workouts = Workout.query.filter(
+        Workout.user_id == user_id,
+        Workout.change_seq > since
+    ).all()
+
+    workout_exercises = db.session.query(
+        WorkoutExercise, Workout.uuid, Exercise.uuid
+    ).join(
+        Workout, WorkoutExercise.workout_id == Workout.id
+    ).join(
+        Exercise, WorkoutExercise.exercise_id == Exercise.id
+    ).filter(
+        Workout.user_id == user_id,
+        WorkoutExercise.change_seq > since
+    ).all()
+
+    exercise_sets = db.session.query(
+        ExerciseSet, WorkoutExercise.uuid
+    ).join(
+        WorkoutExercise, ExerciseSet.workout_exercise_id == WorkoutExercise.id
+    ).join(
+        Workout, WorkoutExercise.workout_id == Workout.id
+    ).filter(
+        Workout.user_id == user_id,
+        ExerciseSet.change_seq > since
+    ).all()
+
+    return {
+        'exercises': [
+            {
+                'uuid': e.uuid,
+                'name': e.name,
+                'category': e.category,
+                'muscle_group': e.muscle_group,
+                'stat_type': e.stat_type,
+                'xp_multiplier': e.xp_multiplier,
+                'is_custom': e.is_custom,
+                'is_archived': e.is_archived
+            }
+            for e in exercises
+        ],
+        'workouts': [
+            {
+                'uuid': w.uuid,
+                'name': w.name,
+                'workout_date': w.workout_date.isoformat(),
+                'duration_minutes': w.duration_minutes,
+                'total_volume': w.total_volume,
+                'xp_earned': w.xp_earned,
+                'is_completed': w.is_completed,
+                'notes': w.notes
+            }
+            for w in workouts
+        ],
+        'workout_exercises': [
+            {
+                'uuid': we.uuid,
+                'workout_uuid': workout_uuid,
+                'exercise_uuid': exercise_uuid,
+                'order_index': we.order_index,
+                'total_sets': we.total_sets,
+                'total_volume': we.total_volume,
+                'estimated_1rm': we.estimated_1rm
+            }
+            for we, workout_uuid, exercise_uuid in workout_exercises
+        ],
+        'exercise_sets': [
+            {
+                'uuid': s.uuid,
+                'workout_exercise_uuid': we_uuid,
+                'set_number': s.set_number,
+                'weight_kg': s.weight_kg,
+                'reps': s.reps,
+                'rpe': s.rpe,
+                'volume': s.volume,
+                'estimated_1rm': s.estimated_1rm,
+                'is_warmup': s.is_warmup,
+                'is_pr': s.is_pr,
+                'rest_seconds': s.rest_seconds,
+                'created_at': s.created_at.isoformat()
+            }
+            for s, we_uuid in exercise_sets
+        ]
+    }
+
+
+def _collect_tombstones(user_id, since):
+    """Suppressions de l'utilisateur après le curseur"""
+    tombstones = SyncTombstone.query.filter(
+        SyncTombstone.user_id == user_id,
+        SyncTombstone.change_seq > since
+    ).order_by(SyncTombstone.change_seq).all()
+
+    return [
+        {'entity_type': t.entity_type, 'entity_uuid': t.entity_uuid}
+        for t in tombstones
+    ]
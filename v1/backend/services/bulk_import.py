@@ -0,0 +1,59 @@
+"""
+FitnessRPG - Import en masse d'historique
+Rejoue un fichier NDJSON d'éléments de sync (un élément par ligne) par paquets
+"""
+import json
+from typing import Dict, IO, Iterator, List
+
+from models import db, User
+from services.logic import apply_user_xp_delta
+from services.sync_engine import PushBatch
+from services.user_stats import apply_push_to_user_stats
+from utils.response_cache import invalidate_user_cache
+
+# Éléments appliqués par transaction
+IMPORT_CHUNK_SIZE = 5000
+
+
+def import_history(user: User, lines: IO[str], chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict:
+    """
+    Importe un historique pour un utilisateur
+    Chaque paquet passe par PushBatch en mode bulk_copy (COPY sur
+    PostgreSQL, INSERT ... RETURNING sinon) puis est validé : un import
+    interrompu peut être relancé, les éléments déjà importés deviennent
+    de simples mises à jour.
+    """
+    summary = {'synced': 0, 'errors': 0, 'chunks': 0}
+
+    for chunk in _chunks(_read_items(lines), chunk_size):
+        batch = PushBatch(user, chunk, bulk_copy=True)
+        results, errors = batch.apply()
+
+        apply_push_to_user_stats(user.id, batch)
+        apply_user_xp_delta(user, batch.xp_delta())
+        db.session.commit()
+        invalidate_user_cache(user.uuid)
+
+        summary['synced'] += len(results)
+        summary['errors'] += len(errors)
+        summary['chunks'] += 1
+
+    return summary
+
+
+def _read_items(lines: IO[str]) -> Iterator[Dict]:
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _chunks(items: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
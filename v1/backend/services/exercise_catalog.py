@@ -0,0 +1,126 @@
+"""
+FitnessRPG - Catalogue d'exercices (GET /api/exercises)
+Catalogue global pré-sérialisé en mémoire, versionné par son contenu,
+et exercices personnalisés de l'utilisateur dans le cache des réponses
+"""
+import hashlib
+import json
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from flask import current_app
+from sqlalchemy import select
+
+from models import db, Exercise, User
+from utils.response_cache import get_response_cache
+
+
+class CatalogPart(NamedTuple):
+    """Fragment JSON d'exercices (éléments d'un tableau, sans crochets)"""
+    version: str
+    items: bytes
+    count: int
+
+
+# ═══════════════════════════════════════════════════════════
+# CATALOGUE GLOBAL (par processus)
+# ═══════════════════════════════════════════════════════════
+
+def get_global_catalog() -> CatalogPart:
+    """
+    Exercices globaux, relus au plus toutes les EXERCISE_CATALOG_TTL secondes
+    La version est un hash du contenu : identique dans tous les workers
+    qui lisent la même base, elle ne change qu'avec le catalogue.
+    """
+    state = current_app.extensions.setdefault('exercise_catalog', {})
+    now = time.monotonic()
+
+    if state.get('catalog') is None or now - state['loaded_at'] >= current_app.config['EXERCISE_CATALOG_TTL']:
+        exercises = db.session.scalars(
+            select(Exercise).where(
+                Exercise.user_id.is_(None),
+                Exercise.is_archived == False
+            ).order_by(Exercise.id)
+        ).all()
+        state['catalog'] = _build_part(exercises)
+        state['loaded_at'] = now
+
+    return state['catalog']
+
+
+# ═══════════════════════════════════════════════════════════
+# EXERCICES PERSONNALISÉS (par utilisateur)
+# ═══════════════════════════════════════════════════════════
+
+def get_custom_exercises(user_uuid: str) -> CatalogPart:
+    """
+    Exercices personnalisés de l'utilisateur, gardés dans le cache des
+    réponses sous sa génération : ils ne changent que par un push, qui
+    l'invalide
+    """
+    cache = get_response_cache()
+    key = f'custom-exercises:{user_uuid}:{cache.generation(user_uuid)}'
+
+    entry = cache.get(key, 'exercises.custom')
+    if entry is not None:
+        return CatalogPart(entry['version'], entry['items'].encode('utf-8'), entry['count'])
+
+    exercises = db.session.scalars(
+        select(Exercise).join(User, Exercise.user_id == User.id).where(
+            User.uuid == user_uuid,
+            Exercise.is_archived == False
+        ).order_by(Exercise.id)
+    ).all()
+    part = _build_part(exercises)
+
+    cache.set(key, {'version': part.version, 'items': part.items.decode('utf-8'), 'count': part.count})
+    return part
+
+
+# ═══════════════════════════════════════════════════════════
+# RÉPONSE
+# ═══════════════════════════════════════════════════════════
+
+def catalog_version(parts: List[CatalogPart]) -> str:
+    """Version de la réponse : catalogue global, puis exercices personnalisés"""
+    return '.'.join(part.version for part in parts)
+
+
+def render_catalog(parts: List[CatalogPart], since_version: Optional[str] = None) -> bytes:
+    """
+    Corps JSON de la réponse, assemblé à partir des fragments déjà sérialisés
+    Si le client a déjà cette version (since_version), la liste est vide.
+    """
+    version = catalog_version(parts)
+    unchanged = since_version == version
+
+    items = b'' if unchanged else b','.join(part.items for part in parts if part.count)
+    total = 0 if unchanged else sum(part.count for part in parts)
+
+    head = json.dumps({
+        'success': True,
+        'version': version,
+        'changed': not unchanged,
+        'total': total,
+    })
+    return head[:-1].encode('utf-8') + b', "exercises": [' + items + b']}'
+
+
+def _build_part(exercises: List[Exercise]) -> CatalogPart:
+    items = b','.join(
+        json.dumps(_serialize_exercise(exercise), ensure_ascii=False).encode('utf-8')
+        for exercise in exercises
+    )
+    return CatalogPart(hashlib.sha1(items).hexdigest()[:12], items, len(exercises))
+
+
+def _serialize_exercise(exercise: Exercise) -> Dict:
+    return {
+        'uuid': exercise.uuid,
+        'name': exercise.name,
+        'category': exercise.category,
+        'muscle_group': exercise.muscle_group,
+        'stat_type': exercise.stat_type,
+        'xp_multiplier': exercise.xp_multiplier,
+        'is_custom': bool(exercise.is_custom)
+    }
@@ -3,7 +3,11 @@ FitnessRPG - Business Logic Service
 Fonctions métier pour le calcul des statistiques et agrégations
 """
 from typing import Dict, List, Optional
-from models import WorkoutExercise, ExerciseSet, Workout, User
+
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+
+from models import db, WorkoutExercise, ExerciseSet, Workout, User, PersonalBest
 from utils.calculations import (
     calculate_1rm,
     calculate_volume,
@@ -138,26 +142,23 @@ def calculate_set_stats(exercise_set: ExerciseSet) -> None:
 def check_if_pr(exercise_set: ExerciseSet, workout_exercise: WorkoutExercise) -> bool:
     """
     Vérifie si cette série est un Personal Record pour cet exercice
-    Compare le 1RM avec les séances précédentes
+    Compare le 1RM avec le record de l'utilisateur (table PersonalBest,
+    une lecture indexée sur (user_id, exercise_id))
     """
     current_1rm = exercise_set.estimated_1rm
-    if not current_1rm:
+    if not current_1rm or exercise_set.is_warmup:
         return False
 
-    # Récupérer l'exercice
-    exercise = workout_exercise.exercise_info
-    if not exercise:
-        return False
+    best = PersonalBest.query.filter_by(
+        user_id=workout_exercise.workout.user_id,
+        exercise_id=workout_exercise.exercise_id
+    ).first()
 
-    # Chercher le meilleur 1RM précédent pour cet exercice
-    # (nécessite une requête vers d'autres WorkoutExercises du même exercice)
-    # Pour l'instant, on marque PR si c'est le meilleur de la séance actuelle
-    best_in_session = max(
-        (s.estimated_1rm for s in workout_exercise.sets if s.estimated_1rm),
-        default=0
-    )
-
-    return current_1rm >= best_in_session
+    if best is None or best.best_1rm is None:
+        return True
+    if exercise_set.id is not None and best.best_1rm_set_id == exercise_set.id:
+        return True
+    return current_1rm > best.best_1rm
 
 
 # ═══════════════════════════════════════════════════════════
@@ -168,13 +169,25 @@ def update_user_total_xp(user: User) -> None:
     """
     Recalcule l'XP total de l'utilisateur en fonction de toutes ses séances
     """
-    total_xp = sum(
-        workout.xp_earned
-        for workout in user.workouts
-        if workout.is_completed
-    )
+    total_xp = db.session.query(func.sum(Workout.xp_earned)).filter_by(
+        user_id=user.id,
+        is_completed=True
+    ).scalar() or 0
 
-    user.total_xp = total_xp
+    user.total_xp = int(total_xp)
+
+
+def apply_user_xp_delta(user: User, delta: int) -> bool:
+    """
+    Ajoute une variation d'XP au total de l'utilisateur, sans relire
+    l'historique (UPDATE ... SET total_xp = total_xp + delta)
+    Retourne True si l'utilisateur a gagné un niveau
+    """
+    if delta:
+        user.total_xp = func.coalesce(User.total_xp, 0) + delta
+        db.session.flush()
+
+    return update_user_level(user)
 
 
 def update_user_level(user: User) -> bool:
@@ -194,6 +207,38 @@ def update_user_level(user: User) -> bool:
     return new_level > old_level
 
 
+# ═══════════════════════════════════════════════════════════
+# CHARGEMENT - Graphe complet en nombre fixe de requêtes
+# ═══════════════════════════════════════════════════════════
+
+def with_workout_graph(query):
+    """
+    Ajoute le chargement anticipé du graphe d'une séance à une requête
+    sur Workout : exercices, fiches exercice et séries (selectin, donc
+    compatible avec yield_per).
+    Coût : 1 requête pour les séances + 1 par niveau, quel que soit
+    le nombre de séances (au lieu d'une requête par séance/exercice).
+    """
+    return query.options(
+        selectinload(Workout.workout_exercises).options(
+            selectinload(WorkoutExercise.exercise_info),
+            selectinload(WorkoutExercise.sets)
+        )
+    )
+
+
+def load_user_workouts(user_id: int, completed_only: bool = False) -> List[Workout]:
+    """
+    Charge toutes les séances d'un utilisateur avec leur graphe complet
+    Triées de la plus récente à la plus ancienne
+    """
+    query = Workout.query.filter_by(user_id=user_id)
+    if completed_only:
+        query = query.filter_by(is_completed=True)
+
+    return with_workout_graph(query).order_by(Workout.workout_date.desc()).all()
+
+
 # ═══════════════════════════════════════════════════════════
 # HELPERS
 # ═══════════════════════════════════════════════════════════
@@ -201,6 +246,7 @@ def update_user_level(user: User) -> bool:
 def serialize_workout_for_sync(workout: Workout) -> Dict:
     """
     Sérialise un Workout pour l'envoyer au client
+    Charger la séance via load_user_workouts pour éviter le N+1
     """
     return {
         'uuid': workout.uuid,
@@ -222,9 +268,12 @@ def serialize_workout_exercise_for_sync(workout_exercise: WorkoutExercise) -> Di
     """
     Sérialise un WorkoutExercise pour l'envoyer au client
     """
+    exercise_info = workout_exercise.exercise_info
+
     return {
         'uuid': workout_exercise.uuid,
-        'exercise_uuid': workout_exercise.exercise_info.uuid if workout_exercise.exercise_info else None,
+        'exercise_uuid': exercise_info.uuid if exercise_info else None,
+        'exercise_name': exercise_info.name if exercise_info else None,
         'order_index': workout_exercise.order_index,
         'total_sets': workout_exercise.total_sets,
         'total_reps': workout_exercise.total_reps,
@@ -252,5 +301,6 @@ def serialize_exercise_set_for_sync(exercise_set: ExerciseSet) -> Dict:
         'estimated_1rm': exercise_set.estimated_1rm,
         'is_warmup': exercise_set.is_warmup,
         'is_pr': exercise_set.is_pr,
-        'rest_seconds': exercise_set.rest_seconds
+        'rest_seconds': exercise_set.rest_seconds,
+        'created_at': exercise_set.created_at.isoformat() if exercise_set.created_at else None
     }
@@ -0,0 +1,161 @@
+"""
+FitnessRPG - Records personnels par exercice (PersonalBest)
+Une ligne par (utilisateur, exercice), mise à jour à chaque push
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from models import db, PersonalBest, Workout, WorkoutExercise, ExerciseSet
+
+# Nombre max d'IDs par clause IN
+IN_CHUNK_SIZE = 500
+
+
+# ═══════════════════════════════════════════════════════════
+# LECTURE
+# ═══════════════════════════════════════════════════════════
+
+def load_personal_bests(user_id: int, exercise_ids: Iterable[int]) -> Dict[int, PersonalBest]:
+    """Records de l'utilisateur pour ces exercices (une requête indexée)"""
+    wanted = sorted(set(exercise_ids))
+    found = {}
+
+    for start in range(0, len(wanted), IN_CHUNK_SIZE):
+        chunk = wanted[start:start + IN_CHUNK_SIZE]
+        for pb in PersonalBest.query.filter(
+            PersonalBest.user_id == user_id,
+            PersonalBest.exercise_id.in_(chunk)
+        ):
+            found[pb.exercise_id] = pb
+
+    return found
+
+
+# ═══════════════════════════════════════════════════════════
+# DÉTECTION DES PRS (séries d'un push)
+# ═══════════════════════════════════════════════════════════
+
+def detect_personal_records(user_id: int, sets: List[Dict]) -> Dict[int, Tuple[PersonalBest, str]]:
+    """
+    Marque is_pr sur les séries d'un push et monte les records battus
+    `sets` : [{'uuid', 'id', 'exercise_id', 'values'}] dans l'ordre du lot,
+    id étant celui de la série existante (None si nouvelle) et values le
+    dictionnaire de colonnes à écrire (modifié sur place).
+    Retourne {exercise_id: (record, uuid de la série du meilleur 1RM)},
+    la série n'ayant pas encore d'ID avant son insertion.
+    """
+    bests = load_personal_bests(user_id, (s['exercise_id'] for s in sets))
+    best_sets = {}
+
+    for entry in sets:
+        values = entry['values']
+        values['is_pr'] = False
+        if values.get('is_warmup'):
+            continue
+
+        exercise_id = entry['exercise_id']
+        pb = bests.get(exercise_id)
+        if pb is None:
+            pb = bests[exercise_id] = PersonalBest(user_id=user_id, exercise_id=exercise_id)
+            db.session.add(pb)
+
+        one_rm = values['estimated_1rm']
+        if one_rm is not None and (pb.best_1rm is None or one_rm > pb.best_1rm):
+            pb.best_1rm = one_rm
+            values['is_pr'] = True
+            best_sets[exercise_id] = (pb, entry['uuid'])
+        elif entry['id'] is not None and entry['id'] == pb.best_1rm_set_id:
+            # Série du record renvoyée sans changement de 1RM
+            values['is_pr'] = one_rm == pb.best_1rm
+
+        pb.heaviest_weight = _max(pb.heaviest_weight, values['weight_kg'])
+        pb.best_volume = _max(pb.best_volume, values['volume'])
+
+    return best_sets
+
+
+def link_best_sets(best_sets: Dict[int, Tuple[PersonalBest, str]], set_ids: Dict[str, int]) -> None:
+    """Renseigne best_1rm_set_id une fois les séries insérées"""
+    for pb, set_uuid in best_sets.values():
+        pb.best_1rm_set_id = set_ids[set_uuid]
+
+
+# ═══════════════════════════════════════════════════════════
+# RECALCUL (suppressions, modifications, reconstruction)
+# ═══════════════════════════════════════════════════════════
+
+def recompute_personal_bests(user_id: int, exercise_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recalcule les records depuis l'historique, pour quelques exercices
+    (suppression ou modification d'une série) ou pour tous (None)
+    Deux requêtes : maxima par exercice (GROUP BY) et meilleure série
+    au 1RM par exercice (ROW_NUMBER).
+    """
+    wanted = None if exercise_ids is None else sorted(set(exercise_ids))
+    if wanted == []:
+        return
+
+    def working_sets(*columns):
+        query = select(*columns).join(
+            WorkoutExercise, ExerciseSet.workout_exercise_id == WorkoutExercise.id
+        ).join(
+            Workout, WorkoutExercise.workout_id == Workout.id
+        ).where(
+            Workout.user_id == user_id,
+            ExerciseSet.is_warmup.isnot(True)
+        )
+        if wanted is not None:
+            query = query.where(WorkoutExercise.exercise_id.in_(wanted))
+        return query
+
+    maxima = {
+        row.exercise_id: row
+        for row in db.session.execute(working_sets(
+            WorkoutExercise.exercise_id,
+            func.max(ExerciseSet.weight_kg).label('heaviest_weight'),
+            func.max(ExerciseSet.volume).label('best_volume'),
+        ).group_by(WorkoutExercise.exercise_id))
+    }
+
+    ranked = working_sets(
+        WorkoutExercise.exercise_id,
+        ExerciseSet.id.label('set_id'),
+        ExerciseSet.estimated_1rm,
+        func.row_number().over(
+            partition_by=WorkoutExercise.exercise_id,
+            order_by=(ExerciseSet.estimated_1rm.desc(), ExerciseSet.id)
+        ).label('rank')
+    ).where(ExerciseSet.estimated_1rm.isnot(None)).subquery()
+
+    top_sets = {
+        row.exercise_id: row
+        for row in db.session.execute(select(ranked).where(ranked.c.rank == 1))
+    }
+
+    if wanted is None:
+        bests = {pb.exercise_id: pb for pb in PersonalBest.query.filter_by(user_id=user_id)}
+    else:
+        bests = load_personal_bests(user_id, wanted)
+
+    for exercise_id in set(bests) | set(maxima):
+        if exercise_id not in maxima:
+            db.session.delete(bests[exercise_id])
+            continue
+
+        pb = bests.get(exercise_id)
+        if pb is None:
+            pb = PersonalBest(user_id=user_id, exercise_id=exercise_id)
+            db.session.add(pb)
+
+        top = top_sets.get(exercise_id)
+        pb.best_1rm = top.estimated_1rm if top else None
+        pb.best_1rm_set_id = top.set_id if top else None
+        pb.heaviest_weight = maxima[exercise_id].heaviest_weight
+        pb.best_volume = maxima[exercise_id].best_volume
+
+
+def _max(current, value):
+    if value is None:
+        return current
+    return value if current is None or value > current else current
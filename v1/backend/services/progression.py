@@ -0,0 +1,183 @@
+"""
+FitnessRPG - Progression par exercice (ExerciseDailyProgress)
+Cumul par (utilisateur, exercice, jour), rafraîchi à chaque push et
+regroupé à la demande par semaine ou par mois pour les graphiques
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, delete, func, insert, select, type_coerce
+
+from models import db, ExerciseDailyProgress, Workout, WorkoutExercise, ExerciseSet
+
+# Nombre max de jours par clause IN
+IN_CHUNK_SIZE = 500
+
+# Regroupements acceptés par /api/stats/progression
+BUCKETS = ('day', 'week', 'month')
+
+
+# ═══════════════════════════════════════════════════════════
+# RAFRAÎCHISSEMENT (push, reconstruction)
+# ═══════════════════════════════════════════════════════════
+
+def refresh_daily_progress(user_id: int, days: Optional[Iterable[date]] = None) -> None:
+    """
+    Recalcule les cumuls des jours donnés (tous si None) depuis l'historique
+    Deux requêtes par paquet de jours, quel que soit le nombre d'exercices :
+    DELETE des cumuls puis INSERT ... SELECT groupé par (exercice, jour).
+    """
+    if days is None:
+        db.session.execute(
+            delete(ExerciseDailyProgress).where(ExerciseDailyProgress.user_id == user_id),
+            execution_options={'synchronize_session': False}
+        )
+        _insert_rollup(user_id)
+        return
+
+    wanted = sorted(set(days))
+    for start in range(0, len(wanted), IN_CHUNK_SIZE):
+        chunk = wanted[start:start + IN_CHUNK_SIZE]
+        db.session.execute(
+            delete(ExerciseDailyProgress).where(
+                ExerciseDailyProgress.user_id == user_id,
+                ExerciseDailyProgress.day.in_(chunk)
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        _insert_rollup(user_id, chunk)
+
+
+def _insert_rollup(user_id: int, days: Optional[List[date]] = None) -> None:
+    day = _workout_day()
+    working_set = and_(
+        ExerciseSet.workout_exercise_id == WorkoutExercise.id,
+        ExerciseSet.is_warmup.isnot(True)
+    )
+
+    rollup = select(
+        Workout.user_id,
+        WorkoutExercise.exercise_id,
+        day,
+        func.count(func.distinct(Workout.id)),
+        func.count(ExerciseSet.id),
+        func.coalesce(func.sum(ExerciseSet.weight_kg * ExerciseSet.reps), 0.0),
+        func.max(ExerciseSet.estimated_1rm),
+        func.max(ExerciseSet.weight_kg),
+    ).join(
+        WorkoutExercise, WorkoutExercise.workout_id == Workout.id
+    ).outerjoin(
+        ExerciseSet, working_set
+    ).where(
+        Workout.user_id == user_id,
+        Workout.is_completed == True
+    ).group_by(
+        Workout.user_id, WorkoutExercise.exercise_id, day
+    )
+    if days is not None:
+        rollup = rollup.where(day.in_(days))
+
+    db.session.execute(insert(ExerciseDailyProgress).from_select(
+        ['user_id', 'exercise_id', 'day', 'sessions', 'total_sets', 'total_volume', 'best_1rm', 'top_weight'],
+        rollup
+    ))
+
+
+def workout_day(value) -> Optional[date]:
+    """
+    Jour d'une date de séance, comme func.date() en base : les dates
+    envoyées par le client (aware) sont stockées sans fuseau
+    """
+    if value is None:
+        return None
+    return value.replace(tzinfo=None).date()
+
+
+# ═══════════════════════════════════════════════════════════
+# LECTURE (séries pour les graphiques)
+# ═══════════════════════════════════════════════════════════
+
+def get_progression_series(user_id: int, exercise_id: int, bucket: str = 'day',
+                           start: Optional[date] = None, end: Optional[date] = None,
+                           cursor: Optional[date] = None, limit: int = 365) -> Dict:
+    """
+    Points de progression d'un exercice, du plus ancien au plus récent
+    Un point par jour, semaine (lundi) ou mois ; `cursor` est la période
+    du dernier point de la page précédente. Une requête indexée sur
+    (user_id, exercise_id, day), bornée par limit + 1 lignes.
+    """
+    model = ExerciseDailyProgress
+    period = _bucket_start(bucket)
+
+    query = select(
+        period.label('period'),
+        func.sum(model.sessions).label('sessions'),
+        func.sum(model.total_sets).label('total_sets'),
+        func.sum(model.total_volume).label('total_volume'),
+        func.max(model.best_1rm).label('best_1rm'),
+        func.max(model.top_weight).label('top_weight'),
+    ).where(
+        model.user_id == user_id,
+        model.exercise_id == exercise_id
+    ).group_by(period).order_by(period).limit(limit + 1)
+
+    if start is not None:
+        query = query.where(model.day >= start)
+    if end is not None:
+        query = query.where(model.day <= end)
+    if cursor is not None:
+        query = query.where(model.day >= next_period(bucket, cursor))
+
+    rows = db.session.execute(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        'points': [
+            {
+                'period': row.period.isoformat(),
+                'sessions': row.sessions,
+                'total_sets': row.total_sets,
+                'total_volume': round(row.total_volume or 0, 2),
+                'best_1rm': round(row.best_1rm, 2) if row.best_1rm is not None else None,
+                'top_weight': row.top_weight
+            }
+            for row in rows
+        ],
+        'next_cursor': rows[-1].period.isoformat() if has_more else None
+    }
+
+
+def next_period(bucket: str, period: date) -> date:
+    """Premier jour de la période suivant `period` (début de période)"""
+    if bucket == 'week':
+        return period + timedelta(days=7)
+    if bucket == 'month':
+        return date(period.year + period.month // 12, period.month % 12 + 1, 1)
+    return period + timedelta(days=1)
+
+
+# ═══════════════════════════════════════════════════════════
+# HELPERS - Expressions de date selon le moteur
+# ═══════════════════════════════════════════════════════════
+
+def _workout_day():
+    """Jour d'une séance, lu comme une date (SQLite renvoie une chaîne)"""
+    return type_coerce(func.date(Workout.workout_date), db.Date)
+
+
+def _bucket_start(bucket: str):
+    """Début de la période (jour, lundi, 1er du mois) d'un cumul journalier"""
+    day = ExerciseDailyProgress.day
+    if bucket == 'day':
+        return day
+
+    if db.session.get_bind().dialect.name == 'sqlite':
+        if bucket == 'week':
+            expression = func.date(day, 'weekday 0', '-6 days')
+        else:
+            expression = func.date(day, 'start of month')
+    else:
+        expression = func.date(func.date_trunc(bucket, day))
+
+    return type_coerce(expression, db.Date)
@@ -0,0 +1,120 @@
+"""
+FitnessRPG - Refresh tokens (sessions glissantes)
+Un rafraîchissement = un HMAC et une lecture indexée, sans Argon2
+"""
+import hashlib
+import hmac
+import secrets
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import delete, select, update
+
+from models import db, RefreshToken, User
+
+
+def hash_refresh_token(raw_token: str) -> str:
+    """HMAC-SHA256 du token (clé JWT) : la base ne contient aucun token utilisable"""
+    key = current_app.config['JWT_SECRET_KEY'].encode('utf-8')
+    return hmac.new(key, raw_token.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def issue_refresh_token(user_id: int, family_id: Optional[str] = None) -> str:
+    """Crée un refresh token (nouvelle famille au login) et retourne sa valeur"""
+    raw_token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+
+    db.session.add(RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(raw_token),
+        family_id=family_id or str(uuid.uuid4()),
+        created_at=now,
+        expires_at=now + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+    ))
+    return raw_token
+
+
+def rotate_refresh_token(raw_token: str) -> Tuple[User, str]:
+    """
+    Échange un refresh token valide contre un nouveau (même famille)
+    Une seule lecture (token + utilisateur, par l'index unique du hash),
+    puis la révocation du token présenté par un UPDATE conditionnel.
+    ValueError si le token est inconnu, expiré ou déjà utilisé ; dans ce
+    dernier cas toute la famille est révoquée.
+    """
+    row = db.session.execute(
+        select(RefreshToken, User).join(
+            User, RefreshToken.user_id == User.id
+        ).where(RefreshToken.token_hash == hash_refresh_token(raw_token))
+    ).first()
+
+    if row is None:
+        raise ValueError('Refresh token invalide')
+
+    token, user = row
+    now = datetime.utcnow()
+
+    if token.revoked_at is not None:
+        revoke_refresh_family(token.family_id)
+        db.session.commit()
+        raise ValueError('Refresh token déjà utilisé')
+
+    if token.expires_at <= now:
+        raise ValueError('Refresh token expiré')
+
+    # UPDATE conditionnel : de deux rafraîchissements simultanés avec le
+    # même token, un seul le révoque ; l'autre est traité en réutilisation
+    revoked = db.session.execute(
+        update(RefreshToken).where(
+            RefreshToken.id == token.id,
+            RefreshToken.revoked_at.is_(None)
+        ).values(revoked_at=now)
+    ).rowcount
+    if not revoked:
+        revoke_refresh_family(token.family_id)
+        db.session.commit()
+        raise ValueError('Refresh token déjà utilisé')
+
+    return user, issue_refresh_token(user.id, token.family_id)
+
+
+def revoke_refresh_family(family_id: str) -> None:
+    """Révoque tous les tokens encore actifs d'une session"""
+    db.session.execute(
+        update(RefreshToken).where(
+            RefreshToken.family_id == family_id,
+            RefreshToken.revoked_at.is_(None)
+        ).values(revoked_at=datetime.utcnow())
+    )
+
+
+def revoke_refresh_token(raw_token: str) -> None:
+    """Déconnexion d'un appareil : révoque la session du token présenté"""
+    family_id = db.session.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(raw_token))
+    ).scalar()
+    if family_id is not None:
+        revoke_refresh_family(family_id)
+
+
+def revoke_user_refresh_tokens(user_id: int) -> None:
+    """Révoque toutes les sessions de l'utilisateur"""
+    db.session.execute(
+        update(RefreshToken).where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None)
+        ).values(revoked_at=datetime.utcnow())
+    )
+
+
+def purge_expired_refresh_tokens() -> int:
+    """
+    Supprime les tokens expirés (les révoqués non expirés sont gardés :
+    ils servent à détecter la réutilisation d'un token volé)
+    """
+    result = db.session.execute(
+        delete(RefreshToken).where(RefreshToken.expires_at <= datetime.utcnow())
+    )
+    return result.rowcount
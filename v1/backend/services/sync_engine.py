@@ -0,0 +1,634 @@
+"""
+FitnessRPG - Moteur de synchronisation (push)
+Application en lot des éléments envoyés par le client
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import and_, delete, func, insert, select, update
+
+from models import db, User, Workout, WorkoutExercise, ExerciseSet, Exercise, SyncTombstone
+from services.personal_bests import detect_personal_records, link_best_sets, recompute_personal_bests
+from services.progression import refresh_daily_progress, workout_day
+from utils.calculations import calculate_1rm, calculate_volume, calculate_xp
+from utils.database import copy_rows
+
+# Ordre d'application : les parents avant les enfants
+ENTITY_ORDER = ('exercise', 'workout', 'workout_exercise', 'exercise_set')
+
+ENTITY_MODELS = {
+    'exercise': Exercise,
+    'workout': Workout,
+    'workout_exercise': WorkoutExercise,
+    'exercise_set': ExerciseSet,
+}
+
+# Clés étrangères résolues à l'écriture : colonne -> type du parent
+FOREIGN_KEYS = {
+    'workout_exercise': {'workout_id': 'workout', 'exercise_id': 'exercise'},
+    'exercise_set': {'workout_exercise_id': 'workout_exercise'},
+}
+
+# Enfants supprimés en cascade : type parent -> (type enfant, clé étrangère)
+CHILDREN = {
+    'workout': ('workout_exercise', 'workout_id'),
+    'workout_exercise': ('exercise_set', 'workout_exercise_id'),
+}
+
+# Colonnes d'une séance suivies avant/après le lot (agrégats utilisateur)
+WORKOUT_SNAPSHOT_FIELDS = ('is_completed', 'total_volume', 'xp_earned', 'workout_date')
+
+# Nombre max d'UUIDs par clause IN (limite de variables SQLite)
+IN_CHUNK_SIZE = 500
+
+# Taille minimale d'un INSERT envoyé par COPY (import en masse, PostgreSQL)
+COPY_MIN_ROWS = 1000
+
+
+def load_by_uuid(model, uuids: Iterable[str]) -> Dict:
+    """
+    Charge les lignes d'un modèle par UUID avec une requête IN
+    (découpée en paquets pour rester sous la limite SQLite)
+    """
+    wanted = sorted({u for u in uuids if u})
+    found = {}
+
+    for start in range(0, len(wanted), IN_CHUNK_SIZE):
+        chunk = wanted[start:start + IN_CHUNK_SIZE]
+        for row in model.query.filter(model.uuid.in_(chunk)):
+            found[row.uuid] = row
+
+    return found
+
+
+def load_ids_by_uuid(model, uuids: Iterable[str]) -> Dict[str, int]:
+    """Comme load_by_uuid mais ne récupère que (uuid, id)"""
+    wanted = sorted({u for u in uuids if u})
+    found = {}
+
+    for start in range(0, len(wanted), IN_CHUNK_SIZE):
+        chunk = wanted[start:start + IN_CHUNK_SIZE]
+        rows = db.session.query(model.uuid, model.id).filter(model.uuid.in_(chunk))
+        found.update(dict(rows))
+
+    return found
+
+
+def _chunked(values: List) -> Iterable[List]:
+    for start in range(0, len(values), IN_CHUNK_SIZE):
+        yield values[start:start + IN_CHUNK_SIZE]
+
+
+def _aggregates_query(workout_ids: List[int]):
+    """
+    Une ligne par (séance, exercice de séance) avec les agrégats de ses
+    séries hors échauffement ; une séance vide donne une ligne sans exercice
+    """
+    working_set = and_(
+        ExerciseSet.workout_exercise_id == WorkoutExercise.id,
+        ExerciseSet.is_warmup.isnot(True)
+    )
+
+    return select(
+        Workout.id.label('workout_id'),
+        Workout.uuid,
+        *(getattr(Workout, field) for field in WORKOUT_SNAPSHOT_FIELDS),
+        WorkoutExercise.id.label('workout_exercise_id'),
+        Exercise.xp_multiplier,
+        func.count(ExerciseSet.id).label('sets'),
+        func.sum(ExerciseSet.reps).label('reps'),
+        func.sum(ExerciseSet.weight_kg * ExerciseSet.reps).label('volume'),
+        func.max(ExerciseSet.estimated_1rm).label('best_1rm'),
+    ).outerjoin(
+        WorkoutExercise, WorkoutExercise.workout_id == Workout.id
+    ).outerjoin(
+        Exercise, Exercise.id == WorkoutExercise.exercise_id
+    ).outerjoin(
+        ExerciseSet, working_set
+    ).where(
+        Workout.id.in_(workout_ids)
+    ).group_by(
+        Workout.id, WorkoutExercise.id, Exercise.id
+    )
+
+
+def next_change_seq(user: User) -> int:
+    """
+    Incrémente atomiquement le curseur de sync de l'utilisateur
+    (UPDATE ... SET change_seq = change_seq + 1) et retourne la nouvelle valeur
+    """
+    user.change_seq = User.change_seq + 1
+    db.session.flush()
+    return user.change_seq
+
+
+class PushBatch:
+    """
+    Lot d'éléments reçus par /api/sync/push
+
+    Les éléments sont regroupés par entity_type et tous les UUIDs sont
+    résolus avec une requête IN par table. Les handlers ne touchent pas
+    la base : ils produisent des lignes à écrire, envoyées ensuite avec
+    un INSERT et un UPDATE groupés (executemany) par table, parents
+    avant enfants, dans la transaction de la requête.
+
+    Chaque ligne écrite est marquée avec le nouveau change_seq de
+    l'utilisateur, et chaque suppression laisse un SyncTombstone,
+    ce qui permet le pull incrémental (?since=<curseur>).
+    """
+
+    def __init__(self, user: User, items: List[Dict], bulk_copy: bool = False):
+        self.user = user
+        self.user_id = user.id
+        self.items = items
+        self.bulk_copy = bulk_copy
+        self.change_seq = None
+
+        # Lignes existantes en base : entity_type -> {uuid: ligne}
+        self.existing = {entity_type: {} for entity_type in ENTITY_ORDER}
+        # Valeurs à écrire : entity_type -> {uuid: {colonne: valeur}}
+        self.pending = {entity_type: {} for entity_type in ENTITY_ORDER}
+        # Lignes à supprimer : [(entity_type, ligne)]
+        self.deleted = []
+
+        # Résumé du lot, pour la mise à jour incrémentale des agrégats
+        # - workout_changes : uuid -> [avant, après] (None = absente)
+        # - inserted / deleted_counts : lignes créées / supprimées par type
+        # - may_lower_maxima : une série existante a changé ou disparu
+        self.workout_changes = {}
+        self.inserted = defaultdict(int)
+        self.deleted_counts = defaultdict(int)
+        self.may_lower_maxima = False
+        # Exercices dont les records sont à recalculer
+        self.stale_records = set()
+
+        self._handlers = {
+            'exercise': self._sync_exercise,
+            'workout': self._sync_workout,
+            'workout_exercise': self._sync_workout_exercise,
+            'exercise_set': self._sync_exercise_set,
+        }
+
+    def apply(self) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Applique le lot dans la session courante (sans commit)
+        Retourne (results, errors) dans l'ordre d'origine des éléments
+        """
+        grouped = defaultdict(list)
+        outcomes = [None] * len(self.items)
+
+        for index, item in enumerate(self.items):
+            entity_type = item.get('entity_type')
+            if entity_type in self._handlers:
+                grouped[entity_type].append((index, item))
+            else:
+                outcomes[index] = ({
+                    'entity_uuid': item.get('entity_uuid'),
+                    'status': 'skipped'
+                }, None)
+
+        self.change_seq = next_change_seq(self.user)
+        self._preload(grouped)
+
+        for entity_type in ENTITY_ORDER:
+            handler = self._handlers[entity_type]
+
+            for index, item in grouped[entity_type]:
+                entity_uuid = item.get('entity_uuid')
+                try:
+                    status = handler(entity_uuid, item.get('action'), item.get('data') or {})
+                    outcomes[index] = ({'entity_uuid': entity_uuid, 'status': status}, None)
+                except Exception as e:
+                    outcomes[index] = (None, {'entity_uuid': entity_uuid, 'error': str(e)})
+
+        self._summarize()
+        self._write()
+
+        results = [result for result, _ in outcomes if result]
+        errors = [error for _, error in outcomes if error]
+        return results, errors
+
+    # ═══════════════════════════════════════════════════════════
+    # LECTURE / ÉCRITURE - Requêtes groupées par table
+    # ═══════════════════════════════════════════════════════════
+
+    def _preload(self, grouped: Dict) -> None:
+        """Résout tous les UUIDs (entités et parents) du lot"""
+
+        def uuids(entity_type, key=None):
+            for _, item in grouped[entity_type]:
+                if key is None:
+                    yield item.get('entity_uuid')
+                else:
+                    yield (item.get('data') or {}).get(key)
+
+        wanted = {
+            'exercise': [*uuids('exercise'), *uuids('workout_exercise', 'exercise_uuid')],
+            'workout': [*uuids('workout'), *uuids('workout_exercise', 'workout_uuid')],
+            'workout_exercise': [*uuids('workout_exercise'), *uuids('exercise_set', 'workout_exercise_uuid')],
+            'exercise_set': list(uuids('exercise_set')),
+        }
+
+        for entity_type in ENTITY_ORDER:
+            self.existing[entity_type] = load_by_uuid(ENTITY_MODELS[entity_type], wanted[entity_type])
+
+    def _write(self) -> None:
+        """
+        Envoie les suppressions, puis INSERT/UPDATE groupés table par table,
+        puis recalcule les agrégats des séances touchées
+        """
+        # Parents dont les agrégats changent avec une suppression
+        touched_workouts = {row.workout_id for entity_type, row in self.deleted if entity_type == 'workout_exercise'}
+        touched_wes = {row.workout_exercise_id for entity_type, row in self.deleted if entity_type == 'exercise_set'}
+        self._collect_stale_records()
+
+        if self.deleted:
+            self._delete_rows(self._record_tombstones())
+
+        ids = {}
+
+        for entity_type in ENTITY_ORDER:
+            model = ENTITY_MODELS[entity_type]
+            existing = self.existing[entity_type]
+            ids[entity_type] = {uuid: row.id for uuid, row in existing.items()}
+
+            if entity_type == 'exercise_set':
+                best_sets = self._detect_personal_records(ids)
+
+            inserts, updates = [], []
+            for uuid, values in self.pending[entity_type].items():
+                # Remplacer les UUIDs des parents par leurs IDs
+                for column, parent_type in FOREIGN_KEYS.get(entity_type, {}).items():
+                    values[column] = ids[parent_type][values[column]]
+
+                if uuid in existing:
+                    updates.append({'id': existing[uuid].id, **values})
+                else:
+                    inserts.append({'uuid': uuid, **values})
+
+            if inserts:
+                self.inserted[entity_type] = len(inserts)
+                ids[entity_type].update(self._insert_rows(model, inserts))
+
+            if updates:
+                db.session.execute(update(model), updates)
+
+        touched_workouts.update(ids['workout'][uuid] for uuid in self.pending['workout'])
+        touched_workouts.update(values['workout_id'] for values in self.pending['workout_exercise'].values())
+        touched_wes.update(values['workout_exercise_id'] for values in self.pending['exercise_set'].values())
+        self._recompute_aggregates(touched_workouts, touched_wes)
+
+        link_best_sets(best_sets, ids['exercise_set'])
+        recompute_personal_bests(self.user_id, self.stale_records)
+
+        days = self._touched_days()
+        if days:
+            refresh_daily_progress(self.user_id, days)
+
+    def _touched_days(self) -> Set:
+        """Jours dont les cumuls de progression changent (séances complétées avant/après)"""
+        return {
+            workout_day(snapshot['workout_date'])
+            for change in self.workout_changes.values()
+            for snapshot in change
+            if snapshot and snapshot['is_completed']
+        }
+
+    def _detect_personal_records(self, ids: Dict) -> Dict:
+        """Statut PR des séries du lot, comparé aux records de l'exercice"""
+        workout_exercises = self.pending['workout_exercise']
+
+        sets = []
+        for uuid, values in self.pending['exercise_set'].items():
+            parent = values['workout_exercise_id']
+            if parent in workout_exercises:
+                exercise_id = workout_exercises[parent]['exercise_id']
+            else:
+                exercise_id = self.existing['workout_exercise'][parent].exercise_id
+
+            existing = self.existing['exercise_set'].get(uuid)
+            sets.append({
+                'uuid': uuid,
+                'id': existing.id if existing is not None else None,
+                'exercise_id': exercise_id,
+                'values': values
+            })
+
+        return detect_personal_records(self.user_id, sets)
+
+    def _collect_stale_records(self) -> None:
+        """
+        Exercices dont un record a pu baisser (série supprimée ou modifiée,
+        exercice de séance déplacé) : leurs records seront recalculés
+        """
+        stale = self.stale_records
+        we_ids = set()
+
+        for entity_type, row in self.deleted:
+            if entity_type == 'workout_exercise':
+                stale.add(row.exercise_id)
+            elif entity_type == 'exercise_set':
+                we_ids.add(row.workout_exercise_id)
+
+        for uuid, values in self.pending['workout_exercise'].items():
+            row = self.existing['workout_exercise'].get(uuid)
+            if row is not None:
+                stale.add(row.exercise_id)
+
+        for uuid in self.pending['exercise_set']:
+            row = self.existing['exercise_set'].get(uuid)
+            if row is not None:
+                we_ids.add(row.workout_exercise_id)
+
+        workout_ids = [row.id for entity_type, row in self.deleted if entity_type == 'workout']
+        for chunk in _chunked(workout_ids):
+            stale.update(db.session.scalars(
+                select(WorkoutExercise.exercise_id).distinct().where(WorkoutExercise.workout_id.in_(chunk))
+            ))
+        for chunk in _chunked(sorted(we_ids)):
+            stale.update(db.session.scalars(
+                select(WorkoutExercise.exercise_id).distinct().where(WorkoutExercise.id.in_(chunk))
+            ))
+
+    def _recompute_aggregates(self, workout_ids: Set[int], workout_exercise_ids: Set[int]) -> None:
+        """
+        Recalcule côté serveur les agrégats des séances touchées par le lot
+        (mêmes règles que services.logic.update_workout_stats : séries
+        d'échauffement exclues, XP = volume × multiplicateur par exercice)
+
+        Une agrégation GROUP BY par paquet de séances, sans parcourir les
+        relations ORM ; les valeurs envoyées par le client sont ignorées.
+        Les snapshots workout_changes sont mis à jour avec le résultat, y
+        compris pour les séances modifiées seulement via leurs enfants.
+        """
+        if workout_exercise_ids:
+            for chunk in _chunked(sorted(workout_exercise_ids)):
+                workout_ids.update(db.session.scalars(
+                    select(WorkoutExercise.workout_id).distinct().where(WorkoutExercise.id.in_(chunk))
+                ))
+
+        workouts, exercises = {}, defaultdict(list)
+        for chunk in _chunked(sorted(workout_ids)):
+            for row in db.session.execute(_aggregates_query(chunk)):
+                workouts[row.workout_id] = row
+                if row.workout_exercise_id is not None:
+                    exercises[row.workout_id].append(row)
+
+        workout_updates, exercise_updates = [], []
+        for workout_id, workout in workouts.items():
+            total_volume, xp_earned = 0.0, 0
+
+            for row in exercises[workout_id]:
+                volume = round(row.volume or 0.0, 2)
+                best_1rm = round(row.best_1rm, 2) if row.best_1rm else None
+                exercise_updates.append({
+                    'id': row.workout_exercise_id,
+                    'total_sets': row.sets,
+                    'total_reps': row.reps or 0,
+                    'total_volume': volume,
+                    'estimated_1rm': best_1rm,
+                    'change_seq': self.change_seq
+                })
+                total_volume += volume
+                xp_earned += calculate_xp(volume, row.xp_multiplier if row.xp_multiplier is not None else 1.0)
+
+            after = {'total_volume': round(total_volume, 2), 'xp_earned': xp_earned}
+            workout_updates.append({'id': workout_id, **after, 'change_seq': self.change_seq})
+
+            change = self.workout_changes.get(workout.uuid)
+            if change is None:
+                before = {field: getattr(workout, field) for field in WORKOUT_SNAPSHOT_FIELDS}
+                change = self.workout_changes[workout.uuid] = [before, dict(before)]
+            change[1].update(after)
+
+        if exercise_updates:
+            db.session.execute(update(WorkoutExercise), exercise_updates)
+        if workout_updates:
+            db.session.execute(update(Workout), workout_updates)
+
+    def _insert_rows(self, model, rows: List[Dict]) -> Dict[str, int]:
+        """
+        INSERT groupé des nouvelles lignes, retourne {uuid: id}
+        - INSERT ... RETURNING quand le moteur le permet en executemany
+          (SQLite >= 3.35, PostgreSQL) : pas de relecture des IDs
+        - COPY sur PostgreSQL pour les gros imports (bulk_copy)
+        """
+        dialect = db.session.get_bind().dialect
+
+        if self.bulk_copy and dialect.name == 'postgresql' and len(rows) >= COPY_MIN_ROWS:
+            copy_rows(db.session, model, rows)
+        elif dialect.insert_executemany_returning:
+            result = db.session.execute(insert(model).returning(model.uuid, model.id), rows)
+            return dict(result.all())
+        else:
+            db.session.execute(insert(model), rows)
+
+        return load_ids_by_uuid(model, (values['uuid'] for values in rows))
+
+    def _record_tombstones(self) -> Dict[str, Dict[int, str]]:
+        """
+        Crée les tombstones des lignes supprimées et de leurs enfants en cascade
+        Retourne les lignes à supprimer : entity_type -> {id: uuid}
+        """
+        rows = {entity_type: {} for entity_type in ENTITY_ORDER}
+        for entity_type, row in self.deleted:
+            rows[entity_type][row.id] = row.uuid
+
+        for chunk in _chunked(sorted(rows['workout'])):
+            rows['workout_exercise'].update(db.session.execute(
+                select(WorkoutExercise.id, WorkoutExercise.uuid).where(WorkoutExercise.workout_id.in_(chunk))
+            ).all())
+        for chunk in _chunked(sorted(rows['workout_exercise'])):
+            rows['exercise_set'].update(db.session.execute(
+                select(ExerciseSet.id, ExerciseSet.uuid).where(ExerciseSet.workout_exercise_id.in_(chunk))
+            ).all())
+
+        for entity_type, deleted in rows.items():
+            self.deleted_counts[entity_type] += len(deleted)
+
+        db.session.execute(insert(SyncTombstone), [
+            {
+                'user_id': self.user_id,
+                'entity_type': entity_type,
+                'entity_uuid': uuid,
+                'change_seq': self.change_seq
+            }
+            for entity_type, deleted in rows.items()
+            for uuid in deleted.values()
+        ])
+        return rows
+
+    def _delete_rows(self, rows: Dict[str, Dict[int, str]]) -> None:
+        """
+        Supprime les lignes et leurs enfants avec un DELETE ... WHERE id IN
+        par table (enfants avant parents), sans charger les relations ORM
+        """
+        for entity_type in reversed(ENTITY_ORDER):
+            model = ENTITY_MODELS[entity_type]
+            for chunk in _chunked(sorted(rows[entity_type])):
+                db.session.execute(delete(model).where(model.id.in_(chunk)))
+
+    def _summarize(self) -> None:
+        """Capture l'état avant/après des séances touchées (avant écriture)"""
+
+        def snapshot(source):
+            if isinstance(source, dict):
+                return {field: source.get(field) for field in WORKOUT_SNAPSHOT_FIELDS}
+            return {field: getattr(source, field) for field in WORKOUT_SNAPSHOT_FIELDS}
+
+        for entity_type, row in self.deleted:
+            if entity_type == 'workout':
+                self.workout_changes[row.uuid] = [snapshot(row), None]
+
+        for uuid, values in self.pending['workout'].items():
+            row = self.existing['workout'].get(uuid)
+            self.workout_changes[uuid] = [snapshot(row) if row is not None else None, snapshot(values)]
+
+        self.may_lower_maxima = bool(self.deleted) or any(
+            uuid in self.existing[entity_type]
+            for entity_type in ('workout_exercise', 'exercise_set')
+            for uuid in self.pending[entity_type]
+        )
+
+    def xp_delta(self) -> int:
+        """Variation de l'XP total due au lot (séances complétées avant/après)"""
+        delta = 0
+        for before, after in self.workout_changes.values():
+            for snapshot, sign in ((before, -1), (after, 1)):
+                if snapshot and snapshot['is_completed']:
+                    delta += sign * int(snapshot['xp_earned'] or 0)
+        return delta
+
+    def _live(self, entity_type: str, uuid: str) -> bool:
+        """Vrai si l'entité existe (en base ou dans ce lot)"""
+        return bool(uuid) and (uuid in self.existing[entity_type] or uuid in self.pending[entity_type])
+
+    def _delete(self, entity_type: str, uuid: str, cascaded: bool = False) -> None:
+        """Retire une entité du lot et planifie sa suppression en base"""
+        self.pending[entity_type].pop(uuid, None)
+        row = self.existing[entity_type].pop(uuid, None)
+        if row is None:
+            return
+
+        # Les enfants sont supprimés avec le parent (_record_tombstones)
+        if not cascaded:
+            self.deleted.append((entity_type, row))
+
+        # Oublier les enfants préchargés pour ne plus les référencer
+        if entity_type in CHILDREN:
+            child_type, column = CHILDREN[entity_type]
+            for child_uuid, child in list(self.existing[child_type].items()):
+                if getattr(child, column) == row.id:
+                    self._delete(child_type, child_uuid, cascaded=True)
+
+    # ═══════════════════════════════════════════════════════════
+    # HANDLERS - Un par type d'entité
+    # ═══════════════════════════════════════════════════════════
+
+    def _sync_exercise(self, uuid: str, action: str, data: Dict) -> str:
+        """Synchronise un exercice personnalisé"""
+        if action == 'delete':
+            exercise = self.existing['exercise'].get(uuid)
+            if exercise is None or exercise.is_custom:
+                self._delete('exercise', uuid)
+            return 'deleted'
+
+        if not data.get('name') or not data.get('category'):
+            raise ValueError('name et category requis')
+
+        values = {
+            'name': data.get('name'),
+            'category': data.get('category'),
+            'muscle_group': data.get('muscle_group'),
+            'xp_multiplier': data.get('xp_multiplier', 1.0),
+            'stat_type': data.get('stat_type', 'strength'),
+            'is_custom': data.get('is_custom', True),
+            'is_archived': data.get('is_archived', False),
+            'updated_at': datetime.utcnow(),
+            'change_seq': self.change_seq
+        }
+        if uuid not in self.existing['exercise']:
+            values['user_id'] = self.user_id
+
+        self.pending['exercise'][uuid] = values
+        return 'synced'
+
+    def _sync_workout(self, uuid: str, action: str, data: Dict) -> str:
+        """Synchronise une séance"""
+        if action == 'delete':
+            self._delete('workout', uuid)
+            return 'deleted'
+
+        if not data.get('workout_date'):
+            raise ValueError('workout_date manquant')
+
+        values = {
+            'name': data.get('name'),
+            'workout_date': datetime.fromisoformat(data['workout_date'].replace('Z', '+00:00')),
+            'duration_minutes': data.get('duration_minutes'),
+            'is_completed': data.get('is_completed', False),
+            'notes': data.get('notes'),
+            'updated_at': datetime.utcnow(),
+            'change_seq': self.change_seq
+        }
+        if uuid not in self.existing['workout']:
+            values['user_id'] = self.user_id
+
+        self.pending['workout'][uuid] = values
+        return 'synced'
+
+    def _sync_workout_exercise(self, uuid: str, action: str, data: Dict) -> str:
+        """Synchronise un exercice dans une séance"""
+        if action == 'delete':
+            self._delete('workout_exercise', uuid)
+            return 'deleted'
+
+        # Trouver la séance et l'exercice (en base ou dans ce lot)
+        workout_uuid = data.get('workout_uuid')
+        exercise_uuid = data.get('exercise_uuid')
+
+        if not self._live('workout', workout_uuid) or not self._live('exercise', exercise_uuid):
+            raise ValueError('Workout ou Exercise introuvable')
+
+        self.pending['workout_exercise'][uuid] = {
+            'workout_id': workout_uuid,
+            'exercise_id': exercise_uuid,
+            'order_index': data.get('order_index', 0),
+            'notes': data.get('notes'),
+            'change_seq': self.change_seq
+        }
+        return 'synced'
+
+    def _sync_exercise_set(self, uuid: str, action: str, data: Dict) -> str:
+        """Synchronise une série individuelle"""
+        if action == 'delete':
+            self._delete('exercise_set', uuid)
+            return 'deleted'
+
+        # Trouver le WorkoutExercise parent
+        workout_exercise_uuid = data.get('workout_exercise_uuid')
+        if not self._live('workout_exercise', workout_exercise_uuid):
+            raise ValueError('WorkoutExercise introuvable')
+
+        for field in ('set_number', 'weight_kg', 'reps'):
+            if data.get(field) is None:
+                raise ValueError(f'{field} manquant')
+
+        weight_kg = data.get('weight_kg')
+        reps = data.get('reps')
+
+        self.pending['exercise_set'][uuid] = {
+            'workout_exercise_id': workout_exercise_uuid,
+            'set_number': data.get('set_number'),
+            'weight_kg': weight_kg,
+            'reps': reps,
+            'rpe': data.get('rpe'),
+            'is_warmup': data.get('is_warmup', False),
+            'rest_seconds': data.get('rest_seconds'),
+            # Calculs automatiques
+            'volume': calculate_volume(weight_kg, reps),
+            'estimated_1rm': calculate_1rm(weight_kg, reps),
+            'change_seq': self.change_seq
+        }
+        return 'synced'
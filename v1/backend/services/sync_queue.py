@@ -0,0 +1,309 @@
+"""
+FitnessRPG - Push asynchrone (SyncQueue)
+Les éléments d'un push sont enregistrés tels quels dans sync_queue et le
+client reçoit aussitôt un identifiant de lot ; un pool de threads local
+applique ensuite les lots un par un (PushBatch, agrégats, XP)
+"""
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import func, insert, or_, select, update
+
+from models import db, SyncQueue, User
+from services.logic import apply_user_xp_delta
+from services.sync_engine import PushBatch
+from services.user_stats import apply_push_to_user_stats
+from utils.response_cache import invalidate_user_cache
+
+
+# ═══════════════════════════════════════════════════════════
+# APPLICATION D'UN PUSH (synchrone ou depuis la file)
+# ═══════════════════════════════════════════════════════════
+
+def apply_push(user: User, items: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Applique un push complet dans la session courante (sans commit) :
+    éléments, agrégats du dashboard, XP et niveau, date de dernière sync
+    """
+    batch = PushBatch(user, items)
+    results, errors = batch.apply()
+
+    apply_push_to_user_stats(user.id, batch)
+    apply_user_xp_delta(user, batch.xp_delta())
+    user.last_sync = datetime.utcnow()
+
+    return results, errors
+
+
+# ═══════════════════════════════════════════════════════════
+# FILE D'ATTENTE
+# ═══════════════════════════════════════════════════════════
+
+def enqueue_push(user_id: int, items: List[Dict]) -> str:
+    """
+    Enregistre les éléments d'un push (un INSERT groupé) et valide
+    Retourne l'identifiant du lot, à interroger sur /api/sync/push/<batch_id>
+    """
+    batch_id = str(uuid.uuid4())
+
+    if items:
+        db.session.execute(insert(SyncQueue), [
+            {
+                'batch_id': batch_id,
+                'user_id': user_id,
+                'entity_type': str(item.get('entity_type') or ''),
+                'entity_uuid': str(item.get('entity_uuid') or ''),
+                'action': str(item.get('action') or ''),
+                'sync_status': 'pending',
+                'payload': json.dumps(item),
+                'created_at': datetime.utcnow()
+            }
+            for item in items
+        ])
+    db.session.commit()
+
+    return batch_id
+
+
+def claim_next_batch() -> Optional[str]:
+    """
+    Réserve le plus ancien lot en attente (pending -> processing)
+    Les lots d'un utilisateur dont un lot est déjà en cours attendent leur
+    tour : les push d'un même client sont appliqués dans l'ordre. Le
+    UPDATE conditionnel garantit qu'un seul worker obtient le lot ; un lot
+    dont le bail a expiré (worker arrêté) est d'abord remis en attente.
+    """
+    busy_users = select(SyncQueue.user_id).where(SyncQueue.sync_status == 'processing')
+    requeue_expired_batches()
+
+    while True:
+        batch_id = db.session.execute(
+            select(SyncQueue.batch_id).where(
+                SyncQueue.sync_status == 'pending',
+                SyncQueue.user_id.not_in(busy_users)
+            ).order_by(SyncQueue.id).limit(1)
+        ).scalar()
+        if batch_id is None:
+            db.session.commit()
+            return None
+
+        claimed = db.session.execute(
+            update(SyncQueue).where(
+                SyncQueue.batch_id == batch_id,
+                SyncQueue.sync_status == 'pending'
+            ).values(sync_status='processing', claimed_at=datetime.utcnow()),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+
+        if claimed:
+            return batch_id
+
+
+def process_batch(batch_id: str) -> None:
+    """
+    Applique un lot réservé dans une seule transaction, avec le statut
+    de chacune de ses lignes (synced, ou failed avec le message d'erreur)
+    """
+    # Lot remis en attente ou terminé ailleurs entre-temps (bail expiré) : rien à faire
+    rows = db.session.execute(
+        select(SyncQueue.id, SyncQueue.user_id, SyncQueue.entity_uuid, SyncQueue.payload)
+        .where(SyncQueue.batch_id == batch_id, SyncQueue.sync_status == 'processing')
+        .order_by(SyncQueue.id)
+    ).all()
+    if not rows:
+        return
+
+    user = db.session.get(User, rows[0].user_id)
+    try:
+        if user is None:
+            raise ValueError('Utilisateur introuvable')
+        _, errors = apply_push(user, [json.loads(row.payload) for row in rows])
+    except Exception as e:
+        db.session.rollback()
+        _mark_rows(rows, {row.entity_uuid: str(e) for row in rows})
+        db.session.commit()
+        return
+
+    _mark_rows(rows, {error['entity_uuid']: error['error'] for error in errors})
+    db.session.commit()
+
+    # Les réponses de stats en cache ne reflètent plus les données
+    invalidate_user_cache(user.uuid)
+
+
+def drain_sync_queue(max_batches: Optional[int] = None) -> int:
+    """Applique les lots en attente jusqu'à vider la file ; retourne le nombre de lots"""
+    processed = 0
+    while max_batches is None or processed < max_batches:
+        batch_id = claim_next_batch()
+        if batch_id is None:
+            break
+        process_batch(batch_id)
+        processed += 1
+    return processed
+
+
+def requeue_expired_batches() -> int:
+    """Remet en attente les lots en cours dont le bail a expiré (sans commit)"""
+    expired = datetime.utcnow() - timedelta(seconds=current_app.config['SYNC_QUEUE_LEASE_SECONDS'])
+    return db.session.execute(
+        update(SyncQueue).where(
+            SyncQueue.sync_status == 'processing',
+            or_(SyncQueue.claimed_at.is_(None), SyncQueue.claimed_at < expired)
+        ).values(sync_status='pending', claimed_at=None),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+
+
+def requeue_stalled_batches() -> int:
+    """Remet en attente tous les lots en cours, sans attendre la fin de leur bail"""
+    count = db.session.execute(
+        update(SyncQueue).where(SyncQueue.sync_status == 'processing')
+        .values(sync_status='pending', claimed_at=None),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    db.session.commit()
+    return count
+
+
+def _mark_rows(rows, failures: Dict[str, str]) -> None:
+    now = datetime.utcnow()
+    db.session.execute(update(SyncQueue), [
+        {
+            'id': row.id,
+            'sync_status': 'failed' if row.entity_uuid in failures else 'synced',
+            'error_message': failures.get(row.entity_uuid),
+            'synced_at': now
+        }
+        for row in rows
+    ])
+
+
+# ═══════════════════════════════════════════════════════════
+# ÉTAT D'UN LOT
+# ═══════════════════════════════════════════════════════════
+
+def get_batch_status(user_id: int, batch_id: str) -> Optional[Dict]:
+    """
+    État d'un lot de l'utilisateur (None s'il n'existe pas ou appartient
+    à un autre utilisateur) : une requête groupée par statut, plus le
+    détail des erreurs une fois le lot terminé
+    """
+    counts = db.session.execute(
+        select(SyncQueue.sync_status, func.count(), func.max(SyncQueue.synced_at))
+        .where(SyncQueue.batch_id == batch_id, SyncQueue.user_id == user_id)
+        .group_by(SyncQueue.sync_status)
+    ).all()
+    if not counts:
+        return None
+
+    by_status = {status: count for status, count, _ in counts}
+    total = sum(by_status.values())
+    failed = by_status.get('failed', 0)
+
+    if by_status.get('processing'):
+        status = 'processing'
+    elif by_status.get('pending'):
+        status = 'pending'
+    elif failed == total:
+        status = 'failed'
+    elif failed:
+        status = 'partial'
+    else:
+        status = 'synced'
+
+    done = status not in ('pending', 'processing')
+    errors = []
+    if failed:
+        errors = [
+            {'entity_uuid': entity_uuid, 'error': message}
+            for entity_uuid, message in db.session.execute(
+                select(SyncQueue.entity_uuid, SyncQueue.error_message)
+                .where(SyncQueue.batch_id == batch_id, SyncQueue.sync_status == 'failed')
+                .order_by(SyncQueue.id)
+            )
+        ]
+
+    synced_at = max((at for _, _, at in counts if at is not None), default=None)
+    return {
+        'batch_id': batch_id,
+        'status': status,
+        'done': done,
+        'total': total,
+        'synced': by_status.get('synced', 0),
+        'errors': failed,
+        'error_details': errors or None,
+        'synced_at': synced_at.isoformat() if synced_at else None
+    }
+
+
+# ═══════════════════════════════════════════════════════════
+# WORKER (pool de threads local)
+# ═══════════════════════════════════════════════════════════
+
+class SyncQueueWorker:
+    """
+    Vide la file dans des threads du processus, réveillés à chaque push
+    asynchrone. Au plus `workers` threads appliquent des lots en même
+    temps ; un réveil reçu pendant un vidage relance un passage, aucun
+    lot n'est donc oublié. Avec workers=0, la file n'est vidée que par
+    `flask drain-sync-queue` (cron ou processus dédié).
+    """
+
+    def __init__(self, app, workers: int = 2):
+        self.app = app
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._requested = False
+        self._running = 0
+        self._pool = None
+
+    def notify(self) -> None:
+        if self.workers <= 0:
+            return
+        with self._lock:
+            self._requested = True
+            if self._running >= self.workers:
+                return
+            self._running += 1
+        self._executor().submit(self._run)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._requested:
+                    self._running -= 1
+                    return
+                self._requested = False
+
+            with self.app.app_context():
+                try:
+                    drain_sync_queue()
+                except Exception:
+                    self.app.logger.exception('Échec du vidage de la file de sync')
+                finally:
+                    db.session.remove()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Créé au premier usage : après le fork des workers gunicorn
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='sync-queue')
+            return self._pool
+
+
+def init_sync_worker(app) -> SyncQueueWorker:
+    """Crée le worker de la file de sync de l'application"""
+    worker = SyncQueueWorker(app, workers=app.config['SYNC_QUEUE_WORKERS'])
+    app.extensions['sync_queue_worker'] = worker
+    return worker
+
+
+def get_sync_worker() -> SyncQueueWorker:
+    return current_app.extensions['sync_queue_worker']
@@ -0,0 +1,248 @@
+"""
+FitnessRPG - Agrégats utilisateur (UserStats)
+Une ligne par utilisateur, maintenue à chaque push et reconstructible
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import joinedload
+
+from models import db, UserStats, Workout, WorkoutExercise, ExerciseSet
+
+# Jours lus par paquet pour le calcul de la série (arrêt au premier trou)
+STREAK_BATCH_SIZE = 64
+
+
+# ═══════════════════════════════════════════════════════════
+# LECTURE
+# ═══════════════════════════════════════════════════════════
+
+def get_user_stats(user_id: int) -> UserStats:
+    """
+    Retourne la ligne d'agrégats de l'utilisateur (une seule lecture)
+    La crée à la volée si elle n'existe pas encore, et recompte le mois
+    si la ligne date d'un mois précédent.
+    """
+    stats = UserStats.query.options(
+        joinedload(UserStats.best_1rm_exercise)
+    ).filter_by(user_id=user_id).first()
+
+    if stats is None:
+        stats = rebuild_user_stats(user_id)
+        db.session.commit()
+    elif stats.month_start != _month_start():
+        _recount_month(stats)
+        db.session.commit()
+
+    return stats
+
+
+# ═══════════════════════════════════════════════════════════
+# RECONSTRUCTION COMPLÈTE
+# ═══════════════════════════════════════════════════════════
+
+def rebuild_user_stats(user_id: int) -> UserStats:
+    """Recalcule tous les agrégats de l'utilisateur depuis l'historique"""
+    stats = UserStats.query.filter_by(user_id=user_id).first()
+    if stats is None:
+        stats = UserStats(user_id=user_id, stat_date=date.today())
+        db.session.add(stats)
+
+    total_workouts, total_volume = db.session.query(
+        func.count(Workout.id),
+        func.sum(Workout.total_volume)
+    ).filter_by(
+        user_id=user_id,
+        is_completed=True
+    ).one()
+
+    stats.total_workouts = total_workouts or 0
+    stats.total_volume = total_volume or 0
+    stats.total_sets = _user_sets_query(user_id).with_entities(func.count(ExerciseSet.id)).scalar() or 0
+
+    _recount_month(stats)
+    _recompute_maxima(stats)
+    _recompute_streak(stats)
+    _touch(stats)
+
+    return stats
+
+
+# ═══════════════════════════════════════════════════════════
+# MISE À JOUR INCRÉMENTALE (après un push)
+# ═══════════════════════════════════════════════════════════
+
+def apply_push_to_user_stats(user_id: int, batch) -> UserStats:
+    """
+    Répercute un PushBatch déjà écrit (flush) sur la ligne d'agrégats
+    Coût constant : deltas en mémoire + au plus une requête sur les
+    séries écrites par ce push (change_seq) ou, si un record a pu
+    baisser, un recalcul des maxima.
+    """
+    stats = UserStats.query.filter_by(user_id=user_id).first()
+    if stats is None:
+        # L'historique lu inclut déjà ce push
+        return rebuild_user_stats(user_id)
+
+    month_start = _month_start()
+    if stats.month_start != month_start:
+        # Le recomptage inclut déjà ce push
+        _recount_month(stats)
+        count_month = False
+    else:
+        count_month = True
+
+    # Pas d'autoflush : la ligne n'est écrite qu'une fois, au commit
+    with db.session.no_autoflush:
+        for before, after in batch.workout_changes.values():
+            for snapshot, sign in ((before, -1), (after, 1)):
+                if not snapshot or not snapshot['is_completed']:
+                    continue
+                stats.total_workouts += sign
+                stats.total_volume += sign * (snapshot['total_volume'] or 0)
+                if count_month and _naive(snapshot['workout_date']) >= _as_datetime(month_start):
+                    stats.workouts_this_month += sign
+
+        stats.total_sets += batch.inserted['exercise_set'] - batch.deleted_counts['exercise_set']
+
+        if batch.may_lower_maxima:
+            _recompute_maxima(stats)
+        else:
+            _raise_maxima(stats, batch.change_seq)
+
+        if any(
+            snapshot and snapshot['is_completed']
+            for change in batch.workout_changes.values()
+            for snapshot in change
+        ):
+            _recompute_streak(stats)
+
+        _touch(stats)
+
+    return stats
+
+
+# ═══════════════════════════════════════════════════════════
+# HELPERS
+# ═══════════════════════════════════════════════════════════
+
+def _user_sets_query(user_id: int):
+    """Séries de l'utilisateur (toutes séances)"""
+    return db.session.query(ExerciseSet).join(
+        WorkoutExercise, ExerciseSet.workout_exercise_id == WorkoutExercise.id
+    ).join(
+        Workout, WorkoutExercise.workout_id == Workout.id
+    ).filter(
+        Workout.user_id == user_id
+    )
+
+
+def _top_set(query) -> Optional[tuple]:
+    """(1RM, exercise_id) de la meilleure série d'une requête de séries"""
+    return query.with_entities(
+        ExerciseSet.estimated_1rm,
+        WorkoutExercise.exercise_id
+    ).filter(
+        ExerciseSet.estimated_1rm.isnot(None)
+    ).order_by(desc(ExerciseSet.estimated_1rm)).first()
+
+
+def _recompute_maxima(stats: UserStats) -> None:
+    """Recalcule meilleur 1RM et charge max sur tout l'historique"""
+    sets = _user_sets_query(stats.user_id)
+    top = _top_set(sets)
+
+    stats.best_1rm, stats.best_1rm_exercise_id = top if top else (None, None)
+    stats.heaviest_lift = sets.with_entities(func.max(ExerciseSet.weight_kg)).scalar()
+
+
+def _raise_maxima(stats: UserStats, change_seq: int) -> None:
+    """Monte les records si une série écrite par ce push les dépasse"""
+    written = _user_sets_query(stats.user_id).filter(ExerciseSet.change_seq == change_seq)
+
+    top = _top_set(written)
+    if top and (stats.best_1rm is None or top[0] > stats.best_1rm):
+        stats.best_1rm, stats.best_1rm_exercise_id = top
+
+    heaviest = written.with_entities(func.max(ExerciseSet.weight_kg)).scalar()
+    if heaviest is not None and (stats.heaviest_lift is None or heaviest > stats.heaviest_lift):
+        stats.heaviest_lift = heaviest
+
+
+def _recompute_streak(stats: UserStats) -> None:
+    """
+    Recalcule la série de jours consécutifs terminée au dernier jour de séance
+    Une ligne par jour (DISTINCT), lue du plus récent au plus ancien
+    jusqu'au premier trou : le coût dépend de la série, pas de l'historique.
+    """
+    day = func.date(Workout.workout_date)
+    days = db.session.scalars(
+        select(day).distinct().where(
+            Workout.user_id == stats.user_id,
+            Workout.is_completed == True
+        ).order_by(day.desc()).execution_options(yield_per=STREAK_BATCH_SIZE)
+    )
+
+    streak, last_date, previous = 0, None, None
+    for value in days:
+        current = date.fromisoformat(value) if isinstance(value, str) else value
+        if previous is not None and previous - current != timedelta(days=1):
+            break
+        streak += 1
+        last_date = last_date or current
+        previous = current
+    days.close()
+
+    stats.streak_days = streak
+    stats.streak_last_date = last_date
+
+
+def _recount_month(stats: UserStats) -> None:
+    """Recompte les séances complétées du mois en cours"""
+    month_start = _month_start()
+
+    stats.workouts_this_month = Workout.query.filter(
+        Workout.user_id == stats.user_id,
+        Workout.is_completed == True,
+        Workout.workout_date >= _as_datetime(month_start)
+    ).count()
+    stats.month_start = month_start
+
+
+def _touch(stats: UserStats) -> None:
+    stats.stat_date = date.today()
+    stats.calculated_at = datetime.now(timezone.utc)
+
+
+def _month_start() -> date:
+    return date.today().replace(day=1)
+
+
+def _as_datetime(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day)
+
+
+def _naive(value: datetime) -> datetime:
+    """Les dates envoyées par le client sont aware, celles lues en base naïves"""
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+
+def current_streak(stats: UserStats) -> int:
+    """Série en cours : la dernière séance doit dater d'aujourd'hui ou d'hier"""
+    if not stats.streak_last_date:
+        return 0
+    if (date.today() - stats.streak_last_date).days > 1:
+        return 0
+    return stats.streak_days or 0
+
+
+def serialize_best_1rm(stats: UserStats) -> Optional[Dict]:
+    """Meilleur 1RM au format du dashboard"""
+    if stats.best_1rm is None:
+        return None
+
+    return {
+        'value': round(stats.best_1rm, 2),
+        'exercise': stats.best_1rm_exercise.name if stats.best_1rm_exercise else None
+    }
@@ -7,16 +7,25 @@ import uuid
 import jwt
 from datetime import datetime, timezone
 from functools import wraps
+from typing import NamedTuple, Optional
 from flask import request, jsonify, current_app, Blueprint
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
-
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 
 from models import db, User
+from services.refresh_tokens import (
+    issue_refresh_token, revoke_refresh_token, revoke_user_refresh_tokens, rotate_refresh_token
+)
+from utils.passwords import PasswordHasherBusy, get_password_service, hash_password
+from utils.response_cache import MemoryCache
+
 
-# Initialiser le PasswordHasher Argon2
-ph = PasswordHasher()
+class AuthUser(NamedTuple):
+    """Utilisateur authentifié passé aux routes (sans objet ORM)"""
+    id: int
+    uuid: str
+    username: str
+    token_version: int
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -62,8 +71,8 @@ def register():
         db.session.rollback()
         return jsonify({'error': 'Ce nom d\'utilisateur ou cet email est déjà utilisé'}), 409
 
-    # Générer un token
-    token = generate_token(user_uuid, username)
+    # Générer les tokens (accès + refresh)
+    tokens = issue_session_tokens(new_user)
 
     return jsonify({
         'success': True,
@@ -75,7 +84,7 @@ def register():
             'level': 1,
             'total_xp': 0
         },
-        'token': token
+        **tokens
     }), 201
 
 
@@ -95,11 +104,16 @@ def login():
     # Trouver l'utilisateur
     user = User.query.filter_by(username=username).first()
 
-    if not user or not verify_password(user.password_hash, password):
+    passwords = get_password_service()
+    if not user or not passwords.verify(user.password_hash, password):
         return jsonify({'error': 'Identifiants incorrects'}), 401
 
-    # Générer un token
-    token = generate_token(user.uuid, user.username)
+    # Paramètres Argon2 changés depuis le hachage : on en profite pour rehacher
+    if passwords.needs_rehash(user.password_hash):
+        user.password_hash = passwords.hash(password)
+
+    # Générer les tokens (accès + refresh)
+    tokens = issue_session_tokens(user)
 
     return jsonify({
         'success': True,
@@ -111,28 +125,21 @@ def login():
             'level': user.current_level,
             'total_xp': user.total_xp
         },
-        'token': token
+        **tokens
     }), 200
 
 
-def hash_password(password: str) -> str:
-    # On demande à l'outil de créer l'empreinte sécurisée (le hash)
-    return ph.hash(password)
-
-
-def verify_password(password_hash: str, password: str) -> bool:
-    try:
-        ph.verify(password_hash, password)
-        return True
-    except VerifyMismatchError:
-        return False
-
-
-def generate_token(user_uuid: str, username: str) -> str:
-    """Génère un JWT token pour un utilisateur"""
+def generate_token(user: User) -> str:
+    """
+    Génère un JWT token pour un utilisateur
+    Il porte l'ID (plus de recherche par UUID à chaque requête) et la
+    version des tokens de l'utilisateur, qui permet de les révoquer.
+    """
     payload = {
-        'user_uuid': user_uuid,
-        'username': username,
+        'user_id': user.id,
+        'user_uuid': user.uuid,
+        'username': user.username,
+        'token_version': user.token_version or 0,
         'exp': datetime.now(timezone.utc) + current_app.config['JWT_ACCESS_TOKEN_EXPIRES'],
         'iat': datetime.now(timezone.utc)
     }
@@ -146,6 +153,19 @@ def generate_token(user_uuid: str, username: str) -> str:
     return token
 
 
+def issue_session_tokens(user: User) -> dict:
+    """Token d'accès (courte durée) et refresh token d'une nouvelle session (commit inclus)"""
+    refresh_token = issue_refresh_token(user.id)
+    token = generate_token(user)
+    db.session.commit()
+
+    return {
+        'token': token,
+        'refresh_token': refresh_token,
+        'expires_in': int(current_app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+    }
+
+
 def decode_token(token: str) -> dict:
     """Décode et valide un JWT token"""
     try:
@@ -161,8 +181,70 @@ def decode_token(token: str) -> dict:
         raise ValueError('Token invalide')
 
 
+# ═══════════════════════════════════════════════════════════
+# RÉSOLUTION DE L'UTILISATEUR (cache TTL par processus)
+# ═══════════════════════════════════════════════════════════
+
+def _auth_cache() -> MemoryCache:
+    cache = current_app.extensions.get('auth_cache')
+    if cache is None:
+        cache = current_app.extensions['auth_cache'] = MemoryCache(current_app.config['AUTH_CACHE_MAX_ENTRIES'])
+    return cache
+
+
+def load_auth_user(user_id: int) -> Optional[AuthUser]:
+    """
+    Utilisateur d'un token, lu au plus une fois toutes les AUTH_CACHE_TTL
+    secondes (une requête sur la clé primaire, sans objet ORM)
+    """
+    cache = _auth_cache()
+    key = str(user_id)
+    auth_user = cache.get(key)
+    if auth_user is None:
+        row = db.session.execute(
+            select(User.id, User.uuid, User.username, User.token_version).where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+        auth_user = AuthUser(row.id, row.uuid, row.username, row.token_version or 0)
+        cache.set(key, auth_user, current_app.config['AUTH_CACHE_TTL'])
+    return auth_user
+
+
+def authenticate(token: str) -> AuthUser:
+    """Valide le token et sa version, retourne l'utilisateur (ValueError sinon)"""
+    payload = decode_token(token)
+    if not isinstance(payload.get('user_id'), int):
+        # Token émis avant l'ajout de l'ID : reconnexion nécessaire
+        raise ValueError('Token invalide')
+
+    auth_user = load_auth_user(payload['user_id'])
+    if auth_user is None:
+        raise ValueError('Utilisateur introuvable')
+    if payload.get('token_version') != auth_user.token_version:
+        raise ValueError('Token révoqué')
+    return auth_user
+
+
+def revoke_tokens(user_id: int) -> None:
+    """
+    Invalide tous les tokens émis pour l'utilisateur (accès et refresh)
+    Effet immédiat dans ce processus ; les autres workers le voient à
+    l'expiration de leur cache (AUTH_CACHE_TTL au plus).
+    """
+    db.session.execute(
+        update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+    )
+    revoke_user_refresh_tokens(user_id)
+    _auth_cache().delete(str(user_id))
+
+
 def token_required(f):
-    """Décorateur pour protéger les routes avec JWT"""
+    """
+    Décorateur pour protéger les routes avec JWT
+    La route reçoit un AuthUser (id, uuid, username) : pas de requête
+    sur la table users tant que l'utilisateur est dans le cache.
+    """
 
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -181,12 +263,7 @@ def token_required(f):
             return jsonify({'error': 'Token manquant'}), 401
 
         try:
-            # Décoder le token
-            payload = decode_token(token)
-            current_user = {
-                'uuid': payload['user_uuid'],
-                'username': payload['username']
-            }
+            current_user = authenticate(token)
         except ValueError as e:
             return jsonify({'error': str(e)}), 401
 
@@ -207,11 +284,7 @@ def optional_token(f):
             auth_header = request.headers['Authorization']
             try:
                 token = auth_header.split(' ')[1]
-                payload = decode_token(token)
-                current_user = {
-                    'uuid': payload['user_uuid'],
-                    'username': payload['username']
-                }
+                current_user = authenticate(token)
             except (IndexError, ValueError):
                 pass  # Token invalide, mais c'est optionnel
 
@@ -220,6 +293,64 @@ def optional_token(f):
     return decorated
 
 
+@auth_bp.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(error):
+    """Rafale de connexions : le client retente au lieu d'occuper un worker"""
+    return jsonify({'error': str(error)}), 503, {'Retry-After': '1'}
+
+
+@auth_bp.route('/refresh', methods=['POST'])
+def refresh():
+    """
+    Échange un refresh token contre un nouveau token d'accès et un nouveau
+    refresh token (rotation) : ni mot de passe ni Argon2
+    Body: { refresh_token }
+    """
+    data = request.get_json(silent=True) or {}
+    if not data.get('refresh_token'):
+        return jsonify({'error': 'refresh_token requis'}), 400
+
+    try:
+        user, refresh_token = rotate_refresh_token(data['refresh_token'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 401
+
+    # Token d'accès signé avant le commit (l'utilisateur est déjà chargé)
+    token = generate_token(user)
+    db.session.commit()
+
+    return jsonify({
+        'success': True,
+        'token': token,
+        'refresh_token': refresh_token,
+        'expires_in': int(current_app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+    }), 200
+
+
+@auth_bp.route('/logout', methods=['POST'])
+def logout():
+    """Déconnecte cet appareil : sa session de refresh tokens est révoquée"""
+    data = request.get_json(silent=True) or {}
+    if data.get('refresh_token'):
+        revoke_refresh_token(data['refresh_token'])
+        db.session.commit()
+
+    return jsonify({'success': True}), 200
+
+
+@auth_bp.route('/logout-all', methods=['POST'])
+@token_required
+def logout_all(current_user):
+    """Déconnecte tous les appareils : les tokens déjà émis sont révoqués"""
+    revoke_tokens(current_user.id)
+    db.session.commit()
+
+    return jsonify({
+        'success': True,
+        'message': 'Tous les tokens ont été révoqués'
+    }), 200
+
+
 def validate_registration_data(data: dict) -> tuple:
     """Valide les données d'inscription"""
     errors = []
@@ -3,6 +3,7 @@ FitnessRPG - Formules et Calculs (Python)
 Réplique exacte des formules JavaScript pour cohérence
 """
 import math
+from bisect import bisect_right
 from typing import Dict, List, Optional
 
 # ═══════════════════════════════════════════════════════════
@@ -32,17 +33,25 @@ def get_xp_for_level(level: int) -> int:
     return int(RPG_CONFIG['XP_BASE'] * math.pow(level, RPG_CONFIG['XP_EXPONENT']))
 
 
+# Seuils d'XP précalculés : LEVEL_XP_THRESHOLDS[i] = XP du niveau i + 1
+# (jusqu'à MAX_LEVEL + 1 pour connaître l'XP du prochain niveau au maximum)
+LEVEL_XP_THRESHOLDS = [
+    get_xp_for_level(level) for level in range(1, RPG_CONFIG['MAX_LEVEL'] + 2)
+]
+
+
+def get_level_for_xp(total_xp: int) -> int:
+    """Niveau atteint pour un total d'XP (recherche dichotomique)"""
+    level = bisect_right(LEVEL_XP_THRESHOLDS, total_xp)
+    return max(1, min(level, RPG_CONFIG['MAX_LEVEL']))
+
+
 def calculate_level(total_xp: int) -> Dict:
     """Calcule le niveau actuel en fonction de l'XP total"""
-    level = 1
-    max_level = RPG_CONFIG['MAX_LEVEL']
-
-    # Trouver le niveau actuel
-    while level < max_level and total_xp >= get_xp_for_level(level + 1):
-        level += 1
+    level = get_level_for_xp(total_xp)
 
-    xp_for_current_level = get_xp_for_level(level)
-    xp_for_next_level = get_xp_for_level(level + 1)
+    xp_for_current_level = LEVEL_XP_THRESHOLDS[level - 1]
+    xp_for_next_level = LEVEL_XP_THRESHOLDS[level]
     xp_in_current_level = total_xp - xp_for_current_level
     xp_needed_for_next = xp_for_next_level - xp_for_current_level
 
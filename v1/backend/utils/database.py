@@ -0,0 +1,195 @@
+"""
+FitnessRPG - Réglages de la base de données
+PRAGMAs SQLite appliqués à chaque connexion, mise à niveau des bases SQLite
+existantes, COPY PostgreSQL et diagnostic
+"""
+import io
+from datetime import date, datetime
+from typing import Dict, List
+
+from sqlalchemy import event, inspect, literal
+from sqlalchemy.engine import Engine
+
+# PRAGMAs remontés par le diagnostic, qu'ils soient configurés ou non
+REPORTED_PRAGMAS = (
+    'journal_mode',
+    'synchronous',
+    'busy_timeout',
+    'foreign_keys',
+    'cache_size',
+    'mmap_size',
+)
+
+
+# ═══════════════════════════════════════════════════════════
+# PRAGMAS À LA CONNEXION
+# ═══════════════════════════════════════════════════════════
+
+def install_sqlite_pragmas(engine: Engine, pragmas: Dict) -> None:
+    """
+    Applique les PRAGMAs à chaque nouvelle connexion SQLite du pool
+    (journal WAL, synchronous, busy_timeout, cache...). Sans effet sur
+    un autre moteur de base de données.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict) -> None:
+    """Exécute les PRAGMAs sur une connexion sqlite3 brute"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+# ═══════════════════════════════════════════════════════════
+# MISE À NIVEAU D'UNE BASE SQLITE EXISTANTE
+# ═══════════════════════════════════════════════════════════
+
+def add_missing_columns(engine: Engine, metadata) -> List[str]:
+    """
+    Ajoute aux tables déjà présentes les colonnes et index des modèles qui
+    leur manquent (create_all() ne crée que les tables absentes)
+    Ajout uniquement, avec ALTER TABLE ... ADD COLUMN : une colonne NOT NULL
+    reçoit sa valeur par défaut (change_seq à 0...), ou reste nullable si elle
+    n'en a pas, SQLite refusant l'ajout sinon. Sans effet hors SQLite, dont le
+    schéma est géré par les migrations. Retourne les colonnes ajoutées.
+    """
+    if engine.dialect.name != 'sqlite':
+        return []
+
+    added = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                connection.exec_driver_sql(
+                    f'ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, engine.dialect)}'
+                )
+                added.append(f'{table.name}.{column.name}')
+
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+    return added
+
+
+def _column_ddl(column, dialect) -> str:
+    """Définition d'une colonne pour ADD COLUMN (type, DEFAULT, NOT NULL)"""
+    ddl = f'{column.name} {column.type.compile(dialect=dialect)}'
+
+    default = None
+    if column.server_default is not None:
+        default = str(column.server_default.arg)
+        if not hasattr(column.server_default.arg, 'text'):
+            default = f"'{default}'"
+    elif column.default is not None and column.default.is_scalar:
+        default = str(literal(column.default.arg, column.type).compile(
+            dialect=dialect, compile_kwargs={'literal_binds': True}
+        ))
+
+    if default is not None:
+        ddl += f' DEFAULT {default}'
+        if not column.nullable:
+            ddl += ' NOT NULL'
+    return ddl
+
+
+# ═══════════════════════════════════════════════════════════
+# COPY (POSTGRESQL)
+# ═══════════════════════════════════════════════════════════
+
+def copy_rows(session, model, rows: List[Dict]) -> None:
+    """
+    Insère des lignes avec COPY ... FROM STDIN (PostgreSQL uniquement)
+    Les valeurs par défaut Python des colonnes absentes sont appliquées
+    ici, COPY ne passant pas par l'INSERT de SQLAlchemy.
+    """
+    table = model.__table__
+    columns = [
+        column for column in table.columns
+        if any(column.key in row for row in rows) or (column.default is not None and not column.primary_key)
+    ]
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(
+            copy_text_value(row[column.key] if column.key in row else _column_default(column))
+            for column in columns
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    sql = f'COPY {table.name} ({", ".join(column.name for column in columns)}) FROM STDIN'
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def copy_text_value(value) -> str:
+    """Encode une valeur au format texte de COPY (\\N = NULL)"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def _column_default(column):
+    """Valeur par défaut Python d'une colonne (scalaire ou callable)"""
+    if column.default is None:
+        return None
+    if column.default.is_callable:
+        return column.default.arg(None)
+    return column.default.arg
+
+
+# ═══════════════════════════════════════════════════════════
+# DIAGNOSTIC
+# ═══════════════════════════════════════════════════════════
+
+def describe_engine(engine: Engine) -> Dict:
+    """Moteur, état du pool et PRAGMAs actifs (SQLite)"""
+    info = {
+        'dialect': engine.dialect.name,
+        'pool': {
+            'class': type(engine.pool).__name__,
+            'status': engine.pool.status()
+        }
+    }
+
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as connection:
+            info['pragmas'] = {
+                name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+                for name in REPORTED_PRAGMAS
+            }
+
+    return info
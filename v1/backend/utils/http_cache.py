@@ -0,0 +1,84 @@
+"""
+FitnessRPG - Cache HTTP des lectures (ETag / If-None-Match)
+L'ETag dérive de la version des données de l'utilisateur (User.change_seq,
+incrémenté à chaque push) : une requête conditionnelle inchangée reçoit
+un 304 après une seule lecture de colonne, sans charger d'objet ORM.
+"""
+import hashlib
+from datetime import date
+from functools import wraps
+from typing import Optional
+
+from flask import g, make_response, request
+from sqlalchemy import select
+
+from models import db, User
+
+# À incrémenter quand le format d'une réponse change (invalide les ETags émis)
+ETAG_SCHEMA = 1
+
+# Réponses propres à l'utilisateur : stockables par le navigateur et le
+# service worker, mais toujours revalidées (If-None-Match) avant usage
+PRIVATE_REVALIDATE = 'private, no-cache'
+
+
+def load_data_version(user_id: int) -> Optional[int]:
+    """Version des données de l'utilisateur (None s'il n'existe pas)"""
+    return db.session.execute(
+        select(User.change_seq).where(User.id == user_id)
+    ).scalar()
+
+
+def compute_etag(user_uuid: str, version: int, daily: bool = False) -> str:
+    """
+    ETag fort d'une lecture : utilisateur, version des données, URL et
+    format demandé (Accept), plus la date du jour pour les réponses qui
+    en dépendent (série en cours, séances du mois, jours depuis la dernière séance)
+    """
+    parts = [
+        str(ETAG_SCHEMA),
+        user_uuid,
+        str(version),
+        request.full_path,
+        request.headers.get('Accept', ''),
+    ]
+    if daily:
+        parts.append(date.today().isoformat())
+
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def etag_cached(daily: bool = False, cache_control: str = PRIVATE_REVALIDATE):
+    """
+    Décorateur des routes de lecture protégées (à placer sous @token_required)
+    - If-None-Match correspondant : 304 sans appeler la route
+    - sinon : réponse de la route, avec ETag et Cache-Control si elle est en 200
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            version = load_data_version(current_user.id)
+            # Reprise par @cached_response dans sa clé (pas de seconde lecture)
+            g.data_version = version
+            if version is None:
+                # Utilisateur introuvable : la route renvoie son erreur
+                return f(current_user, *args, **kwargs)
+
+            etag = compute_etag(current_user.uuid, version, daily)
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(current_user, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control
+            response.vary.update(('Authorization', 'Accept'))
+            return response
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,151 @@
+"""
+FitnessRPG - Hachage des mots de passe (Argon2id)
+Un seul PasswordHasher par application, coût réglé par environnement,
+calculs exécutés sur un pool de threads borné
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from flask import current_app
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Trop de hachages en attente : la requête doit être retentée"""
+
+
+class PasswordService:
+    """
+    Hachage et vérification Argon2 sur un pool de threads borné
+
+    argon2-cffi libère le GIL pendant le calcul : les threads du pool
+    occupent les cœurs pendant que les autres threads du worker servent
+    les requêtes d'E/S. Au-delà de max_pending calculs en cours ou en
+    attente, PasswordHasherBusy est levée plutôt que d'empiler les
+    connexions (rafale du matin) jusqu'à saturer mémoire et workers ;
+    un calcul qui dépasse timeout donne aussi PasswordHasherBusy, sa
+    place n'étant rendue qu'à la fin du calcul.
+    """
+
+    def __init__(self, hasher: PasswordHasher, workers: int = 2, max_pending: int = 64, timeout: float = 30):
+        self.hasher = hasher
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        return self._run(self.hasher.hash, password)
+
+    def verify(self, password_hash: Optional[str], password: str) -> bool:
+        if not password_hash:
+            return False
+        return self._run(self._verify, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Vrai si le hash a été calculé avec d'autres paramètres que les actuels"""
+        try:
+            return self.hasher.check_needs_rehash(password_hash)
+        except InvalidHashError:
+            return True
+
+    def _verify(self, password_hash: str, password: str) -> bool:
+        try:
+            return self.hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Serveur occupé, réessayez dans un instant')
+        try:
+            future = self._executor().submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        # Place libérée à la fin du calcul, pas à l'abandon de l'attente :
+        # un calcul trop long occupe toujours un thread du pool
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHasherBusy('Serveur occupé, réessayez dans un instant')
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Créé au premier usage : après le fork des workers gunicorn
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='argon2')
+        return self._pool
+
+
+def create_password_hasher(config) -> PasswordHasher:
+    """PasswordHasher Argon2id avec les paramètres de la configuration"""
+    return PasswordHasher(
+        time_cost=config['ARGON2_TIME_COST'],
+        memory_cost=config['ARGON2_MEMORY_COST'],
+        parallelism=config['ARGON2_PARALLELISM'],
+    )
+
+
+def init_password_service(app) -> PasswordService:
+    """Crée le service de hachage partagé de l'application"""
+    service = PasswordService(
+        create_password_hasher(app.config),
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+    )
+    app.extensions['password_service'] = service
+    return service
+
+
+def get_password_service() -> PasswordService:
+    return current_app.extensions['password_service']
+
+
+def hash_password(password: str) -> str:
+    return get_password_service().hash(password)
+
+
+def verify_password(password_hash: Optional[str], password: str) -> bool:
+    return get_password_service().verify(password_hash, password)
+
+
+def benchmark_logins(service: PasswordService, logins: int = 100) -> Dict:
+    """
+    Mesure le débit de vérifications (une connexion = une vérification)
+    - en série sur un thread : débit d'un cœur
+    - sur un pool de la taille configurée : débit du worker, ramené par cœur
+    """
+    password = 'benchmark-password'
+    password_hash = service.hasher.hash(password)
+    cores = os.cpu_count() or 1
+
+    start = time.perf_counter()
+    for _ in range(logins):
+        service.hasher.verify(password_hash, password)
+    sequential = logins / (time.perf_counter() - start)
+
+    with ThreadPoolExecutor(service.workers) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda _: service.hasher.verify(password_hash, password), range(logins)))
+        pooled = logins / (time.perf_counter() - start)
+
+    parameters = service.hasher
+    return {
+        'time_cost': parameters.time_cost,
+        'memory_cost_kib': parameters.memory_cost,
+        'parallelism': parameters.parallelism,
+        'cores': cores,
+        'workers': service.workers,
+        'single_thread_per_second': round(sequential, 1),
+        'pool_per_second': round(pooled, 1),
+        'pool_per_second_per_core': round(pooled / cores, 1),
+    }
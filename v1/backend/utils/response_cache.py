@@ -0,0 +1,233 @@
+"""
+FitnessRPG - Cache des réponses de lecture (stats)
+Magasin LRU/TTL en mémoire (par processus) ou Redis (partagé entre workers),
+entrées par utilisateur invalidées à chaque push
+"""
+import json
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import date
+from functools import wraps
+from typing import Dict, Optional
+
+from flask import current_app, g, make_response, request
+
+from utils.http_cache import load_data_version
+
+
+# ═══════════════════════════════════════════════════════════
+# MAGASINS (get / set / delete)
+# ═══════════════════════════════════════════════════════════
+
+class MemoryCache:
+    """
+    Magasin en mémoire, borné (LRU) et à expiration (TTL)
+    Propre au processus : chaque worker gunicorn a le sien.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # clé -> (valeur, expiration ou None)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCache:
+    """
+    Magasin sur un serveur parlant le protocole Redis (Redis, Valkey,
+    KeyDB...), partagé par tous les workers ; `client` expose get/set/delete
+    comme redis.Redis (ou un faux client en mémoire pour les tests)
+    """
+
+    def __init__(self, client, prefix: str = 'fitnessrpg:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> 'RedisCache':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('Le paquet redis est requis pour RESPONSE_CACHE_URL=redis://...')
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl or None)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+def create_store(url: str, max_entries: int = 1024):
+    """Magasin selon RESPONSE_CACHE_URL (memory:// ou redis://, rediss://)"""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCache.from_url(url)
+    if url in ('', 'memory://'):
+        return MemoryCache(max_entries)
+    raise ValueError(f'RESPONSE_CACHE_URL non supportée : {url}')
+
+
+# ═══════════════════════════════════════════════════════════
+# CACHE DES RÉPONSES
+# ═══════════════════════════════════════════════════════════
+
+class ResponseCache:
+    """
+    Réponses JSON mises en cache par (utilisateur, génération, route, arguments)
+
+    Chaque utilisateur a un jeton de génération ; l'invalider (un seul
+    DELETE) rend toutes ses entrées inaccessibles, qui expirent ensuite
+    d'elles-mêmes. Un jeton perdu (éviction) est remplacé par un nouveau
+    jeton aléatoire : une ancienne entrée ne peut jamais être resservie.
+
+    Les compteurs hits/misses sont propres au processus.
+    """
+
+    def __init__(self, store, ttl: int = 300):
+        self.store = store
+        self.ttl = ttl
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def generation(self, user_uuid: str) -> str:
+        key = f'gen:{user_uuid}'
+        token = self.store.get(key)
+        if token is None:
+            token = uuid.uuid4().hex[:12]
+            self.store.set(key, token)
+        return token
+
+    def invalidate_user(self, user_uuid: str) -> None:
+        self.store.delete(f'gen:{user_uuid}')
+
+    def get(self, key: str, endpoint: str) -> Optional[Dict]:
+        value = self.store.get(key)
+        if value is None:
+            self.misses[endpoint] += 1
+            return None
+        self.hits[endpoint] += 1
+        return json.loads(value)
+
+    def set(self, key: str, entry: Dict) -> None:
+        self.store.set(key, json.dumps(entry), self.ttl)
+
+    def describe(self) -> Dict:
+        """Compteurs par route (diagnostic)"""
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            'backend': type(self.store).__name__,
+            'ttl': self.ttl,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else None,
+            'endpoints': {
+                endpoint: {'hits': self.hits[endpoint], 'misses': self.misses[endpoint]}
+                for endpoint in sorted(set(self.hits) | set(self.misses))
+            }
+        }
+
+
+def init_response_cache(app) -> ResponseCache:
+    """Crée le cache de l'application depuis sa configuration"""
+    cache = ResponseCache(
+        create_store(app.config['RESPONSE_CACHE_URL'], app.config['RESPONSE_CACHE_MAX_ENTRIES']),
+        ttl=app.config['RESPONSE_CACHE_TTL']
+    )
+    app.extensions['response_cache'] = cache
+    return cache
+
+
+def get_response_cache() -> ResponseCache:
+    return current_app.extensions['response_cache']
+
+
+def invalidate_user_cache(user_uuid: str) -> None:
+    """Oublie les réponses en cache d'un utilisateur (après un push)"""
+    get_response_cache().invalidate_user(user_uuid)
+
+
+# ═══════════════════════════════════════════════════════════
+# DÉCORATEUR
+# ═══════════════════════════════════════════════════════════
+
+def cached_response(daily: bool = False):
+    """
+    Décorateur des routes de lecture protégées (à placer sous @etag_cached)
+    Clé : utilisateur, version des données (User.change_seq, lue par
+    @etag_cached), génération, route, arguments de l'URL et de la requête,
+    plus la date du jour pour les réponses qui en dépendent.
+    La version suffit à écarter une entrée antérieure à un push, même si
+    l'invalidation n'a pas encore eu lieu ou n'a pas atteint ce worker
+    (magasin memory://) ; la génération libère la place plus tôt.
+    Seules les réponses 200 sont mises en cache.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            cache = get_response_cache()
+            user_uuid = current_user.uuid
+
+            version = g.get('data_version')
+            if version is None:
+                version = load_data_version(current_user.id)
+
+            key = ':'.join([
+                'resp',
+                user_uuid,
+                str(version),
+                cache.generation(user_uuid),
+                request.endpoint,
+                json.dumps(kwargs, sort_keys=True),
+                json.dumps(sorted(request.args.items(multi=True))),
+                date.today().isoformat() if daily else '',
+            ])
+
+            entry = cache.get(key, request.endpoint)
+            if entry is not None:
+                response = make_response(entry['body'], 200)
+                response.mimetype = entry['mimetype']
+                return response
+
+            response = make_response(f(current_user, *args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(key, {
+                    'body': response.get_data(as_text=True),
+                    'mimetype': response.mimetype
+                })
+            return response
+
+        return decorated
+
+    return decorator
@@ -752,6 +752,7 @@
 
             if (response.ok) {
               localStorage.setItem('auth_token', data.token);
+              localStorage.setItem('refresh_token', data.refresh_token);
 
               // Sauvegarder/mettre à jour l'utilisateur dans IndexedDB
               await window.fitnessDB.put('user', {
@@ -842,6 +843,7 @@
 
             if (response.ok) {
               localStorage.setItem('auth_token', data.token);
+              localStorage.setItem('refresh_token', data.refresh_token);
 
               // Sauvegarder l'utilisateur dans IndexedDB
               await window.fitnessDB.put('user', {
@@ -1075,8 +1077,26 @@
       title: 'Déconnexion',
       message: 'Êtes-vous sûr de vouloir vous déconnecter ?',
       confirmText: 'Déconnexion',
-      onConfirm: () => {
+      onConfirm: async () => {
+        // Révoque le refresh token côté serveur (au mieux : hors ligne, il expirera)
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (refreshToken) {
+          try {
+            await fetch(`${API_URL}/auth/logout`, {
+              method: 'POST',
+              headers: { 'Content-Type': 'application/json' },
+              body: JSON.stringify({ refresh_token: refreshToken })
+            });
+          } catch (error) {
+            console.warn('Révocation du refresh token impossible:', error);
+          }
+        }
+
         localStorage.removeItem('auth_token');
+        localStorage.removeItem('refresh_token');
+        if (navigator.serviceWorker && navigator.serviceWorker.controller) {
+          navigator.serviceWorker.controller.postMessage({ type: 'CLEAR_API_CACHE' });
+        }
         window.location.reload();
       }
     });
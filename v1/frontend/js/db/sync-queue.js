@@ -10,6 +10,9 @@ class SyncQueueManager {
     this.retryCount = 0;
     this.maxRetries = 3;
     this.apiUrl = 'http://localhost:5000/api';
+    this.refreshing = null;
+    this.asyncPushThreshold = 200;  // Éléments à partir desquels le push est asynchrone
+    this.asyncPushMaxPolls = 20;
   }
 
   // ═══════════════════════════════════════════════════════════
@@ -122,21 +125,10 @@ class SyncQueueManager {
         data: JSON.parse(item.payload)
       }));
 
-      // Envoyer au serveur
-      const response = await fetch(`${this.apiUrl}/sync/push`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`
-        },
-        body: JSON.stringify({ items })
-      });
-
-      if (!response.ok) {
-        throw new Error(`Erreur HTTP: ${response.status}`);
-      }
-
-      const result = await response.json();
+      // Envoyer au serveur (gros lots : appliqués en arrière-plan)
+      const result = items.length >= this.asyncPushThreshold
+        ? await this.pushAsync(items)
+        : await this.pushNow(items);
 
       // Marquer les éléments comme synchronisés
       for (const item of pendingItems) {
@@ -186,6 +178,63 @@ class SyncQueueManager {
     }
   }
 
+  /**
+   * Push synchrone : la réponse arrive une fois le lot appliqué
+   */
+  async pushNow(items) {
+    const response = await this.authFetch(`${this.apiUrl}/sync/push`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify({ items })
+    });
+
+    if (!response.ok) {
+      throw new Error(`Erreur HTTP: ${response.status}`);
+    }
+
+    return response.json();
+  }
+
+  /**
+   * Push asynchrone (?async=1) : le serveur répond 202 avec un batch_id,
+   * puis l'état du lot est interrogé jusqu'à ce qu'il soit appliqué
+   */
+  async pushAsync(items) {
+    const response = await this.authFetch(`${this.apiUrl}/sync/push?async=1`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify({ items })
+    });
+
+    if (!response.ok) {
+      throw new Error(`Erreur HTTP: ${response.status}`);
+    }
+
+    const { batch_id: batchId } = await response.json();
+    let delay = 500;
+
+    for (let attempt = 0; attempt < this.asyncPushMaxPolls; attempt++) {
+      await new Promise(resolve => setTimeout(resolve, delay));
+      delay = Math.min(delay * 2, 5000);
+
+      const statusResponse = await this.authFetch(`${this.apiUrl}/sync/push/${batchId}`, { method: 'GET' });
+      if (!statusResponse.ok) {
+        throw new Error(`Erreur HTTP: ${statusResponse.status}`);
+      }
+
+      const status = await statusResponse.json();
+      if (status.done) {
+        return status;
+      }
+    }
+
+    throw new Error(`Lot ${batchId} toujours en attente`);
+  }
+
   /**
    * Synchronise avec sendBeacon (pour beforeunload)
    */
@@ -213,6 +262,7 @@ class SyncQueueManager {
 
   /**
    * Télécharge les données du serveur
+   * Incrémental (?since=<curseur>) dès qu'un curseur est connu
    */
   async pullFromServer() {
     if (!Helpers.isOnline()) {
@@ -227,11 +277,15 @@ class SyncQueueManager {
     console.log('📥 Téléchargement des données du serveur...');
 
     try {
-      const response = await fetch(`${this.apiUrl}/sync/pull`, {
-        method: 'GET',
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
+      const cursor = await this.getSyncCursor();
+
+      // Pas de curseur = restauration complète, reçue en flux NDJSON
+      if (cursor === null) {
+        return await this.pullFullStream();
+      }
+
+      const response = await this.authFetch(`${this.apiUrl}/sync/pull?since=${cursor}`, {
+        method: 'GET'
       });
 
       if (!response.ok) {
@@ -241,9 +295,15 @@ class SyncQueueManager {
       const result = await response.json();
 
       // Sauvegarder les données localement
-      await this.saveServerData(result);
+      if (result.mode === 'delta') {
+        await this.saveServerDelta(result);
+        console.log('✅ Changements téléchargés depuis le curseur', result.since);
+      } else {
+        await this.saveServerData(result);
+        console.log('✅ Données téléchargées:', result.total_workouts, 'séances');
+      }
 
-      console.log('✅ Données téléchargées:', result.total_workouts, 'séances');
+      await this.setSyncCursor(result.cursor);
 
       if (window.NotificationManager) {
         window.NotificationManager.success(
@@ -260,6 +320,88 @@ class SyncQueueManager {
     }
   }
 
+  /**
+   * Restauration complète en flux NDJSON (une ligne par séance)
+   * Chaque séance est enregistrée dès sa réception
+   */
+  async pullFullStream() {
+    const response = await this.authFetch(`${this.apiUrl}/sync/pull`, {
+      method: 'GET',
+      headers: {
+        'Accept': 'application/x-ndjson'
+      }
+    });
+
+    if (!response.ok) {
+      throw new Error(`Erreur HTTP: ${response.status}`);
+    }
+
+    // Serveur sans streaming : réponse JSON classique
+    const contentType = response.headers.get('Content-Type') || '';
+    if (!contentType.includes('application/x-ndjson') || !response.body) {
+      const result = await response.json();
+      await this.saveServerData(result);
+      await this.setSyncCursor(result.cursor);
+      return result;
+    }
+
+    const result = { mode: 'full', workouts: [], total_workouts: 0 };
+
+    await this.readNdjson(response, async (record) => {
+      if (record.type === 'user') {
+        result.user = record.user;
+        result.cursor = record.cursor;
+        await this.updateUserFromServer(record.user);
+      } else if (record.type === 'workout') {
+        await this.saveServerData({ workouts: [record.workout] });
+      } else if (record.type === 'end') {
+        result.total_workouts = record.total_workouts;
+      }
+    });
+
+    // Curseur enregistré seulement si le flux est arrivé jusqu'au bout
+    await this.setSyncCursor(result.cursor);
+    console.log('✅ Données téléchargées:', result.total_workouts, 'séances');
+
+    if (window.NotificationManager) {
+      window.NotificationManager.success(
+        'Données restaurées depuis le serveur',
+        'Synchronisation'
+      );
+    }
+
+    return result;
+  }
+
+  /**
+   * Lit une réponse NDJSON ligne par ligne au fil de l'eau
+   */
+  async readNdjson(response, onRecord) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+
+      let newline;
+      while ((newline = buffer.indexOf('\n')) !== -1) {
+        const line = buffer.slice(0, newline).trim();
+        buffer = buffer.slice(newline + 1);
+        if (line) {
+          await onRecord(JSON.parse(line));
+        }
+      }
+
+      if (done) break;
+    }
+
+    if (buffer.trim()) {
+      await onRecord(JSON.parse(buffer));
+    }
+  }
+
   /**
    * Sauvegarde les données du serveur localement
    */
@@ -318,6 +460,87 @@ class SyncQueueManager {
     }
   }
 
+  /**
+   * Applique un pull incrémental (lignes à plat + suppressions)
+   */
+  async saveServerDelta(data) {
+    if (data.user) {
+      await this.updateUserFromServer(data.user);
+    }
+
+    const changes = data.changes || {};
+
+    for (const exercise of changes.exercises || []) {
+      await window.fitnessDB.put('exercises', {
+        uuid: exercise.uuid,
+        name: exercise.name,
+        category: exercise.category,
+        muscleGroup: exercise.muscle_group,
+        statType: exercise.stat_type,
+        xpMultiplier: exercise.xp_multiplier,
+        isCustom: exercise.is_custom,
+        isArchived: exercise.is_archived
+      });
+    }
+
+    for (const workout of changes.workouts || []) {
+      await window.fitnessDB.put('workouts', {
+        uuid: workout.uuid,
+        name: workout.name,
+        workoutDate: workout.workout_date,
+        durationMinutes: workout.duration_minutes,
+        totalVolume: workout.total_volume,
+        xpEarned: workout.xp_earned,
+        isCompleted: workout.is_completed,
+        notes: workout.notes
+      });
+    }
+
+    for (const exercise of changes.workout_exercises || []) {
+      await window.fitnessDB.put('workoutExercises', {
+        uuid: exercise.uuid,
+        workoutUuid: exercise.workout_uuid,
+        exerciseUuid: exercise.exercise_uuid,
+        orderIndex: exercise.order_index,
+        totalSets: exercise.total_sets,
+        totalVolume: exercise.total_volume,
+        estimated1rm: exercise.estimated_1rm
+      });
+    }
+
+    for (const set of changes.exercise_sets || []) {
+      await window.fitnessDB.put('exerciseSets', {
+        uuid: set.uuid,
+        workoutExerciseUuid: set.workout_exercise_uuid,
+        setNumber: set.set_number,
+        weight_kg: set.weight_kg,
+        reps: set.reps,
+        rpe: set.rpe,
+        volume: set.volume,
+        estimated_1rm: set.estimated_1rm,
+        isWarmup: set.is_warmup,
+        isPR: set.is_pr,
+        restSeconds: set.rest_seconds,
+        createdAt: set.created_at
+      });
+    }
+
+    // Suppressions (tombstones)
+    const stores = {
+      exercise: 'exercises',
+      workout: 'workouts',
+      workout_exercise: 'workoutExercises',
+      exercise_set: 'exerciseSets'
+    };
+
+    for (const tombstone of data.deleted || []) {
+      const storeName = stores[tombstone.entity_type];
+      if (storeName) {
+        await window.fitnessDB.delete(storeName, tombstone.entity_uuid);
+      }
+    }
+  }
+
   /**
    * Met à jour l'utilisateur depuis les données serveur
    */
@@ -344,6 +567,83 @@ class SyncQueueManager {
     return localStorage.getItem('auth_token');
   }
 
+  /**
+   * fetch authentifié : sur un 401 (jeton d'accès expiré), renouvelle
+   * la session avec le refresh token puis rejoue la requête une fois
+   */
+  async authFetch(url, options = {}) {
+    const send = () => fetch(url, {
+      ...options,
+      headers: {
+        ...(options.headers || {}),
+        'Authorization': `Bearer ${this.getAuthToken()}`
+      }
+    });
+
+    const response = await send();
+    if (response.status !== 401 || !(await this.refreshSession())) {
+      return response;
+    }
+    return send();
+  }
+
+  /**
+   * Renouvelle le jeton d'accès (POST /auth/refresh)
+   * Un seul appel à la fois : les requêtes concurrentes attendent le même
+   * renouvellement (un refresh token ne sert qu'une fois)
+   */
+  refreshSession() {
+    if (!this.refreshing) {
+      this.refreshing = this.requestRefresh().finally(() => {
+        this.refreshing = null;
+      });
+    }
+    return this.refreshing;
+  }
+
+  async requestRefresh() {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) return false;
+
+    try {
+      const response = await fetch(`${this.apiUrl}/auth/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken })
+      });
+
+      if (!response.ok) {
+        // Refresh token expiré, révoqué ou déjà utilisé : reconnexion requise
+        if (response.status === 401) {
+          localStorage.removeItem('refresh_token');
+        }
+        return false;
+      }
+
+      const data = await response.json();
+      localStorage.setItem('auth_token', data.token);
+      localStorage.setItem('refresh_token', data.refresh_token);
+      return true;
+
+    } catch (error) {
+      console.error('❌ Renouvellement de session impossible:', error);
+      return false;
+    }
+  }
+
+  /**
+   * Curseur du dernier pull (null = jamais synchronisé)
+   */
+  async getSyncCursor() {
+    const setting = await window.fitnessDB.get('settings', 'syncCursor');
+    return setting ? setting.value : null;
+  }
+
+  async setSyncCursor(cursor) {
+    if (cursor === undefined || cursor === null) return;
+    await window.fitnessDB.put('settings', { key: 'syncCursor', value: cursor });
+  }
+
   /**
    * Vérifie s'il y a des éléments en attente
    */
@@ -5,6 +5,11 @@
 
 const CACHE_VERSION = 'v1.0.0';
 const CACHE_NAME = `fitness-rpg-${CACHE_VERSION}`;
+const API_CACHE_NAME = `fitness-rpg-api-${CACHE_VERSION}`;
+
+// Lectures de l'API servies hors ligne (réponses avec ETag du serveur)
+const CACHEABLE_API_PATHS = ['/api/stats/', '/api/sync/pull', '/api/exercises'];
+const NDJSON_MIMETYPE = 'application/x-ndjson';
 
 // Fichiers à mettre en cache immédiatement
 const STATIC_ASSETS = [
@@ -82,7 +87,7 @@ self.addEventListener('activate', (event) => {
       .then((cacheNames) => {
         return Promise.all(
           cacheNames.map((cacheName) => {
-            if (cacheName !== CACHE_NAME) {
+            if (cacheName !== CACHE_NAME && cacheName !== API_CACHE_NAME) {
               console.log('[SW] 🗑️ Suppression de l\'ancien cache:', cacheName);
               return caches.delete(cacheName);
             }
@@ -109,7 +114,15 @@ self.addEventListener('fetch', (event) => {
     return;
   }
 
-  // Ignorer les requêtes vers l'API (laisser la sync-queue gérer)
+  // Lectures de l'API : réseau d'abord, cache hors ligne
+  // (sauf la restauration NDJSON, lue au fil de l'eau par la page)
+  if (CACHEABLE_API_PATHS.some((path) => url.pathname.startsWith(path))
+      && !isNdjsonRequest(request, url)) {
+    event.respondWith(networkFirstApi(event, request));
+    return;
+  }
+
+  // Ignorer les autres requêtes vers l'API (laisser la sync-queue gérer)
   if (url.pathname.startsWith('/api/')) {
     return;
   }
@@ -166,6 +179,55 @@ self.addEventListener('fetch', (event) => {
   );
 });
 
+/**
+ * Restauration complète en NDJSON (?stream=1 ou Accept: application/x-ndjson) :
+ * jamais mise en cache, sinon la page attendrait la fin du flux.
+ */
+function isNdjsonRequest(request, url) {
+  const accept = request.headers.get('Accept') || '';
+  return url.searchParams.get('stream') === '1' || accept.includes(NDJSON_MIMETYPE);
+}
+
+/**
+ * Réseau d'abord pour les lectures de l'API
+ * Le cache HTTP du navigateur revalide avec If-None-Match (304 si rien
+ * n'a changé) ; la dernière réponse 200 est gardée pour le mode hors ligne.
+ */
+async function networkFirstApi(event, request) {
+  try {
+    const networkResponse = await fetch(request);
+    const cacheControl = networkResponse.headers.get('Cache-Control') || '';
+    const contentType = networkResponse.headers.get('Content-Type') || '';
+
+    // Mise en cache en arrière-plan : la page reçoit la réponse tout de suite
+    if (networkResponse.status === 200 && !cacheControl.includes('no-store')
+        && !contentType.includes(NDJSON_MIMETYPE)) {
+      const responseToCache = networkResponse.clone();
+      event.waitUntil(
+        caches.open(API_CACHE_NAME)
+          .then((cache) => cache.put(request, responseToCache))
+          .catch((error) => console.warn('[SW] Mise en cache API impossible:', error))
+      );
+    }
+
+    return networkResponse;
+  } catch (error) {
+    const cachedResponse = await caches.match(request, { cacheName: API_CACHE_NAME });
+    if (cachedResponse) {
+      console.log('[SW] 📦 API servie depuis le cache (hors ligne):', request.url);
+      return cachedResponse;
+    }
+    throw error;
+  }
+}
+
+// Déconnexion : oublier les réponses de l'utilisateur
+self.addEventListener('message', (event) => {
+  if (event.data && event.data.type === 'CLEAR_API_CACHE') {
+    event.waitUntil(caches.delete(API_CACHE_NAME));
+  }
+});
+
 // ═══════════════════════════════════════════════════════════
 // BACKGROUND SYNC - Synchronisation en arrière-plan
 // ═══════════════════════════════════════════════════════════
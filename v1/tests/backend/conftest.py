@@ -0,0 +1,134 @@
+"""
+FitnessRPG - Fixtures pytest du backend
+Application en mémoire (TestingConfig) et utilisateur authentifié
+"""
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ['FLASK_ENV'] = 'testing'
+
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'sqlite_only: test propre à SQLite (PRAGMA, EXPLAIN QUERY PLAN)')
+
+
+def pytest_collection_modifyitems(config, items):
+    """Ignore les tests propres à SQLite quand TEST_DATABASE_URL vise PostgreSQL"""
+    if not os.environ.get('TEST_DATABASE_URL'):
+        return
+    skip = pytest.mark.skip(reason='propre à SQLite')
+    for item in items:
+        if 'sqlite_only' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def app():
+    """Application Flask avec une base SQLite en mémoire (ou TEST_DATABASE_URL)"""
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        # Base persistante (PostgreSQL) : repartir d'un schéma vide
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Inscrit un utilisateur et retourne le header Authorization"""
+    response = client.post('/api/auth/register', json={
+        'username': 'tester',
+        'email': 'tester@example.com',
+        'password': 'test123'
+    })
+    token = response.get_json()['token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+class QueryCounter:
+    """Compte les requêtes SQL exécutées sur le moteur"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def reset(self):
+        self.statements = []
+
+
+@pytest.fixture
+def query_counter(app):
+    counter = QueryCounter()
+    event.listen(db.engine, 'before_cursor_execute', counter)
+    yield counter
+    event.remove(db.engine, 'before_cursor_execute', counter)
+
+
+@pytest.fixture
+def session_items():
+    return make_session_items
+
+
+def make_session_items(workout_uuid, exercise_uuid='ex-squat', n_exercises=1, n_sets=3,
+                       workout_date='2026-01-05T10:00:00Z', xp_earned=100):
+    """Construit les éléments de push d'une séance complète"""
+    items = [{
+        'entity_type': 'workout',
+        'entity_uuid': workout_uuid,
+        'action': 'create',
+        'data': {
+            'name': 'Leg Day',
+            'workout_date': workout_date,
+            'is_completed': True,
+            'xp_earned': xp_earned
+        }
+    }]
+
+    for e in range(n_exercises):
+        we_uuid = f'{workout_uuid}-we{e}'
+        items.append({
+            'entity_type': 'workout_exercise',
+            'entity_uuid': we_uuid,
+            'action': 'create',
+            'data': {
+                'workout_uuid': workout_uuid,
+                'exercise_uuid': exercise_uuid,
+                'order_index': e
+            }
+        })
+        for s in range(n_sets):
+            items.append({
+                'entity_type': 'exercise_set',
+                'entity_uuid': f'{we_uuid}-s{s}',
+                'action': 'create',
+                'data': {
+                    'workout_exercise_uuid': we_uuid,
+                    'set_number': s + 1,
+                    'weight_kg': 100 + s,
+                    'reps': 5
+                }
+            })
+
+    return items
@@ -0,0 +1,121 @@
+"""
+Tests de l'authentification JWT (ID et version dans le token, cache utilisateur)
+"""
+import jwt
+import pytest
+
+from models import db, RefreshToken
+from services.refresh_tokens import hash_refresh_token, rotate_refresh_token
+
+# Lecture de l'utilisateur par le décorateur (cache manquant)
+AUTH_LOOKUP = 'SELECT users.id, users.uuid, users.username, users.token_version'
+
+
+def test_token_carries_user_id_and_version(app, client, auth_headers):
+    token = auth_headers['Authorization'].split(' ')[1]
+    payload = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+
+    assert isinstance(payload['user_id'], int)
+    assert payload['token_version'] == 0
+
+
+def test_user_is_resolved_once(client, auth_headers, query_counter):
+    client.get('/api/stats/personal-records', headers=auth_headers)
+    assert any(s.startswith(AUTH_LOOKUP) for s in query_counter.statements)
+
+    query_counter.reset()
+    for url in ('/api/stats/personal-records', '/api/stats/progression/ex-squat', '/api/sync/pull?since=0'):
+        assert client.get(url, headers=auth_headers).status_code == 200
+
+    assert not any(s.startswith(AUTH_LOOKUP) for s in query_counter.statements)
+
+
+def test_revoked_tokens_are_rejected(client, auth_headers):
+    response = client.post('/api/auth/logout-all', headers=auth_headers)
+    assert response.status_code == 200
+
+    response = client.get('/api/stats/dashboard', headers=auth_headers)
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'Token révoqué'
+
+    token = client.post('/api/auth/login', json={'username': 'tester', 'password': 'test123'}).get_json()['token']
+    assert client.get('/api/stats/dashboard', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+
+
+def test_legacy_token_without_user_id_is_rejected(app, client, auth_headers):
+    token = jwt.encode({'user_uuid': 'x', 'username': 'tester'}, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+
+    response = client.get('/api/stats/dashboard', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 401
+
+
+def refresh(client, refresh_token):
+    return client.post('/api/auth/refresh', json={'refresh_token': refresh_token})
+
+
+def login_tokens(client):
+    return client.post('/api/auth/login', json={'username': 'tester', 'password': 'test123'}).get_json()
+
+
+def test_refresh_rotates_without_argon2(app, client, auth_headers, query_counter, monkeypatch):
+    session = login_tokens(client)
+    assert session['expires_in'] == 15 * 60
+
+    def no_argon2(*args):
+        raise AssertionError('Argon2 appelé')
+    monkeypatch.setattr(app.extensions['password_service'], '_run', no_argon2)
+
+    query_counter.reset()
+    response = refresh(client, session['refresh_token'])
+    assert response.status_code == 200
+    reads = [s for s in query_counter.statements if s.startswith('SELECT')]
+    assert len(reads) == 1 and 'refresh_tokens.token_hash = ?' in reads[0]
+
+    rotated = response.get_json()
+    assert rotated['refresh_token'] != session['refresh_token']
+    assert client.get('/api/stats/dashboard', headers={'Authorization': f"Bearer {rotated['token']}"}).status_code == 200
+    assert refresh(client, rotated['refresh_token']).status_code == 200
+
+
+def test_reused_refresh_token_revokes_session(client, auth_headers):
+    session = login_tokens(client)
+    rotated = refresh(client, session['refresh_token']).get_json()
+
+    response = refresh(client, session['refresh_token'])
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'Refresh token déjà utilisé'
+    assert refresh(client, rotated['refresh_token']).status_code == 401
+
+
+def test_concurrent_refresh_with_same_token_is_reuse(app, client, auth_headers):
+    session = login_tokens(client)
+    token_hash = hash_refresh_token(session['refresh_token'])
+
+    # Deuxième requête (autre session SQLAlchemy) : a lu le token avant la rotation
+    with app.app_context():
+        stale = db.session.execute(db.select(RefreshToken).where(RefreshToken.token_hash == token_hash)).scalar_one()
+
+        with app.app_context():
+            rotate_refresh_token(session['refresh_token'])
+            db.session.commit()
+
+        assert stale.revoked_at is None
+        with pytest.raises(ValueError, match='déjà utilisé'):
+            rotate_refresh_token(session['refresh_token'])
+        db.session.remove()
+
+    # Famille révoquée : le token émis par la première rotation est inutilisable
+    family_id = RefreshToken.query.filter_by(token_hash=token_hash).one().family_id
+    assert RefreshToken.query.filter_by(family_id=family_id, revoked_at=None).count() == 0
+
+
+def test_logout_revokes_refresh_tokens(client, auth_headers):
+    phone, laptop = login_tokens(client), login_tokens(client)
+
+    client.post('/api/auth/logout', json={'refresh_token': phone['refresh_token']})
+    assert refresh(client, phone['refresh_token']).status_code == 401
+    assert refresh(client, laptop['refresh_token']).status_code == 200
+
+    other = login_tokens(client)
+    client.post('/api/auth/logout-all', headers={'Authorization': f"Bearer {other['token']}"})
+    assert refresh(client, other['refresh_token']).status_code == 401
@@ -0,0 +1,103 @@
+"""
+Tests des réglages SQLite (PRAGMAs) et du diagnostic de la base
+"""
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from config import ProductionConfig, normalize_database_url
+from models import ExerciseSet, User, UserStats, Workout, db
+from utils.database import add_missing_columns, copy_text_value, describe_engine, install_sqlite_pragmas
+
+
+def test_production_pragmas_applied_on_connect(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fitness.db'}", **ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS)
+    install_sqlite_pragmas(engine, ProductionConfig.SQLITE_PRAGMAS)
+
+    info = describe_engine(engine)
+
+    assert info['pool']['class'] == 'QueuePool'
+    assert info['pragmas'] == {
+        'journal_mode': 'wal',
+        'synchronous': 1,  # NORMAL
+        'busy_timeout': ProductionConfig.SQLITE_PRAGMAS['busy_timeout'],
+        'foreign_keys': 1,
+        'cache_size': ProductionConfig.SQLITE_PRAGMAS['cache_size'],
+        'mmap_size': ProductionConfig.SQLITE_PRAGMAS['mmap_size'],
+    }
+    engine.dispose()
+
+
+@pytest.mark.sqlite_only
+def test_add_missing_columns_upgrades_existing_sqlite_file(tmp_path):
+    """Base créée avant change_seq : create_all() seul ne touche pas la table users"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fitness.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            'CREATE TABLE users (id INTEGER NOT NULL, uuid VARCHAR(36) NOT NULL, '
+            'username VARCHAR(50) NOT NULL, email VARCHAR(120) NOT NULL, password_hash VARCHAR(255), '
+            'total_xp INTEGER, current_level INTEGER, created_at DATETIME, last_sync DATETIME, '
+            'PRIMARY KEY (id), UNIQUE (username), UNIQUE (email))'
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, uuid, username, email) VALUES (1, 'u-1', 'ancien', 'ancien@example.com')"
+        )
+
+    db.metadata.create_all(engine)
+    added = add_missing_columns(engine, db.metadata)
+
+    assert added == ['users.change_seq', 'users.token_version']
+    assert add_missing_columns(engine, db.metadata) == []
+    with engine.connect() as connection:
+        user = connection.execute(select(User.__table__)).one()
+        assert (user.change_seq, user.token_version) == (0, 0)
+    engine.dispose()
+
+
+def test_health_db_hides_details_by_default(client):
+    assert client.get('/api/health/db').get_json() == {'status': 'online', 'database': True}
+    assert client.get('/api/health/cache').get_json() == {'status': 'online', 'cache': True}
+
+
+@pytest.mark.sqlite_only
+def test_health_db_reports_pragmas(app, client):
+    app.config['HEALTH_DIAGNOSTICS'] = True
+    data = client.get('/api/health/db').get_json()
+
+    assert data['database']['dialect'] == 'sqlite'
+    assert set(data['database']['pragmas']) == {
+        'journal_mode', 'synchronous', 'busy_timeout', 'foreign_keys', 'cache_size', 'mmap_size'
+    }
+
+
+def test_normalize_database_url():
+    assert normalize_database_url('postgres://u:p@db/fitness') == 'postgresql://u:p@db/fitness'
+    assert normalize_database_url('sqlite:///fitness.db') == 'sqlite:///fitness.db'
+    assert normalize_database_url(None) is None
+
+
+def test_copy_text_value_escapes():
+    assert copy_text_value(None) == '\\N'
+    assert copy_text_value(True) == 't'
+    assert copy_text_value(datetime(2026, 1, 5, 10, 0)) == '2026-01-05T10:00:00'
+    assert copy_text_value('a\tb\\c\nd') == 'a\\tb\\\\c\\nd'
+
+
+def test_import_history_command(app, client, auth_headers, session_items, tmp_path):
+    path = tmp_path / 'history.ndjson'
+    with path.open('w', encoding='utf-8') as f:
+        for i in range(5):
+            for item in session_items(f'w{i}', n_sets=2):
+                f.write(json.dumps(item) + '\n')
+
+    user = User.query.one()
+    result = app.test_cli_runner().invoke(args=[
+        'import-history', str(path), '--user', user.uuid, '--chunk-size', '3'
+    ])
+
+    assert '20 élément(s) importé(s), 0 erreur(s)' in result.output
+    assert ExerciseSet.query.count() == 10
+    assert UserStats.query.one().total_workouts == 5
+    assert User.query.one().total_xp == sum(w.xp_earned for w in Workout.query) > 0
@@ -0,0 +1,45 @@
+"""
+Tests du catalogue d'exercices versionné (GET /api/exercises)
+"""
+
+
+def custom_exercise(uuid, name):
+    return {'entity_type': 'exercise', 'entity_uuid': uuid, 'action': 'create',
+            'data': {'name': name, 'category': 'legs'}}
+
+
+def test_catalog_is_served_from_memory(client, query_counter):
+    first = client.get('/api/exercises')
+    assert first.status_code == 200
+    data = first.get_json()
+    assert data['total'] == 18 and len(data['exercises']) == 18
+    assert first.headers['ETag'] == f'"{data["version"]}"'
+    assert first.headers['Cache-Control'] == 'public, max-age=300'
+
+    query_counter.reset()
+    again = client.get(f'/api/exercises?since_version={data["version"]}')
+    assert query_counter.count == 0
+    assert again.get_json() == {'success': True, 'version': data['version'], 'changed': False,
+                                'total': 0, 'exercises': []}
+
+    not_modified = client.get('/api/exercises', headers={'If-None-Match': first.headers['ETag']})
+    assert not_modified.status_code == 304
+
+
+def test_custom_exercises_are_merged_per_user(client, auth_headers):
+    anonymous = client.get('/api/exercises').get_json()
+    catalog = client.get('/api/exercises', headers=auth_headers).get_json()
+    assert catalog['total'] == 18
+    assert catalog['version'].startswith(anonymous['version'] + '.')
+
+    client.post('/api/sync/push', headers=auth_headers, json={'items': [custom_exercise('ex-mine', 'Hack squat')]})
+
+    updated = client.get(f'/api/exercises?since_version={catalog["version"]}', headers=auth_headers).get_json()
+    assert updated['changed'] and updated['total'] == 19
+    assert updated['exercises'][-1] == {
+        'uuid': 'ex-mine', 'name': 'Hack squat', 'category': 'legs', 'muscle_group': None,
+        'stat_type': 'strength', 'xp_multiplier': 1.0, 'is_custom': True
+    }
+
+    # Les exercices d'un utilisateur ne sont pas visibles des autres
+    assert client.get('/api/exercises').get_json()['total'] == 18
@@ -0,0 +1,55 @@
+"""
+Tests du cache HTTP des lectures (ETag / If-None-Match)
+"""
+import pytest
+
+CACHED_URLS = [
+    '/api/sync/pull',
+    '/api/sync/pull?since=0',
+    '/api/stats/dashboard',
+    '/api/stats/progression/ex-squat',
+    '/api/stats/recommendations',
+    '/api/stats/personal-records',
+]
+
+
+@pytest.mark.parametrize('url', CACHED_URLS)
+def test_unchanged_data_returns_304(client, auth_headers, session_items, query_counter, url):
+    client.post('/api/sync/push', headers=auth_headers, json={'items': session_items('w1')})
+
+    first = client.get(url, headers=auth_headers)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    etag = first.headers['ETag']
+
+    query_counter.reset()
+    second = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.get_data() == b''
+    assert second.headers['ETag'] == etag
+    assert query_counter.count == 1  # Version des données uniquement
+
+    client.post('/api/sync/push', headers=auth_headers, json={'items': session_items('w2')})
+    third = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+    assert third.status_code == 200
+    assert third.headers['ETag'] != etag
+
+
+def test_etag_varies_with_user_and_format(client, auth_headers):
+    other = client.post('/api/auth/register', json={
+        'username': 'other', 'email': 'other@example.com', 'password': 'test123'
+    }).get_json()['token']
+
+    json_etag = client.get('/api/sync/pull', headers=auth_headers).headers['ETag']
+    stream = client.get('/api/sync/pull', headers={**auth_headers, 'Accept': 'application/x-ndjson'})
+    other_etag = client.get('/api/sync/pull', headers={'Authorization': f'Bearer {other}'}).headers['ETag']
+
+    assert len({json_etag, stream.headers['ETag'], other_etag}) == 3
+    assert 'Accept' in stream.headers['Vary']
+
+
+def test_errors_are_not_cached(client, auth_headers):
+    response = client.get('/api/stats/progression/inconnu', headers=auth_headers)
+
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
@@ -0,0 +1,82 @@
+"""
+Tests du hachage Argon2 partagé (paramètres, rehachage, pool borné)
+"""
+import threading
+
+from argon2 import PasswordHasher
+
+from models import db, User
+from utils.passwords import PasswordService, benchmark_logins, get_password_service
+
+
+def login(client):
+    return client.post('/api/auth/login', json={'username': 'tester', 'password': 'test123'})
+
+
+def test_register_uses_configured_parameters(app, auth_headers):
+    user = User.query.filter_by(username='tester').one()
+
+    assert '$m=8192,t=1,p=1$' in user.password_hash
+    assert user.check_password('test123') and not user.check_password('autre')
+
+
+def test_login_rehashes_outdated_hash(client, auth_headers):
+    user = User.query.filter_by(username='tester').one()
+    user.password_hash = PasswordHasher(time_cost=2, memory_cost=8192, parallelism=1).hash('test123')
+    db.session.commit()
+
+    assert login(client).status_code == 200
+
+    db.session.refresh(user)
+    assert not get_password_service().needs_rehash(user.password_hash)
+    assert login(client).status_code == 200
+
+
+def test_saturated_pool_returns_503(app, client, auth_headers):
+    service = app.extensions['password_service'] = PasswordService(get_password_service().hasher, max_pending=1)
+    service._slots.acquire()
+
+    response = login(client)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+    service._slots.release()
+    assert login(client).status_code == 200
+
+
+class GatedHasher:
+    """PasswordHasher dont les vérifications attendent l'ouverture de gate"""
+
+    def __init__(self, hasher):
+        self.hasher = hasher
+        self.gate = threading.Event()
+
+    def verify(self, password_hash, password):
+        self.gate.wait()
+        return self.hasher.verify(password_hash, password)
+
+    def __getattr__(self, name):
+        return getattr(self.hasher, name)
+
+
+def test_slow_hash_returns_503_and_keeps_its_slot(app, client, auth_headers):
+    hasher = GatedHasher(get_password_service().hasher)
+    service = app.extensions['password_service'] = PasswordService(hasher, max_pending=1, timeout=0.05)
+
+    try:
+        assert login(client).status_code == 503
+        # Calcul toujours en cours : sa place reste prise
+        assert login(client).status_code == 503
+    finally:
+        hasher.gate.set()
+
+    assert service._slots.acquire(timeout=5)  # Rendue à la fin du calcul
+    service._slots.release()
+    assert login(client).status_code == 200
+
+
+def test_benchmark_reports_rates(app):
+    result = benchmark_logins(get_password_service(), logins=4)
+
+    assert result['single_thread_per_second'] > 0
+    assert result['pool_per_second_per_core'] > 0
@@ -0,0 +1,72 @@
+"""
+Tests des records personnels par exercice (PersonalBest)
+"""
+from models import ExerciseSet, PersonalBest
+from services.personal_bests import recompute_personal_bests
+
+
+def push(client, headers, items):
+    return client.post('/api/sync/push', headers=headers, json={'items': items}).get_json()
+
+
+def set_item(uuid, workout_exercise_uuid, weight_kg, reps=5, **data):
+    return {'entity_type': 'exercise_set', 'entity_uuid': uuid, 'action': 'create',
+            'data': {'workout_exercise_uuid': workout_exercise_uuid, 'set_number': 1,
+                     'weight_kg': weight_kg, 'reps': reps, **data}}
+
+
+def pr_flags():
+    return {s.uuid: s.is_pr for s in ExerciseSet.query}
+
+
+def snapshot(pb):
+    return (pb.best_1rm, pb.best_1rm_set_id, pb.heaviest_weight, pb.best_volume)
+
+
+def test_pr_detected_across_history(client, auth_headers, session_items):
+    push(client, auth_headers, session_items('w1', n_sets=2))
+    push(client, auth_headers, session_items('w2', n_sets=0) + [
+        set_item('w2-light', 'w2-we0', 90, is_pr=True),
+        set_item('w2-heavy', 'w2-we0', 105),
+        set_item('w2-warmup', 'w2-we0', 150, is_warmup=True),
+    ])
+
+    flags = pr_flags()
+    assert flags['w1-we0-s0'] and flags['w1-we0-s1']
+    assert not flags['w2-light']  # Le is_pr du client est ignoré
+    assert flags['w2-heavy']
+    assert not flags['w2-warmup']
+
+    pb = PersonalBest.query.one()
+    assert pb.best_1rm_set_id == ExerciseSet.query.filter_by(uuid='w2-heavy').one().id
+    assert pb.heaviest_weight == 105
+
+
+def test_deleting_record_set_recomputes(client, auth_headers, session_items):
+    push(client, auth_headers, session_items('w1', n_sets=3))
+    push(client, auth_headers, [
+        {'entity_type': 'exercise_set', 'entity_uuid': 'w1-we0-s2', 'action': 'delete', 'data': {}}
+    ])
+
+    pb = PersonalBest.query.one()
+    incremental = snapshot(pb)
+    recompute_personal_bests(pb.user_id)
+    assert incremental == snapshot(pb)
+    assert pb.heaviest_weight == 101
+
+    push(client, auth_headers, [{'entity_type': 'workout', 'entity_uuid': 'w1', 'action': 'delete', 'data': {}}])
+    assert PersonalBest.query.count() == 0
+
+
+def test_personal_records_endpoint_reads_table(client, auth_headers, session_items):
+    push(client, auth_headers, session_items('w1', n_sets=2))
+    push(client, auth_headers, session_items('w2', exercise_uuid='ex-deadlift', n_sets=1,
+                                             workout_date='2026-02-01T10:00:00Z'))
+
+    data = client.get('/api/stats/personal-records', headers=auth_headers).get_json()
+
+    assert data['total_prs'] == 2
+    assert [r['exercise_uuid'] for r in data['records']] == ['ex-deadlift', 'ex-squat']
+    squat = data['records'][1]
+    assert (squat['weight_kg'], squat['reps'], squat['heaviest_weight']) == (101, 5, 101)
+    assert squat['date'].startswith('2026-01-05')
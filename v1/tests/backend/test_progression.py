@@ -0,0 +1,74 @@
+"""
+Tests des cumuls de progression par exercice (ExerciseDailyProgress)
+"""
+from models import ExerciseDailyProgress
+from services.progression import refresh_daily_progress
+
+
+def push(client, headers, items):
+    return client.post('/api/sync/push', headers=headers, json={'items': items}).get_json()
+
+
+def progression(client, headers, query=''):
+    response = client.get(f'/api/stats/progression/ex-squat{query}', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def rollup():
+    return sorted(
+        (row.exercise_id, row.day.isoformat(), row.sessions, row.total_sets, row.total_volume,
+         row.best_1rm, row.top_weight)
+        for row in ExerciseDailyProgress.query
+    )
+
+
+def test_rollup_follows_pushes(client, auth_headers, session_items):
+    push(client, auth_headers,
+         session_items('w1', n_sets=2, workout_date='2026-01-05T08:00:00Z')
+         + session_items('w2', n_sets=1, workout_date='2026-01-05T18:00:00Z')
+         + session_items('w3', n_sets=1, workout_date='2026-01-12T10:00:00Z'))
+
+    day = progression(client, auth_headers)['progression'][0]
+    assert (day['period'], day['sessions'], day['total_sets']) == ('2026-01-05', 2, 3)
+    assert (day['total_volume'], day['top_weight']) == (1505, 101)
+
+    # Séance déplacée puis suppression d'une série : seuls ces jours sont recalculés
+    moved = session_items('w3', n_sets=0, workout_date='2026-01-06T10:00:00Z')[:1]
+    push(client, auth_headers, moved + [
+        {'entity_type': 'exercise_set', 'entity_uuid': 'w1-we0-s1', 'action': 'delete', 'data': {}}
+    ])
+
+    incremental = rollup()
+    refresh_daily_progress(ExerciseDailyProgress.query.first().user_id)
+    assert rollup() == incremental
+    assert [row[1] for row in incremental] == ['2026-01-05', '2026-01-06']
+    assert incremental[0][3] == 2
+
+
+def test_progression_buckets_and_pages(client, auth_headers, session_items):
+    items = []
+    for i, day in enumerate(('2026-01-05', '2026-01-07', '2026-01-14', '2026-02-02', '2026-03-30')):
+        items += session_items(f'w{i}', n_sets=1, workout_date=f'{day}T10:00:00Z')
+    push(client, auth_headers, items)
+
+    weeks = progression(client, auth_headers, '?bucket=week')
+    assert [p['period'] for p in weeks['progression']] == ['2026-01-05', '2026-01-12', '2026-02-02', '2026-03-30']
+    assert weeks['progression'][0]['sessions'] == 2
+
+    months = progression(client, auth_headers, '?bucket=month&from=2026-01-10&to=2026-03-01')
+    assert [(p['period'], p['sessions']) for p in months['progression']] == [('2026-01-01', 1), ('2026-02-01', 1)]
+
+    page = progression(client, auth_headers, '?limit=2')
+    assert [p['period'] for p in page['progression']] == ['2026-01-05', '2026-01-07']
+    page = progression(client, auth_headers, f'?limit=2&cursor={page["next_cursor"]}')
+    assert [p['period'] for p in page['progression']] == ['2026-01-14', '2026-02-02']
+    page = progression(client, auth_headers, f'?limit=2&cursor={page["next_cursor"]}')
+    assert [p['period'] for p in page['progression']] == ['2026-03-30']
+    assert page['next_cursor'] is None
+
+
+def test_progression_rejects_bad_parameters(client, auth_headers):
+    for query in ('?bucket=year', '?from=hier', '?limit=abc'):
+        response = client.get(f'/api/stats/progression/ex-squat{query}', headers=auth_headers)
+        assert response.status_code == 400
@@ -0,0 +1,95 @@
+"""
+Régression des plans de requête (SQLite EXPLAIN QUERY PLAN)
+Chaque SELECT émis par les routes chaudes est rejoué avec EXPLAIN QUERY PLAN
+sur une base peuplée : aucun parcours complet de table n'est accepté.
+"""
+import re
+
+import pytest
+from sqlalchemy import event
+
+from models import db
+
+pytestmark = pytest.mark.sqlite_only
+
+# "SCAN workouts" = parcours complet ; "SCAN t USING [COVERING] INDEX" est un
+# parcours d'index ordonné, accepté, comme le parcours d'une sous-requête
+# matérialisée (ses propres tables apparaissent sur d'autres lignes du plan)
+FULL_SCAN = re.compile(r'^SCAN (?!.*\bUSING\b.*\bINDEX\b)(?!CONSTANT ROW)(?!\(subquery-\d+\))(?!anon_\d+)')
+
+HOT_URLS = [
+    '/api/sync/pull',
+    '/api/sync/pull?since=1',
+    '/api/sync/pull?stream=1',
+    '/api/stats/dashboard',
+    '/api/stats/progression/ex-squat',
+    '/api/stats/progression/ex-squat?bucket=week&from=2026-03-01&limit=5',
+    '/api/stats/progression/ex-squat?bucket=month&cursor=2026-02-01',
+    '/api/stats/recommendations',
+    '/api/stats/personal-records',
+]
+
+
+class SelectRecorder:
+    """Enregistre les SELECT exécutés et leurs paramètres"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            self.queries.append((statement, parameters))
+
+
+@pytest.fixture
+def recorder(app):
+    recorder = SelectRecorder()
+    event.listen(db.engine, 'before_cursor_execute', recorder)
+    yield recorder
+    event.remove(db.engine, 'before_cursor_execute', recorder)
+
+
+@pytest.fixture
+def seeded(client, auth_headers, session_items):
+    """Base peuplée : l'utilisateur testé ne possède qu'une fraction des lignes"""
+    other = client.post('/api/auth/register', json={
+        'username': 'other', 'email': 'other@example.com', 'password': 'test123'
+    }).get_json()['token']
+
+    for headers, prefix, n_workouts in ((auth_headers, 'a', 40), ({'Authorization': f'Bearer {other}'}, 'b', 400)):
+        items = []
+        for i in range(n_workouts):
+            items += session_items(f'{prefix}{i}', n_exercises=3, n_sets=4,
+                                   workout_date=f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}T10:00:00Z')
+        client.post('/api/sync/push', headers=headers, json={'items': items})
+
+    # Pas d'ANALYZE : sans statistiques, le planificateur ne retient un
+    # parcours complet que faute d'index utilisable
+    return auth_headers
+
+
+def full_scans(statement, parameters):
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return [row[-1] for row in rows if FULL_SCAN.match(row[-1])]
+
+
+def test_hot_read_queries_use_indexes(client, seeded, recorder):
+    for url in HOT_URLS:
+        recorder.queries = []
+        response = client.get(url, headers=seeded)
+        assert response.status_code == 200
+        response.get_data()
+
+        for statement, parameters in recorder.queries:
+            assert full_scans(statement, parameters) == [], f'{url}: {statement}'
+
+
+def test_push_queries_use_indexes(client, seeded, session_items, recorder):
+    items = session_items('a0', n_exercises=3, n_sets=4) + [
+        {'entity_type': 'workout', 'entity_uuid': 'a1', 'action': 'delete', 'data': {}}
+    ]
+    client.post('/api/sync/push', headers=seeded, json={'items': items})
+
+    assert recorder.queries
+    for statement, parameters in recorder.queries:
+        assert full_scans(statement, parameters) == [], statement
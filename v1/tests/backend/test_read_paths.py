@@ -0,0 +1,55 @@
+"""
+Tests du nombre de requêtes des chemins de lecture (pas de N+1)
+"""
+from models import db
+
+
+def seed_history(client, headers, session_items, n_workouts, prefix):
+    items = []
+    for i in range(n_workouts):
+        items += session_items(f'{prefix}{i}', n_exercises=2, n_sets=3,
+                               workout_date=f'2026-01-{i % 28 + 1:02d}T10:00:00Z')
+    client.post('/api/sync/push', headers=headers, json={'items': items})
+
+
+def count_queries(client, headers, query_counter, url):
+    # Session vide, comme en production (l'utilisateur resterait ou non
+    # dans l'identity map selon le GC)
+    db.session.expunge_all()
+    query_counter.reset()
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return query_counter.count
+
+
+def test_full_pull_query_count_is_constant(client, auth_headers, session_items, query_counter):
+    seed_history(client, auth_headers, session_items, 1, 'a')
+    small = count_queries(client, auth_headers, query_counter, '/api/sync/pull')
+
+    seed_history(client, auth_headers, session_items, 25, 'b')
+    large = count_queries(client, auth_headers, query_counter, '/api/sync/pull')
+
+    assert large == small
+
+
+def test_full_pull_serializes_whole_graph(client, auth_headers, session_items):
+    seed_history(client, auth_headers, session_items, 2, 'a')
+
+    workouts = client.get('/api/sync/pull', headers=auth_headers).get_json()['workouts']
+
+    assert len(workouts) == 2
+    exercise = workouts[0]['exercises'][0]
+    assert exercise['exercise_uuid'] == 'ex-squat'
+    assert len(exercise['sets']) == 3
+
+
+def test_stats_read_paths_query_count_is_constant(client, auth_headers, session_items, query_counter):
+    urls = ['/api/stats/progression/ex-squat', '/api/stats/recommendations']
+
+    seed_history(client, auth_headers, session_items, 1, 'a')
+    small = [count_queries(client, auth_headers, query_counter, url) for url in urls]
+
+    seed_history(client, auth_headers, session_items, 25, 'b')
+    large = [count_queries(client, auth_headers, query_counter, url) for url in urls]
+
+    assert large == small
@@ -0,0 +1,109 @@
+"""
+Tests du cache des réponses de stats (mémoire et faux Redis)
+"""
+import pytest
+
+from utils.response_cache import MemoryCache, RedisCache, ResponseCache
+
+
+class FakeRedis:
+    """Client en mémoire avec le sous-ensemble get/set/delete de redis.Redis"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def cache(request, app):
+    store = MemoryCache(max_entries=64) if request.param == 'memory' else RedisCache(FakeRedis())
+    cache = app.extensions['response_cache'] = ResponseCache(store, ttl=60)
+    return cache
+
+
+def get(client, headers, url):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_hits_until_push_invalidates(client, auth_headers, session_items, cache, query_counter):
+    url = '/api/stats/personal-records'
+    client.post('/api/sync/push', headers=auth_headers, json={'items': session_items('w1')})
+
+    first = get(client, auth_headers, url)
+    query_counter.reset()
+    assert get(client, auth_headers, url) == first
+    assert query_counter.count == 1  # Version des données (ETag) uniquement
+    assert (cache.hits['stats.get_personal_records'], cache.misses['stats.get_personal_records']) == (1, 1)
+
+    client.post('/api/sync/push', headers=auth_headers, json={
+        'items': session_items('w2', exercise_uuid='ex-deadlift', n_sets=1)
+    })
+    assert get(client, auth_headers, url)['total_prs'] == 2
+    assert cache.misses['stats.get_personal_records'] == 2
+
+
+def test_push_without_invalidation_is_not_served_stale(client, auth_headers, session_items, cache, monkeypatch):
+    # Invalidation manquée : autre worker (memory://) ou lecture entre commit et invalidation
+    monkeypatch.setattr('routes.sync.invalidate_user_cache', lambda user_uuid: None)
+    url = '/api/stats/personal-records'
+    client.post('/api/sync/push', headers=auth_headers, json={'items': session_items('w1')})
+    assert get(client, auth_headers, url)['total_prs'] == 1
+
+    client.post('/api/sync/push', headers=auth_headers, json={
+        'items': session_items('w2', exercise_uuid='ex-deadlift', n_sets=1)
+    })
+    assert get(client, auth_headers, url)['total_prs'] == 2
+
+
+def test_key_covers_user_and_arguments(client, auth_headers, session_items, cache):
+    other = client.post('/api/auth/register', json={
+        'username': 'other', 'email': 'other@example.com', 'password': 'test123'
+    }).get_json()['token']
+    client.post('/api/sync/push', headers=auth_headers, json={'items': session_items('w1')})
+
+    get(client, auth_headers, '/api/stats/progression/ex-squat')
+    get(client, auth_headers, '/api/stats/progression/ex-squat?bucket=week')
+    get(client, auth_headers, '/api/stats/progression/ex-deadlift')
+    assert get(client, {'Authorization': f'Bearer {other}'}, '/api/stats/progression/ex-squat')['progression'] == []
+
+    assert sum(cache.hits.values()) == 0
+    assert cache.misses['stats.get_exercise_progression'] == 4
+
+
+def test_memory_cache_is_bounded_and_expires(monkeypatch):
+    store = MemoryCache(max_entries=2)
+    store.set('a', '1')
+    store.set('b', '2', ttl=10)
+    store.get('a')
+    store.set('c', '3')
+
+    assert store.get('b') is None  # Moins récemment utilisée
+    assert (store.get('a'), store.get('c')) == ('1', '3')
+
+    now = 1000.0
+    monkeypatch.setattr('utils.response_cache.time.monotonic', lambda: now)
+    store.set('d', '4', ttl=10)
+    now = 1011.0
+    assert store.get('d') is None
+
+
+def test_cache_counters_endpoint(app, client, auth_headers, cache):
+    app.config['HEALTH_DIAGNOSTICS'] = True
+    get(client, auth_headers, '/api/stats/dashboard')
+    get(client, auth_headers, '/api/stats/dashboard')
+
+    data = client.get('/api/health/cache').get_json()['cache']
+    assert (data['hits'], data['misses'], data['hit_ratio']) == (1, 1, 0.5)
+    assert data['endpoints']['stats.get_dashboard'] == {'hits': 1, 'misses': 1}
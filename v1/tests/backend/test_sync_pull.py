@@ -0,0 +1,80 @@
+"""
+Tests du pull de synchronisation (complet, incrémental et en flux)
+"""
+import json
+
+
+def push(client, headers, items):
+    return client.post('/api/sync/push', headers=headers, json={'items': items}).get_json()
+
+
+def test_full_pull_returns_nested_history_and_cursor(client, auth_headers, session_items):
+    push(client, auth_headers, session_items('w1', n_sets=2))
+
+    data = client.get('/api/sync/pull', headers=auth_headers).get_json()
+
+    assert data['mode'] == 'full'
+    assert data['cursor'] == 1
+    assert data['total_workouts'] == 1
+    assert len(data['workouts'][0]['exercises'][0]['sets']) == 2
+
+
+def test_delta_pull_returns_only_newer_rows(client, auth_headers, session_items):
+    push(client, auth_headers, session_items('w1'))
+    cursor = client.get('/api/sync/pull', headers=auth_headers).get_json()['cursor']
+
+    push(client, auth_headers, [
+        {'entity_type': 'exercise_set', 'entity_uuid': 'w1-we0-s3', 'action': 'create',
+         'data': {'workout_exercise_uuid': 'w1-we0', 'set_number': 4, 'weight_kg': 110, 'reps': 3}}
+    ])
+
+    data = client.get(f'/api/sync/pull?since={cursor}', headers=auth_headers).get_json()
+
+    assert data['mode'] == 'delta'
+    assert data['cursor'] == cursor + 1
+    # La séance parente revient avec ses agrégats recalculés
+    assert [(w['uuid'], w['total_volume']) for w in data['changes']['workouts']] == [('w1', 1515 + 330)]
+    assert [s['uuid'] for s in data['changes']['exercise_sets']] == ['w1-we0-s3']
+    assert data['changes']['exercise_sets'][0]['workout_exercise_uuid'] == 'w1-we0'
+    assert data['deleted'] == []
+
+    empty = client.get(f"/api/sync/pull?since={data['cursor']}", headers=auth_headers).get_json()
+    assert empty['changes']['exercise_sets'] == []
+
+
+def test_delta_pull_reports_cascaded_deletes(client, auth_headers, session_items):
+    push(client, auth_headers, session_items('w1', n_sets=2))
+
+    push(client, auth_headers, [{'entity_type': 'workout', 'entity_uuid': 'w1', 'action': 'delete', 'data': {}}])
+
+    data = client.get('/api/sync/pull?since=1', headers=auth_headers).get_json()
+    deleted = {(d['entity_type'], d['entity_uuid']) for d in data['deleted']}
+
+    assert deleted == {
+        ('workout', 'w1'),
+        ('workout_exercise', 'w1-we0'),
+        ('exercise_set', 'w1-we0-s0'),
+        ('exercise_set', 'w1-we0-s1'),
+    }
+
+
+def test_pull_rejects_invalid_cursor(client, auth_headers):
+    response = client.get('/api/sync/pull?since=abc', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_streaming_pull_emits_one_line_per_workout(client, auth_headers, session_items):
+    push(client, auth_headers, session_items('w1') + session_items('w2', workout_date='2026-01-06T10:00:00Z'))
+
+    response = client.get('/api/sync/pull', headers={**auth_headers, 'Accept': 'application/x-ndjson'})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert [line['type'] for line in lines] == ['user', 'workout', 'workout', 'end']
+    assert lines[0]['cursor'] == 1
+    assert lines[1]['workout']['uuid'] == 'w2'
+    assert len(lines[1]['workout']['exercises'][0]['sets']) == 3
+    assert lines[-1]['total_workouts'] == 2
+
+    same = client.get('/api/sync/pull?stream=1', headers=auth_headers)
+    assert same.get_data(as_text=True) == response.get_data(as_text=True)
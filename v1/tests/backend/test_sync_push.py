@@ -0,0 +1,138 @@
+"""
+Tests du push de synchronisation (moteur par lots)
+"""
+from models import db, Workout, WorkoutExercise, ExerciseSet
+
+
+def test_push_creates_full_session(client, auth_headers, session_items):
+    items = session_items('w1', n_exercises=2, n_sets=3)
+
+    response = client.post('/api/sync/push', headers=auth_headers, json={'items': items})
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['synced'] == len(items)
+    assert data['errors'] == 0
+    assert [r['entity_uuid'] for r in data['results']] == [i['entity_uuid'] for i in items]
+
+    assert Workout.query.count() == 1
+    assert WorkoutExercise.query.count() == 2
+    assert ExerciseSet.query.count() == 6
+    assert ExerciseSet.query.filter_by(uuid='w1-we0-s0').one().estimated_1rm > 100
+
+
+def test_push_children_before_parents_in_payload(client, auth_headers, session_items):
+    items = list(reversed(session_items('w1')))
+
+    data = client.post('/api/sync/push', headers=auth_headers, json={'items': items}).get_json()
+
+    assert data['errors'] == 0
+    assert ExerciseSet.query.count() == 3
+
+
+def test_push_reports_errors_per_item(client, auth_headers, session_items):
+    items = session_items('w1', n_sets=1) + [
+        {'entity_type': 'exercise_set', 'entity_uuid': 'orphan', 'action': 'create',
+         'data': {'workout_exercise_uuid': 'missing', 'set_number': 1, 'weight_kg': 50, 'reps': 5}},
+        {'entity_type': 'mystery', 'entity_uuid': 'm1', 'action': 'create', 'data': {}}
+    ]
+
+    data = client.post('/api/sync/push', headers=auth_headers, json={'items': items}).get_json()
+
+    assert data['errors'] == 1
+    assert data['error_details'][0]['entity_uuid'] == 'orphan'
+    assert data['results'][-1] == {'entity_uuid': 'm1', 'status': 'skipped'}
+    assert ExerciseSet.query.count() == 1
+
+
+def test_push_update_and_delete(client, auth_headers, session_items):
+    client.post('/api/sync/push', headers=auth_headers, json={'items': session_items('w1')})
+
+    items = [
+        {'entity_type': 'exercise_set', 'entity_uuid': 'w1-we0-s0', 'action': 'update',
+         'data': {'workout_exercise_uuid': 'w1-we0', 'set_number': 1, 'weight_kg': 120, 'reps': 3}},
+        {'entity_type': 'exercise_set', 'entity_uuid': 'w1-we0-s2', 'action': 'delete', 'data': {}}
+    ]
+    data = client.post('/api/sync/push', headers=auth_headers, json={'items': items}).get_json()
+
+    assert data['errors'] == 0
+    assert ExerciseSet.query.count() == 2
+    assert ExerciseSet.query.filter_by(uuid='w1-we0-s0').one().weight_kg == 120
+
+
+def test_push_query_count_is_independent_of_batch_size(client, auth_headers, session_items, query_counter):
+    # Chaque lot bat le record de la séance d'échauffement (mêmes écritures)
+    client.post('/api/sync/push', headers=auth_headers, json={'items': session_items('warmup', n_sets=1)})
+
+    # Chaque requête part d'une session vide, comme en production (sinon
+    # l'utilisateur peut rester ou non dans l'identity map selon le GC)
+    db.session.expunge_all()
+    query_counter.reset()
+    client.post('/api/sync/push', headers=auth_headers, json={'items': session_items('small', n_sets=2)})
+    small = query_counter.count
+
+    db.session.expunge_all()
+    query_counter.reset()
+    client.post('/api/sync/push', headers=auth_headers,
+                json={'items': session_items('large', n_exercises=10, n_sets=30)})
+    large = query_counter.count
+
+    assert large == small
+
+
+def test_push_delete_query_count_is_independent_of_batch_size(client, auth_headers, session_items, query_counter):
+    for n in range(11):
+        client.post('/api/sync/push', headers=auth_headers,
+                    json={'items': session_items(f'w{n}', workout_date=f'2026-01-{n + 1:02d}T10:00:00Z')})
+
+    def delete_workouts(uuids):
+        db.session.expunge_all()
+        query_counter.reset()
+        data = client.post('/api/sync/push', headers=auth_headers, json={'items': [
+            {'entity_type': 'workout', 'entity_uuid': uuid, 'action': 'delete', 'data': {}} for uuid in uuids
+        ]}).get_json()
+        assert data['errors'] == 0
+        return query_counter.count
+
+    small = delete_workouts(['w0'])
+    large = delete_workouts([f'w{n}' for n in range(1, 11)])
+
+    assert large == small
+    assert Workout.query.count() == 0
+    assert ExerciseSet.query.count() == 0
+
+
+def test_push_delete_workout_cascades(client, auth_headers, session_items):
+    client.post('/api/sync/push', headers=auth_headers, json={'items': session_items('w1')})
+
+    items = [
+        {'entity_type': 'workout', 'entity_uuid': 'w1', 'action': 'delete', 'data': {}},
+        {'entity_type': 'exercise_set', 'entity_uuid': 'late', 'action': 'create',
+         'data': {'workout_exercise_uuid': 'w1-we0', 'set_number': 4, 'weight_kg': 90, 'reps': 5}}
+    ]
+    data = client.post('/api/sync/push', headers=auth_headers, json={'items': items}).get_json()
+
+    assert data['errors'] == 1
+    assert Workout.query.count() == 0
+    assert WorkoutExercise.query.count() == 0
+    assert ExerciseSet.query.count() == 0
+
+
+def test_push_recomputes_aggregates_server_side(client, auth_headers, session_items):
+    items = session_items('w1', n_sets=2)
+    items[0]['data'].update(total_volume=99999, xp_earned=99999)
+    items[1]['data'].update(total_volume=99999, total_sets=42)
+    items.append({'entity_type': 'exercise_set', 'entity_uuid': 'w1-warmup', 'action': 'create',
+                  'data': {'workout_exercise_uuid': 'w1-we0', 'set_number': 0, 'weight_kg': 60,
+                           'reps': 10, 'is_warmup': True}})
+    client.post('/api/sync/push', headers=auth_headers, json={'items': items})
+
+    workout_exercise = WorkoutExercise.query.one()
+    assert (workout_exercise.total_sets, workout_exercise.total_reps) == (2, 10)
+    assert workout_exercise.total_volume == 100 * 5 + 101 * 5
+    assert workout_exercise.estimated_1rm == round(101 / (1.0278 - 0.0278 * 5), 2)
+
+    workout = Workout.query.one()
+    multiplier = workout_exercise.exercise_info.xp_multiplier
+    assert workout.total_volume == 1005
+    assert workout.xp_earned == int(1005 * multiplier)
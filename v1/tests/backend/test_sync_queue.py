@@ -0,0 +1,92 @@
+"""
+Tests du push asynchrone (SyncQueue + worker)
+"""
+from datetime import datetime, timedelta
+
+from models import db, ExerciseSet, SyncQueue, User, Workout
+from services.sync_queue import claim_next_batch, drain_sync_queue
+
+
+def test_async_push_queues_then_applies(client, auth_headers, session_items):
+    items = session_items('w1', n_sets=2)
+
+    response = client.post('/api/sync/push?async=1', headers=auth_headers, json={'items': items})
+    data = response.get_json()
+
+    assert response.status_code == 202
+    assert response.headers['Location'] == data['status_url']
+    assert data['queued'] == len(items)
+    assert Workout.query.count() == 0
+
+    status = client.get(data['status_url'], headers=auth_headers).get_json()
+    assert status['status'] == 'pending'
+    assert status['done'] is False
+
+    assert drain_sync_queue() == 1
+
+    status = client.get(data['status_url'], headers=auth_headers).get_json()
+    assert status['status'] == 'synced'
+    assert status['synced'] == len(items)
+    assert status['user']['total_xp'] == User.query.one().total_xp > 0
+    assert ExerciseSet.query.count() == 2
+    assert SyncQueue.query.filter(SyncQueue.synced_at.is_(None)).count() == 0
+
+
+def test_async_push_reports_failed_items(client, auth_headers, session_items):
+    items = session_items('w1', n_sets=1) + [
+        {'entity_type': 'exercise_set', 'entity_uuid': 'orphan', 'action': 'create',
+         'data': {'workout_exercise_uuid': 'missing', 'set_number': 1, 'weight_kg': 50, 'reps': 5}}
+    ]
+    headers = {**auth_headers, 'Prefer': 'respond-async'}
+    batch_id = client.post('/api/sync/push', headers=headers, json={'items': items}).get_json()['batch_id']
+
+    drain_sync_queue()
+    status = client.get(f'/api/sync/push/{batch_id}', headers=auth_headers).get_json()
+
+    assert status['status'] == 'partial'
+    assert status['errors'] == 1
+    assert status['error_details'][0]['entity_uuid'] == 'orphan'
+    assert SyncQueue.query.filter_by(entity_uuid='orphan').one().error_message
+
+
+def test_async_batches_applied_in_order(client, auth_headers, session_items):
+    client.post('/api/sync/push?async=1', headers=auth_headers, json={'items': session_items('w1')})
+    client.post('/api/sync/push?async=1', headers=auth_headers, json={'items': [
+        {'entity_type': 'workout', 'entity_uuid': 'w1', 'action': 'delete', 'data': {}}
+    ]})
+
+    assert drain_sync_queue() == 2
+    assert Workout.query.count() == 0
+
+
+def test_async_push_status_is_private(client, auth_headers, session_items):
+    batch_id = client.post(
+        '/api/sync/push?async=1', headers=auth_headers, json={'items': session_items('w1')}
+    ).get_json()['batch_id']
+
+    token = client.post('/api/auth/register', json={
+        'username': 'other', 'email': 'other@example.com', 'password': 'test123'
+    }).get_json()['token']
+
+    response = client.get(f'/api/sync/push/{batch_id}', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 404
+
+
+def test_expired_lease_requeues_crashed_batch(app, client, auth_headers, session_items):
+    first = client.post(
+        '/api/sync/push?async=1', headers=auth_headers, json={'items': session_items('w1')}
+    ).get_json()['status_url']
+    client.post('/api/sync/push?async=1', headers=auth_headers, json={'items': session_items('w2')})
+
+    # Worker arrêté après avoir réservé le premier lot
+    assert claim_next_batch() is not None
+    assert drain_sync_queue() == 0
+    assert client.get(first, headers=auth_headers).get_json()['status'] == 'processing'
+
+    lease = timedelta(seconds=app.config['SYNC_QUEUE_LEASE_SECONDS'] + 1)
+    SyncQueue.query.update({SyncQueue.claimed_at: datetime.utcnow() - lease})
+    db.session.commit()
+
+    assert drain_sync_queue() == 2
+    assert client.get(first, headers=auth_headers).get_json()['status'] == 'synced'
+    assert Workout.query.count() == 2
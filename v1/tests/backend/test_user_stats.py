@@ -0,0 +1,97 @@
+"""
+Tests des agrégats utilisateur (UserStats) et du dashboard
+"""
+from datetime import date, timedelta
+
+from models import User, UserStats
+from services.user_stats import rebuild_user_stats
+
+STAT_FIELDS = ('total_workouts', 'total_volume', 'total_sets', 'workouts_this_month',
+               'heaviest_lift', 'best_1rm', 'best_1rm_exercise_id', 'streak_days', 'streak_last_date')
+
+
+def push(client, headers, items):
+    return client.post('/api/sync/push', headers=headers, json={'items': items}).get_json()
+
+
+def snapshot(stats):
+    return {field: getattr(stats, field) for field in STAT_FIELDS}
+
+
+def assert_matches_rebuild():
+    stats = UserStats.query.one()
+    incremental = snapshot(stats)
+    assert incremental == snapshot(rebuild_user_stats(stats.user_id))
+
+
+def test_incremental_stats_match_rebuild(client, auth_headers, session_items):
+    this_month = date.today().replace(day=1).isoformat() + 'T09:00:00Z'
+
+    push(client, auth_headers, session_items('w1', workout_date=this_month))
+    push(client, auth_headers, session_items('w2', exercise_uuid='ex-deadlift', n_sets=4))
+    assert_matches_rebuild()
+
+    # Séance passée non complétée, série alourdie puis supprimée
+    push(client, auth_headers, [
+        {'entity_type': 'workout', 'entity_uuid': 'w1', 'action': 'update',
+         'data': {'workout_date': this_month, 'is_completed': False, 'total_volume': 0}},
+        {'entity_type': 'exercise_set', 'entity_uuid': 'w2-we0-s0', 'action': 'update',
+         'data': {'workout_exercise_uuid': 'w2-we0', 'set_number': 1, 'weight_kg': 250, 'reps': 1}},
+    ])
+    assert_matches_rebuild()
+
+    push(client, auth_headers, [
+        {'entity_type': 'exercise_set', 'entity_uuid': 'w2-we0-s0', 'action': 'delete', 'data': {}},
+        {'entity_type': 'workout', 'entity_uuid': 'w1', 'action': 'delete', 'data': {}},
+    ])
+    assert_matches_rebuild()
+
+
+def test_dashboard_reads_aggregate(client, auth_headers, session_items):
+    push(client, auth_headers, session_items('w1', n_sets=2))
+
+    data = client.get('/api/stats/dashboard', headers=auth_headers).get_json()
+
+    assert data['stats']['total_workouts'] == 1
+    assert data['stats']['best_1rm']['exercise'] == 'Squat Barre'
+    assert data['stats']['best_1rm']['value'] == round(101 / (1.0278 - 0.0278 * 5), 2)
+
+
+def test_streak_counts_distinct_consecutive_days(client, auth_headers, session_items):
+    def day(offset, hour=10):
+        return (date.today() - timedelta(days=offset)).isoformat() + f'T{hour:02d}:00:00Z'
+
+    # Deux séances aujourd'hui, une hier, puis un trou
+    push(client, auth_headers, session_items('w1', workout_date=day(0)))
+    push(client, auth_headers, session_items('w2', workout_date=day(0, hour=18)))
+    push(client, auth_headers, session_items('w3', workout_date=day(1)))
+    push(client, auth_headers, session_items('w4', workout_date=day(3)))
+    assert_matches_rebuild()
+
+    data = client.get('/api/stats/dashboard', headers=auth_headers).get_json()
+    assert data['stats']['current_streak'] == 2
+
+    # Le trou comblé relie la série
+    push(client, auth_headers, session_items('w5', workout_date=day(2)))
+    data = client.get('/api/stats/dashboard', headers=auth_headers).get_json()
+    assert data['stats']['current_streak'] == 4
+
+
+def test_dashboard_creates_missing_aggregate(client, auth_headers):
+    data = client.get('/api/stats/dashboard', headers=auth_headers).get_json()
+
+    assert data['stats']['total_workouts'] == 0
+    assert data['stats']['best_1rm'] is None
+    assert UserStats.query.count() == 1
+
+
+def test_rebuild_stats_command(app, client, auth_headers, session_items):
+    push(client, auth_headers, session_items('w1'))
+    UserStats.query.delete()
+
+    result = app.test_cli_runner().invoke(args=['rebuild-stats'])
+
+    assert '1 utilisateur' in result.output
+    stats = UserStats.query.one()
+    assert stats.user_id == User.query.one().id
+    assert stats.total_sets == 3
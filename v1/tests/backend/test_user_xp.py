@@ -0,0 +1,50 @@
+"""
+Tests de l'XP incrémental et de la table des niveaux
+"""
+from models import Exercise, User
+from utils.calculations import RPG_CONFIG, calculate_level, get_xp_for_level
+
+
+def push(client, headers, items):
+    return client.post('/api/sync/push', headers=headers, json={'items': items}).get_json()
+
+
+def workout_update(uuid, is_completed=True):
+    return {'entity_type': 'workout', 'entity_uuid': uuid, 'action': 'update',
+            'data': {'workout_date': '2026-01-05T10:00:00Z', 'is_completed': is_completed}}
+
+
+def test_level_table_matches_formula():
+    for total_xp in list(range(0, 3000, 7)) + [10 ** 6, 10 ** 9]:
+        level = 1
+        while level < RPG_CONFIG['MAX_LEVEL'] and total_xp >= get_xp_for_level(level + 1):
+            level += 1
+        assert calculate_level(total_xp)['level'] == level
+
+
+def test_push_applies_xp_delta(client, auth_headers, session_items):
+    multiplier = Exercise.query.filter_by(uuid='ex-squat').one().xp_multiplier
+
+    # XP recalculée côté serveur (volume × multiplicateur), valeur client ignorée
+    xp_w1 = int((100 + 101 + 102) * 5 * multiplier)
+    data = push(client, auth_headers, session_items('w1', xp_earned=999999))
+    assert data['user'] == {**data['user'], 'total_xp': xp_w1, 'level': calculate_level(xp_w1)['level']}
+
+    xp_w2 = int(100 * 5 * multiplier)
+    data = push(client, auth_headers, session_items('w2', n_sets=1))
+    assert data['user']['total_xp'] == xp_w1 + xp_w2
+
+    data = push(client, auth_headers, [workout_update('w2', is_completed=False)])
+    assert data['user']['total_xp'] == xp_w1
+
+    # Une série supprimée fait baisser l'XP de sa séance
+    data = push(client, auth_headers, [
+        {'entity_type': 'exercise_set', 'entity_uuid': 'w1-we0-s2', 'action': 'delete', 'data': {}}
+    ])
+    assert data['user']['total_xp'] == int((100 + 101) * 5 * multiplier)
+
+    data = push(client, auth_headers, [
+        {'entity_type': 'workout', 'entity_uuid': 'w1', 'action': 'delete', 'data': {}}
+    ])
+    assert data['user'] == {**data['user'], 'total_xp': 0, 'level': 1}
+    assert User.query.one().total_xp == 0
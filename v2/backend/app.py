@@ -1,15 +1,23 @@
 """
 Backend FitnessRPG v2 - API d'authentification simple
 """
+import json
 import os
+import queue
+import threading
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import case, delete, exc, func, insert, inspect, select, update
+from sqlalchemy.orm import defer, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
+import click
 import jwt
 
 # ====================================
@@ -23,7 +31,12 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 CORS(app)
 db = SQLAlchemy(app)
-ph = PasswordHasher()
+# Argon2id : coût réglable par environnement (profil RFC 9106 "low memory" par défaut)
+ph = PasswordHasher(
+    time_cost=int(os.environ.get('ARGON2_TIME_COST', 3)),
+    memory_cost=int(os.environ.get('ARGON2_MEMORY_COST', 65536)),
+    parallelism=int(os.environ.get('ARGON2_PARALLELISM', 4))
+)
 
 # ====================================
 # Modèles
@@ -66,11 +79,24 @@ class Workout(db.Model):
     end_time = db.Column(db.BigInteger, nullable=True)
     duration = db.Column(db.Integer, nullable=True)  # durée en millisecondes
     total_xp = db.Column(db.Integer, default=0)
-    exercises_json = db.Column(db.Text, nullable=False)  # JSON stringifié des exercices
+    # Ancien stockage (JSON stringifié des exercices) : '[]' une fois les
+    # exercices normalisés (workout_exercises / exercise_sets)
+    exercises_json = db.Column(db.Text, nullable=False, default='[]')
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
+    exercises = db.relationship(
+        'WorkoutExercise', backref='workout', order_by='WorkoutExercise.order_index',
+        cascade='all, delete-orphan'
+    )
+
+    __table_args__ = (
+        # Une séance est identifiée par son heure de début (id local du client)
+        db.Index('uq_workouts_user_start_time', 'user_uuid', 'start_time', unique=True),
+        # Historique paginé : ORDER BY date DESC, id DESC
+        db.Index('ix_workouts_user_date', 'user_uuid', 'date', 'id'),
+    )
+
     def to_dict(self):
-        import json
         return {
             'id': self.id,
             'user_uuid': self.user_uuid,
@@ -79,10 +105,462 @@ class Workout(db.Model):
             'endTime': self.end_time,
             'duration': self.duration,
             'totalXP': self.total_xp,
-            'exercises': json.loads(self.exercises_json) if self.exercises_json else [],
+            'exercises': self.exercises_data(),
             'created_at': self.created_at.isoformat()
         }
 
+    def exercises_data(self):
+        """Exercices au format du client : lignes normalisées, ou JSON pas encore migré"""
+        if self.exercises:
+            return [exercise.to_dict() for exercise in self.exercises]
+        return json.loads(self.exercises_json) if self.exercises_json else []
+
+
+class WorkoutExercise(db.Model):
+    """Exercice d'une séance (exercice du catalogue client, par son id)"""
+    __tablename__ = 'workout_exercises'
+
+    id = db.Column(db.Integer, primary_key=True)
+    workout_id = db.Column(db.Integer, db.ForeignKey('workouts.id'), nullable=False, index=True)
+    order_index = db.Column(db.Integer, nullable=False, default=0)
+    exercise_key = db.Column(db.String(50), nullable=True)  # id côté client (ex: bench-press)
+    name = db.Column(db.String(100), nullable=True)
+    category = db.Column(db.String(50), nullable=True)
+    exercise_type = db.Column(db.String(20), nullable=True)  # weight, reps, duration
+
+    # Agrégats des séries (calculés à l'écriture)
+    total_sets = db.Column(db.Integer, default=0)
+    total_volume = db.Column(db.Float, default=0.0)  # kg × reps
+    total_xp = db.Column(db.Integer, default=0)
+
+    sets = db.relationship(
+        'ExerciseSet', backref='workout_exercise', order_by='ExerciseSet.set_number',
+        cascade='all, delete-orphan'
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.exercise_key,
+            'name': self.name,
+            'category': self.category,
+            'type': self.exercise_type,
+            'sets': [exercise_set.to_dict() for exercise_set in self.sets]
+        }
+
+
+class ExerciseSet(db.Model):
+    """Série d'un exercice de séance"""
+    __tablename__ = 'exercise_sets'
+
+    id = db.Column(db.Integer, primary_key=True)
+    workout_exercise_id = db.Column(db.Integer, db.ForeignKey('workout_exercises.id'), nullable=False, index=True)
+    set_number = db.Column(db.Integer, nullable=False)
+    weight_kg = db.Column(db.Float, nullable=True)
+    reps = db.Column(db.Integer, nullable=True)
+    duration_seconds = db.Column(db.Integer, nullable=True)
+    volume = db.Column(db.Float, nullable=True)
+    xp = db.Column(db.Integer, default=0)
+
+    def to_dict(self):
+        data = {}
+        if self.weight_kg is not None:
+            data['weight'] = self.weight_kg
+        if self.reps is not None:
+            data['reps'] = self.reps
+        if self.duration_seconds is not None:
+            data['duration'] = self.duration_seconds
+        data['xp'] = self.xp
+        return data
+
+# ====================================
+# Exercices normalisés
+# ====================================
+
+# Séances converties par transaction par flask migrate-exercises
+MIGRATION_BATCH_SIZE = 500
+
+
+class MigrationCheckpoint(db.Model):
+    """Avancement d'une migration de données reprenable (dernier id traité)"""
+    __tablename__ = 'migration_checkpoints'
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+def _number(value, cast):
+    """Valeur numérique d'une série (None si absente ou invalide)"""
+    try:
+        return cast(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_exercises(exercises):
+    """
+    Exercices au format du client -> [(ligne workout_exercises, [lignes exercise_sets])]
+    Sans workout_id ni workout_exercise_id : ajoutés à l'insertion
+    """
+    normalized = []
+    for order_index, exercise in enumerate(exercises or []):
+        sets = []
+        for set_number, set_data in enumerate(exercise.get('sets') or [], start=1):
+            weight = _number(set_data.get('weight'), float)
+            reps = _number(set_data.get('reps'), int)
+            sets.append({
+                'set_number': set_number,
+                'weight_kg': weight,
+                'reps': reps,
+                'duration_seconds': _number(set_data.get('duration'), int),
+                'volume': weight * reps if weight is not None and reps is not None else None,
+                'xp': _number(set_data.get('xp'), int) or 0
+            })
+
+        normalized.append(({
+            'order_index': order_index,
+            'exercise_key': exercise.get('id'),
+            'name': exercise.get('name'),
+            'category': exercise.get('category'),
+            'exercise_type': exercise.get('type'),
+            'total_sets': len(sets),
+            'total_volume': sum(s['volume'] or 0 for s in sets),
+            'total_xp': sum(s['xp'] for s in sets)
+        }, sets))
+
+    return normalized
+
+
+def insert_exercises(items):
+    """
+    Insère les exercices de plusieurs séances : un INSERT ... RETURNING
+    groupé pour les exercices, un INSERT groupé pour les séries
+    items : [(workout_id, exercices au format du client)]
+    """
+    exercise_rows, sets_by_key = [], {}
+    for workout_id, exercises in items:
+        for exercise_row, sets in normalize_exercises(exercises):
+            exercise_rows.append({**exercise_row, 'workout_id': workout_id})
+            sets_by_key[(workout_id, exercise_row['order_index'])] = sets
+
+    if not exercise_rows:
+        return
+
+    # Ids rattachés par (séance, position) : l'ordre de RETURNING n'est
+    # pas garanti, et l'imposer ferait un INSERT par ligne sous SQLite
+    inserted = db.session.execute(
+        insert(WorkoutExercise).returning(
+            WorkoutExercise.id, WorkoutExercise.workout_id, WorkoutExercise.order_index
+        ),
+        exercise_rows,
+        execution_options={'render_nulls': True}
+    ).all()
+
+    set_rows = [
+        {**set_row, 'workout_exercise_id': exercise_id}
+        for exercise_id, workout_id, order_index in inserted
+        for set_row in sets_by_key[(workout_id, order_index)]
+    ]
+    if set_rows:
+        db.session.execute(insert(ExerciseSet), set_rows, execution_options={'render_nulls': True})
+
+
+# ====================================
+# XP et niveau
+# ====================================
+
+# L'XP d'un utilisateur est la somme de l'XP de ses séances ; elle est tenue
+# à jour par incréments (sync, suppression), flask reconcile-xp corrige une dérive
+
+XP_PER_LEVEL = 100
+
+
+def level_for_xp(total_xp):
+    """Niveau correspondant à une XP totale (même règle que le client)"""
+    return max(1, (total_xp or 0) // XP_PER_LEVEL + 1)
+
+
+def add_user_xp(user, delta):
+    """
+    Ajoute delta (négatif pour une suppression) à l'XP de l'utilisateur et
+    recalcule son niveau : un UPDATE sur la ligne, sans relire ses séances,
+    dans la transaction en cours (sans commit)
+    """
+    total_xp = func.coalesce(User.total_xp, 0) + delta
+    total_xp = case((total_xp < 0, 0), else_=total_xp)
+
+    row = db.session.execute(
+        update(User).where(User.uuid == user.uuid)
+        .values(total_xp=total_xp, level=total_xp // XP_PER_LEVEL + 1)
+        .returning(User.total_xp, User.level),
+        execution_options={'synchronize_session': False}
+    ).one()
+
+    set_committed_value(user, 'total_xp', row.total_xp)
+    set_committed_value(user, 'level', row.level)
+
+
+def reconcile_user_xp(fix=False):
+    """
+    Compare l'XP et le niveau de chaque utilisateur à la somme de ses
+    séances (une requête groupée) ; avec fix, corrige les écarts en un
+    UPDATE groupé. Retourne la liste des écarts trouvés.
+    """
+    workouts_xp = (
+        select(Workout.user_uuid, func.sum(Workout.total_xp).label('total_xp'))
+        .group_by(Workout.user_uuid)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(User.uuid, User.username, User.total_xp, User.level,
+               func.coalesce(workouts_xp.c.total_xp, 0))
+        .outerjoin(workouts_xp, workouts_xp.c.user_uuid == User.uuid)
+        .order_by(User.created_at)
+    ).all()
+
+    drifts = [
+        {
+            'uuid': user_uuid,
+            'username': username,
+            'total_xp': total_xp,
+            'level': level,
+            'expected_total_xp': expected,
+            'expected_level': level_for_xp(expected)
+        }
+        for user_uuid, username, total_xp, level, expected in rows
+        if total_xp != expected or level != level_for_xp(expected)
+    ]
+
+    if fix and drifts:
+        db.session.execute(update(User), [
+            {'uuid': drift['uuid'], 'total_xp': drift['expected_total_xp'], 'level': drift['expected_level']}
+            for drift in drifts
+        ])
+        db.session.commit()
+        for drift in drifts:
+            change_broker.publish(drift['uuid'])
+
+    return drifts
+
+
+# ====================================
+# Séances : déduplication par (user_uuid, start_time)
+# ====================================
+
+# Nombre max de valeurs par clause IN (limite de variables SQLite)
+IN_CHUNK_SIZE = 500
+
+
+def existing_start_times(user_uuid, start_times):
+    """start_time des séances déjà enregistrées parmi celles données (IN par paquets)"""
+    wanted = sorted({t for t in start_times if isinstance(t, int)})
+    found = set()
+
+    for start in range(0, len(wanted), IN_CHUNK_SIZE):
+        chunk = wanted[start:start + IN_CHUNK_SIZE]
+        found.update(db.session.scalars(
+            select(Workout.start_time).where(Workout.user_uuid == user_uuid, Workout.start_time.in_(chunk))
+        ))
+
+    return found
+
+
+# Index unique (user_uuid, start_time) présent en base ; vérifié à chaque
+# sync tant qu'il manque (flask dedupe-workouts le crée serveur lancé)
+workout_unique_index_ready = False
+
+
+def has_workout_unique_index():
+    global workout_unique_index_ready
+    if not workout_unique_index_ready:
+        indexes = inspect(db.session.connection()).get_indexes('workouts')
+        workout_unique_index_ready = any(i['name'] == 'uq_workouts_user_start_time' for i in indexes)
+    return workout_unique_index_ready
+
+
+def insert_new_workouts(rows):
+    """
+    INSERT ... ON CONFLICT DO NOTHING groupé : une séance déjà présente
+    (sync concurrente d'un autre appareil) est ignorée sans erreur
+    Sans l'index unique (doublons pas encore supprimés), ON CONFLICT est
+    impossible : INSERT simple, les séances connues ayant déjà été écartées
+    par existing_start_times
+    Retourne [(id, start_time)] des séances réellement insérées
+    """
+    if not rows:
+        return []
+
+    if not has_workout_unique_index():
+        statement = insert(Workout).returning(Workout.id, Workout.start_time)
+        return [tuple(row) for row in db.session.execute(statement, rows, execution_options={'render_nulls': True})]
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(Workout).on_conflict_do_nothing(
+        index_elements=['user_uuid', 'start_time']
+    ).returning(Workout.id, Workout.start_time)
+
+    return [tuple(row) for row in db.session.execute(statement, rows, execution_options={'render_nulls': True})]
+
+
+def ensure_workout_indexes():
+    """
+    Crée les index de la table workouts sur une base existante (create_all
+    ne modifie pas une table déjà créée) ; l'index unique (user_uuid,
+    start_time) est impossible tant que des doublons existent :
+    flask dedupe-workouts les supprime
+    """
+    for index in Workout.__table__.indexes:
+        try:
+            index.create(db.engine, checkfirst=True)
+        except exc.IntegrityError:
+            print('⚠️ Séances en double : lancer "flask --app app dedupe-workouts" pour créer l\'index unique'
+                  ' (en attendant, les syncs insèrent sans ON CONFLICT)')
+
+
+def dedupe_workouts():
+    """
+    Supprime les séances en double (même user_uuid et start_time), en
+    gardant la plus ancienne, et retire leur XP aux utilisateurs touchés
+    """
+    keep = select(func.min(Workout.id)).group_by(Workout.user_uuid, Workout.start_time)
+    duplicates = Workout.query.filter(Workout.id.notin_(keep)).all()
+
+    users = {}
+    for workout in duplicates:
+        users[workout.user_uuid] = users.get(workout.user_uuid, 0) + (workout.total_xp or 0)
+        db.session.delete(workout)  # Exercices et séries en cascade
+    db.session.flush()
+
+    for user in User.query.filter(User.uuid.in_(users)):
+        add_user_xp(user, -users[user.uuid])
+
+    db.session.commit()
+    return len(duplicates)
+
+
+# ====================================
+# Historique : pages et résumés
+# ====================================
+
+# Séances par page de GET /api/workouts
+WORKOUTS_PAGE_SIZE = 50
+WORKOUTS_MAX_PAGE_SIZE = 200
+
+# Exercices nommés sur une carte de l'historique
+SUMMARY_PREVIEW_EXERCISES = 3
+
+
+def summarize_workouts(workouts):
+    """
+    Résumés des séances d'une page, sans charger exercises_json : compteurs et
+    premiers exercices depuis workout_exercises (deux requêtes par page)
+    Une séance pas encore migrée (flask migrate-exercises) a des compteurs à null.
+    """
+    ids = [w.id for w in workouts]
+    counts, previews = {}, {}
+
+    if ids:
+        migrated = db.or_(Workout.exercises_json.is_(None), Workout.exercises_json.in_(('', '[]')))
+        counts = {
+            workout_id: (exercise_count, set_count) if is_migrated else (None, None)
+            for workout_id, exercise_count, set_count, is_migrated in db.session.execute(
+                select(
+                    Workout.id,
+                    func.count(WorkoutExercise.id),
+                    func.coalesce(func.sum(WorkoutExercise.total_sets), 0),
+                    migrated
+                )
+                .outerjoin(WorkoutExercise, WorkoutExercise.workout_id == Workout.id)
+                .where(Workout.id.in_(ids))
+                .group_by(Workout.id)
+            )
+        }
+        for workout_id, name, category in db.session.execute(
+            select(WorkoutExercise.workout_id, WorkoutExercise.name, WorkoutExercise.category)
+            .where(WorkoutExercise.workout_id.in_(ids), WorkoutExercise.order_index < SUMMARY_PREVIEW_EXERCISES)
+            .order_by(WorkoutExercise.workout_id, WorkoutExercise.order_index)
+        ):
+            previews.setdefault(workout_id, []).append({'name': name, 'category': category})
+
+    summaries = []
+    for workout in workouts:
+        exercise_count, set_count = counts[workout.id]
+        summaries.append({
+            'id': workout.id,
+            'date': workout.date.isoformat(),
+            'startTime': workout.start_time,
+            'endTime': workout.end_time,
+            'duration': workout.duration,
+            'totalXP': workout.total_xp,
+            'exerciseCount': exercise_count,
+            'setCount': set_count,
+            'exercisesPreview': previews.get(workout.id, [])
+        })
+
+    return summaries
+
+
+def migrate_exercises_json(batch_size=MIGRATION_BATCH_SIZE, reset=False):
+    """
+    Convertit les exercices JSON des séances existantes en lignes normalisées
+    - par paquets d'ids croissants (pagination par clé), lus avec yield_per :
+      jamais plus d'un paquet de JSON en mémoire
+    - un paquet = une transaction : lignes insérées, JSON remplacé par '[]',
+      point de reprise (migration_checkpoints) avancé
+    Reprenable après interruption, utilisable sur une base en service : les
+    séances non migrées restent lues depuis leur JSON en attendant.
+    """
+    checkpoint = db.session.get(MigrationCheckpoint, 'exercises_json')
+    if checkpoint is None:
+        checkpoint = MigrationCheckpoint(name='exercises_json', last_id=0)
+        db.session.add(checkpoint)
+    if reset:
+        checkpoint.last_id = 0
+    db.session.commit()
+
+    summary = {'workouts': 0, 'errors': 0, 'batches': 0}
+
+    while True:
+        rows = db.session.execute(
+            select(Workout.id, Workout.exercises_json)
+            .where(Workout.id > checkpoint.last_id, Workout.exercises_json.notin_(('', '[]')))
+            .order_by(Workout.id)
+            .limit(batch_size)
+            .execution_options(yield_per=100)
+        )
+
+        items, last_id = [], None
+        for workout_id, exercises_json in rows:
+            last_id = workout_id
+            try:
+                items.append((workout_id, json.loads(exercises_json)))
+            except ValueError:
+                summary['errors'] += 1  # JSON illisible : laissé tel quel
+
+        if last_id is None:
+            break
+
+        insert_exercises(items)
+        migrated_ids = [workout_id for workout_id, _ in items]
+        if migrated_ids:
+            db.session.execute(
+                update(Workout).where(Workout.id.in_(migrated_ids)).values(exercises_json='[]'),
+                execution_options={'synchronize_session': False}
+            )
+
+        checkpoint.last_id = last_id
+        checkpoint.updated_at = datetime.now(timezone.utc)
+        db.session.commit()
+
+        summary['workouts'] += len(migrated_ids)
+        summary['batches'] += 1
+
+    return summary
+
 # ====================================
 # Utilitaires JWT
 # ====================================
@@ -96,15 +574,198 @@ def generate_token(user_uuid):
     return jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
 
 def verify_token(token):
-    """Vérifier un token JWT"""
+    """Vérifier un token JWT (un ticket de flux n'en est pas un)"""
     try:
         payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+        if payload.get('purpose'):
+            return None
         return payload['user_uuid']
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
 
+def token_from_request():
+    """Token du header Authorization (jamais de l'URL : journaux, historique)"""
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
+
+def generate_stream_ticket(user_uuid):
+    """
+    Ticket d'ouverture du flux SSE : EventSource ne peut pas envoyer de
+    header, le ticket passe donc dans l'URL ; valable EVENTS_TICKET_SECONDS
+    et uniquement pour /api/sync/events
+    """
+    payload = {
+        'user_uuid': user_uuid,
+        'purpose': 'events',
+        'exp': datetime.now(timezone.utc) + timedelta(seconds=EVENTS_TICKET_SECONDS)
+    }
+    return jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
+
+def verify_stream_ticket(ticket):
+    """Vérifier un ticket de flux ; retourne l'UUID de l'utilisateur"""
+    try:
+        payload = jwt.decode(ticket, app.config['SECRET_KEY'], algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None
+    if payload.get('purpose') != 'events':
+        return None
+    return payload['user_uuid']
+
+# ====================================
+# Flux de changements (pub/sub)
+# ====================================
+#
+# Chaque écriture (séances, profil) incrémente la version des données de
+# l'utilisateur et la publie ; les onglets ouverts l'écoutent sur
+# /api/sync/events au lieu d'interroger l'API toutes les 30 secondes.
+# memory:// convient à un seul processus ; plusieurs processus doivent
+# partager un serveur Redis (ou compatible) : CHANGE_BROKER_URL=redis://...
+
+class LocalChangeBroker:
+    """Pub/sub en mémoire : une file par abonné, versions propres au processus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._subscribers = {}
+
+    def current_version(self, user_uuid):
+        with self._lock:
+            return self._versions.get(user_uuid, 0)
+
+    def publish(self, user_uuid, origin=None):
+        with self._lock:
+            version = self._versions.get(user_uuid, 0) + 1
+            self._versions[user_uuid] = version
+            for subscriber in self._subscribers.get(user_uuid, ()):
+                subscriber.put({'version': version, 'origin': origin})
+        return version
+
+    def subscribe(self, user_uuid):
+        return LocalSubscription(self, user_uuid)
+
+    def _add(self, user_uuid, subscriber):
+        with self._lock:
+            self._subscribers.setdefault(user_uuid, set()).add(subscriber)
+
+    def _remove(self, user_uuid, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(user_uuid, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(user_uuid, None)
+
+
+class LocalSubscription:
+    def __init__(self, broker, user_uuid):
+        self.broker = broker
+        self.user_uuid = user_uuid
+        self._queue = queue.Queue()
+        broker._add(user_uuid, self._queue)
+
+    def get(self, timeout):
+        """Prochain changement, ou None après timeout secondes"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker._remove(self.user_uuid, self._queue)
+
+
+class RedisChangeBroker:
+    """
+    Pub/sub Redis (ou compatible) partagé entre processus : version par
+    INCR, notification par PUBLISH sur un canal par utilisateur
+    """
+
+    def __init__(self, client, prefix='fitnessrpg:v2:'):
+        self.client = client
+        self.prefix = prefix
+
+    def current_version(self, user_uuid):
+        return int(self.client.get(f'{self.prefix}version:{user_uuid}') or 0)
+
+    def publish(self, user_uuid, origin=None):
+        version = self.client.incr(f'{self.prefix}version:{user_uuid}')
+        self.client.publish(
+            f'{self.prefix}changes:{user_uuid}',
+            json.dumps({'version': version, 'origin': origin})
+        )
+        return version
+
+    def subscribe(self, user_uuid):
+        return RedisSubscription(self.client, f'{self.prefix}changes:{user_uuid}')
+
+
+class RedisSubscription:
+    def __init__(self, client, channel):
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(channel)
+
+    def get(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = self._pubsub.get_message(timeout=remaining)
+            if message and message['type'] == 'message':
+                return json.loads(message['data'])
+
+    def close(self):
+        self._pubsub.close()
+
+
+def create_change_broker(url):
+    """Pub/sub selon CHANGE_BROKER_URL (memory:// ou redis://, rediss://)"""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('Le paquet redis est requis pour CHANGE_BROKER_URL=redis://...')
+        return RedisChangeBroker(redis.Redis.from_url(url, decode_responses=True))
+    if url in ('', 'memory://'):
+        return LocalChangeBroker()
+    raise ValueError(f'CHANGE_BROKER_URL non supportée : {url}')
+
+
+change_broker = create_change_broker(os.environ.get('CHANGE_BROKER_URL', 'memory://'))
+
+# Battement envoyé sur une connexion SSE inactive (proxies, détection de coupure)
+EVENTS_HEARTBEAT_SECONDS = 25
+# Durée max d'une connexion SSE : EventSource se reconnecte seul
+EVENTS_STREAM_SECONDS = 300
+# Attente max d'une requête long-poll
+EVENTS_LONG_POLL_SECONDS = 25
+# Validité d'un ticket d'ouverture du flux SSE (?ticket=)
+EVENTS_TICKET_SECONDS = 60
+
+
+def publish_change(user_uuid, changed=True):
+    """
+    Annonce une écriture validée aux autres appareils ; retourne la version
+    (la version courante si rien n'a changé). Appelée après le commit : un
+    broker indisponible n'annule pas l'écriture, l'erreur est journalisée
+    et la version courante renvoyée, à défaut None.
+    """
+    try:
+        if changed:
+            return change_broker.publish(user_uuid, origin=request.headers.get('X-Client-Id'))
+        return change_broker.current_version(user_uuid)
+    except Exception as e:
+        print(f"⚠️ Publication du changement impossible: {e}")
+
+    try:
+        return change_broker.current_version(user_uuid)
+    except Exception:
+        return None
+
 # ====================================
 # Routes d'authentification
 # ====================================
@@ -189,6 +850,11 @@ def login():
     except VerifyMismatchError:
         return jsonify({'error': 'Nom d\'utilisateur ou mot de passe incorrect'}), 401
 
+    # Paramètres Argon2 changés depuis le hachage : rehacher
+    if ph.check_needs_rehash(user.password_hash):
+        user.password_hash = ph.hash(password)
+        db.session.commit()
+
     # Générer le token
     token = generate_token(user.uuid)
 
@@ -267,145 +933,365 @@ def require_auth(f):
 @app.route('/api/sync/profile', methods=['POST'])
 @require_auth
 def sync_profile(user):
-    """Synchroniser le profil (niveau et XP)"""
-    data = request.get_json()
-
-    level = data.get('level')
-    total_xp = data.get('totalXP')
-
-    if level is not None and level > user.level:
+    """
+    Synchroniser le profil (niveau et XP)
+    L'XP est celle des séances synchronisées, tenue à jour par le serveur :
+    les valeurs du client ne sont plus reprises (un appareil en retard
+    rétablissait l'XP d'une séance supprimée), seul un niveau incohérent
+    avec l'XP est corrigé
+    """
+    level = level_for_xp(user.total_xp)
+    if user.level != level:
         user.level = level
 
-    if total_xp is not None and total_xp > user.total_xp:
-        user.total_xp = total_xp
+    changed = bool(db.session.dirty)
 
     try:
         db.session.commit()
-        return jsonify({
-            'message': 'Profil synchronisé',
-            'user': user.to_dict()
-        }), 200
     except Exception as e:
         db.session.rollback()
         print(f"❌ Erreur sync profil: {e}")
         return jsonify({'error': 'Erreur lors de la synchronisation'}), 500
 
+    return jsonify({
+        'message': 'Profil synchronisé',
+        'user': user.to_dict(),
+        'version': publish_change(user.uuid, changed)
+    }), 200
+
 
 @app.route('/api/sync/workouts', methods=['POST'])
 @require_auth
 def sync_workouts(user):
     """Synchroniser les workouts locaux vers le serveur"""
-    import json
     from dateutil import parser
 
     data = request.get_json()
     workouts = data.get('workouts', [])
 
-    synced_count = 0
     errors = []
+    rows = []
+    exercises_by_start = {}
+
+    # Séances déjà connues : une requête IN pour tout le lot (index unique)
+    existing = existing_start_times(user.uuid, [w.get('startTime') for w in workouts])
 
     for workout_data in workouts:
         try:
-            # Vérifier si le workout existe déjà (par ID local ou date exacte)
-            existing = Workout.query.filter_by(
-                user_uuid=user.uuid,
-                start_time=workout_data.get('startTime')
-            ).first()
-
-            if existing:
-                continue  # Déjà synchronisé
-
-            # Créer le nouveau workout
-            new_workout = Workout(
-                user_uuid=user.uuid,
-                date=parser.parse(workout_data['date']),
-                start_time=workout_data['startTime'],
-                end_time=workout_data.get('endTime'),
-                duration=workout_data.get('duration'),
-                total_xp=workout_data.get('totalXP', 0),
-                exercises_json=json.dumps(workout_data.get('exercises', []))
-            )
-
-            db.session.add(new_workout)
-            synced_count += 1
+            start_time = workout_data['startTime']
+            if start_time in existing or start_time in exercises_by_start:
+                continue  # Déjà synchronisé (ou en double dans le lot)
+
+            rows.append({
+                'user_uuid': user.uuid,
+                'date': parser.parse(workout_data['date']),
+                'start_time': start_time,
+                'end_time': workout_data.get('endTime'),
+                'duration': workout_data.get('duration'),
+                'total_xp': workout_data.get('totalXP', 0)
+            })
+            exercises_by_start[start_time] = workout_data.get('exercises', [])
 
         except Exception as e:
             errors.append(str(e))
             print(f"❌ Erreur sync workout: {e}")
 
     try:
+        # Une sync concurrente a pu insérer les mêmes séances entre-temps :
+        # seules les lignes réellement insérées sont comptées
+        inserted = insert_new_workouts(rows)
+        synced_count = len(inserted)
+
+        # Exercices et séries de toutes les nouvelles séances en deux INSERT
+        insert_exercises([(workout_id, exercises_by_start[start_time]) for workout_id, start_time in inserted])
+
+        # XP des seules séances insérées, dans la même transaction
+        xp_by_start = {row['start_time']: row['total_xp'] or 0 for row in rows}
+        if inserted:
+            add_user_xp(user, sum(xp_by_start[start_time] for _, start_time in inserted))
         db.session.commit()
 
-        # Recalculer l'XP total de l'utilisateur
-        total_xp = db.session.query(db.func.sum(Workout.total_xp)).filter_by(user_uuid=user.uuid).scalar() or 0
-        user.total_xp = total_xp
-        user.level = max(1, total_xp // 100 + 1)
-        db.session.commit()
-
-        return jsonify({
-            'message': f'{synced_count} séances synchronisées',
-            'synced_count': synced_count,
-            'errors': errors,
-            'user': user.to_dict()
-        }), 200
-
     except Exception as e:
         db.session.rollback()
         print(f"❌ Erreur commit sync: {e}")
         return jsonify({'error': 'Erreur lors de la synchronisation'}), 500
 
+    return jsonify({
+        'message': f'{synced_count} séances synchronisées',
+        'synced_count': synced_count,
+        'errors': errors,
+        'user': user.to_dict(),
+        'version': publish_change(user.uuid, synced_count > 0)
+    }), 200
+
 
 @app.route('/api/workouts', methods=['GET'])
 @require_auth
 def get_workouts(user):
-    """Récupérer tous les workouts d'un utilisateur"""
-    workouts = Workout.query.filter_by(user_uuid=user.uuid).order_by(Workout.date.desc()).all()
+    """
+    Séances de l'utilisateur, de la plus récente à la plus ancienne
+    Sans paramètre : toutes les séances au format complet (anciens clients).
+    Par page dès qu'un paramètre est présent :
+    - ?limit= (50 par défaut, 200 max)
+    - ?before=<date>&before_id=<id> : page suivante (next_before / next_before_id
+      de la page précédente, toujours ensemble)
+    - ?fields=summary : cartes de l'historique (compteurs, 3 premiers exercices)
+      calculées en SQL ; ?fields=full (défaut) : exercices et séries complets
+    """
+    paginated = any(name in request.args for name in ('fields', 'limit', 'before', 'before_id'))
+
+    fields = request.args.get('fields', 'full')
+    if fields not in ('summary', 'full'):
+        return jsonify({'error': 'fields doit valoir summary ou full'}), 400
 
+    try:
+        limit = min(max(int(request.args.get('limit', WORKOUTS_PAGE_SIZE)), 1), WORKOUTS_MAX_PAGE_SIZE)
+        before = _parse_cursor_date(request.args.get('before'))
+        before_id = request.args.get('before_id')
+        before_id = int(before_id) if before_id is not None else None
+    except ValueError:
+        return jsonify({'error': 'Paramètre de pagination invalide'}), 400
+
+    # Curseur complet : la date seule sauterait ou répéterait les séances du même jour
+    if (before is None) != (before_id is None):
+        return jsonify({'error': 'before et before_id vont ensemble'}), 400
+
+    query = select(Workout).where(Workout.user_uuid == user.uuid)
+    if before is not None:
+        query = query.where(db.or_(
+            Workout.date < before,
+            db.and_(Workout.date == before, Workout.id < before_id)
+        ))
+    query = query.order_by(Workout.date.desc(), Workout.id.desc())
+    if paginated:
+        query = query.limit(limit + 1)
+
+    if fields == 'full':
+        query = query.options(selectinload(Workout.exercises).selectinload(WorkoutExercise.sets))
+    else:
+        query = query.options(defer(Workout.exercises_json))
+
+    workouts = db.session.scalars(query).all()
+    has_more = paginated and len(workouts) > limit
+    if has_more:
+        workouts = workouts[:limit]
+
+    if fields == 'full':
+        items = [w.to_dict() for w in workouts]
+    else:
+        items = summarize_workouts(workouts)
+
+    last = workouts[-1] if has_more else None
     return jsonify({
-        'workouts': [w.to_dict() for w in workouts]
+        'workouts': items,
+        'fields': fields,
+        'next_before': last.date.isoformat() if last else None,
+        'next_before_id': last.id if last else None
     }), 200
 
 
-@app.route('/api/workouts/<int:workout_id>', methods=['DELETE'])
+@app.route('/api/workouts/<int:workout_id>', methods=['GET'])
 @require_auth
-def delete_workout(user, workout_id):
-    """Supprimer un workout par ID ou startTime"""
-    # Essayer de trouver par ID d'abord
-    workout = Workout.query.filter_by(id=workout_id, user_uuid=user.uuid).first()
+def get_workout(user, workout_id):
+    """Détail complet d'une séance, par ID ou startTime (comme la suppression)"""
+    options = selectinload(Workout.exercises).selectinload(WorkoutExercise.sets)
+    workout = Workout.query.options(options).filter_by(id=workout_id, user_uuid=user.uuid).first()
 
-    # Si pas trouvé par ID, essayer par start_time (car le frontend utilise startTime)
     if not workout:
-        workout = Workout.query.filter_by(start_time=workout_id, user_uuid=user.uuid).first()
+        workout = Workout.query.options(options).filter_by(start_time=workout_id, user_uuid=user.uuid).first()
 
     if not workout:
         return jsonify({'error': 'Séance non trouvée'}), 404
 
-    try:
-        db.session.delete(workout)
-        db.session.commit()
+    return jsonify({'workout': workout.to_dict()}), 200
 
-        # Recalculer l'XP et le niveau de l'utilisateur après suppression
-        total_xp = db.session.query(db.func.sum(Workout.total_xp)).filter_by(user_uuid=user.uuid).scalar() or 0
-        user.total_xp = total_xp
-        user.level = max(1, total_xp // 100 + 1)
-        db.session.commit()
 
-        return jsonify({
-            'message': 'Séance supprimée',
-            'user': user.to_dict()
-        }), 200
+def _parse_cursor_date(value):
+    """Date du curseur de pagination, en UTC sans fuseau comme en base"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@app.route('/api/workouts/<int:workout_id>', methods=['DELETE'])
+@require_auth
+def delete_workout(user, workout_id):
+    """
+    Supprimer un workout par ID ou startTime (le frontend utilise startTime)
+    Une transaction : séries, exercices et séance supprimés par requêtes
+    directes, XP de la séance retirée à l'utilisateur
+    """
+    # ID d'abord, puis startTime
+    target = db.session.execute(
+        select(Workout.id)
+        .where(Workout.user_uuid == user.uuid,
+               db.or_(Workout.id == workout_id, Workout.start_time == workout_id))
+        .order_by(case((Workout.id == workout_id, 0), else_=1))
+        .limit(1)
+    ).scalar()
+
+    if target is None:
+        return jsonify({'error': 'Séance non trouvée'}), 404
+
+    try:
+        exercise_ids = select(WorkoutExercise.id).where(WorkoutExercise.workout_id == target)
+        db.session.execute(delete(ExerciseSet).where(ExerciseSet.workout_exercise_id.in_(exercise_ids)))
+        db.session.execute(delete(WorkoutExercise).where(WorkoutExercise.workout_id == target))
+
+        # RETURNING : une suppression concurrente de la même séance ne retire l'XP qu'une fois
+        removed = db.session.execute(
+            delete(Workout).where(Workout.id == target).returning(Workout.total_xp)
+        ).first()
+        if removed is None:
+            db.session.rollback()
+            return jsonify({'error': 'Séance non trouvée'}), 404
+
+        add_user_xp(user, -(removed.total_xp or 0))
+        db.session.commit()
 
     except Exception as e:
         db.session.rollback()
         print(f"❌ Erreur suppression workout: {e}")
         return jsonify({'error': 'Erreur lors de la suppression'}), 500
 
+    return jsonify({
+        'message': 'Séance supprimée',
+        'user': user.to_dict(),
+        'version': publish_change(user.uuid)
+    }), 200
+
+@app.route('/api/sync/events/ticket', methods=['POST'])
+@require_auth
+def sync_events_ticket(user):
+    """Ticket de courte durée, réservé à l'ouverture du flux SSE"""
+    return jsonify({
+        'ticket': generate_stream_ticket(user.uuid),
+        'expires_in': EVENTS_TICKET_SECONDS
+    }), 200
+
+
+@app.route('/api/sync/events', methods=['GET'])
+def sync_events():
+    """
+    Flux des changements de l'utilisateur, sans lecture en base (token seul)
+    - Accept: text/event-stream : SSE, un événement "version" à la connexion
+      puis à chaque écriture d'un autre appareil (?client_id=) ; authentifié
+      par ?ticket= (POST /api/sync/events/ticket)
+    - ?since=<version> : long-poll, répond dès que la version diffère,
+      sinon après ?timeout= secondes (25 max) avec changed=false
+    """
+    ticket = request.args.get('ticket')
+    if ticket:
+        user_uuid = verify_stream_ticket(ticket)
+    else:
+        user_uuid = verify_token(token_from_request() or '')
+    if not user_uuid:
+        return jsonify({'error': 'Token invalide ou expiré'}), 401
+
+    client_id = request.args.get('client_id')
+
+    if 'text/event-stream' in request.headers.get('Accept', ''):
+        return Response(
+            stream_with_context(_stream_events(user_uuid, client_id)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    try:
+        since = int(request.args.get('since', -1))
+        timeout = min(float(request.args.get('timeout', EVENTS_LONG_POLL_SECONDS)), EVENTS_LONG_POLL_SECONDS)
+    except ValueError:
+        return jsonify({'error': 'Paramètre invalide'}), 400
+
+    # Abonnement avant la lecture de la version : aucun changement perdu
+    subscription = change_broker.subscribe(user_uuid)
+    try:
+        version = change_broker.current_version(user_uuid)
+        deadline = time.monotonic() + timeout
+
+        while version == since:
+            remaining = deadline - time.monotonic()
+            event = subscription.get(remaining) if remaining > 0 else None
+            if event is None:
+                break
+            # Écriture de cet appareil : il la connaît déjà (sans client_id,
+            # aucune écriture n'est la sienne, comme pour le flux SSE)
+            own_write = client_id is not None and event['origin'] == client_id
+            since = event['version'] if own_write else since
+            version = event['version']
+    finally:
+        subscription.close()
+
+    return jsonify({'version': version, 'changed': version != since}), 200
+
+
+def _stream_events(user_uuid, client_id):
+    subscription = change_broker.subscribe(user_uuid)
+    try:
+        yield 'retry: 5000\n'
+        yield _sse('version', {'version': change_broker.current_version(user_uuid)})
+
+        deadline = time.monotonic() + EVENTS_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            event = subscription.get(EVENTS_HEARTBEAT_SECONDS)
+            if event is None:
+                yield ': ping\n\n'
+            elif client_id is None or event['origin'] != client_id:
+                yield _sse('version', {'version': event['version']})
+    finally:
+        subscription.close()
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+# ====================================
+# Commandes CLI
+# ====================================
+
+@app.cli.command('dedupe-workouts')
+def dedupe_workouts_command():
+    """Supprime les séances en double puis crée l'index unique (user_uuid, start_time)"""
+    count = dedupe_workouts()
+    ensure_workout_indexes()
+    click.echo(f'✅ {count} séance(s) en double supprimée(s)')
+
+
+@app.cli.command('reconcile-xp')
+@click.option('--fix', is_flag=True, help='Corriger les écarts trouvés')
+def reconcile_xp_command(fix):
+    """Compare l'XP des utilisateurs à la somme de leurs séances (cron : ajouter --fix)"""
+    drifts = reconcile_user_xp(fix)
+    for drift in drifts:
+        click.echo(
+            f"⚠️ {drift['username']} : {drift['total_xp']} XP / niveau {drift['level']},"
+            f" attendu {drift['expected_total_xp']} XP / niveau {drift['expected_level']}"
+        )
+    status = 'corrigé(s)' if fix else 'trouvé(s)'
+    click.echo(f'✅ {len(drifts)} écart(s) {status}')
+
+
+@app.cli.command('migrate-exercises')
+@click.option('--batch-size', default=MIGRATION_BATCH_SIZE, show_default=True, help='Séances par transaction')
+@click.option('--reset', is_flag=True, help='Repartir du début (ignore le point de reprise)')
+def migrate_exercises_command(batch_size, reset):
+    """Normalise exercises_json en workout_exercises / exercise_sets (reprenable)"""
+    summary = migrate_exercises_json(batch_size, reset)
+    click.echo(
+        f"✅ {summary['workouts']} séance(s) migrée(s) en {summary['batches']} paquet(s),"
+        f" {summary['errors']} JSON illisible(s)"
+    )
+
 # ====================================
 # Initialisation de la DB
 # ====================================
 
 with app.app_context():
     db.create_all()
+    ensure_workout_indexes()
     print('✅ Base de données initialisée')
 
 # ====================================
@@ -4,6 +4,8 @@ Script de test pour l'API de synchronisation
 """
 import requests
 import json
+import threading
+import time
 
 BASE_URL = "http://localhost:5000/api"
 
@@ -160,6 +162,50 @@ def test_sync_profile(token):
         print(f"❌ Erreur : {response.json()}")
         return False
 
+def test_long_poll_without_client_id(token):
+    """Test long-poll sans client_id : les écritures sans X-Client-Id sont signalées"""
+    print("\n⏳ Test long-poll sans client_id...")
+
+    headers = {
+        "Authorization": f"Bearer {token}"
+    }
+
+    since = requests.get(f"{BASE_URL}/sync/events?timeout=0", headers=headers).json()['version']
+    result = {}
+
+    def poll():
+        result['data'] = requests.get(
+            f"{BASE_URL}/sync/events?since={since}&timeout=10",
+            headers=headers
+        ).json()
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    time.sleep(1)
+
+    # Écriture d'un client sans X-Client-Id
+    start_time = int(time.time() * 1000)
+    requests.post(
+        f"{BASE_URL}/sync/workouts",
+        headers={**headers, "Content-Type": "application/json"},
+        json={"workouts": [{
+            "date": "2026-01-15T10:00:00.000Z",
+            "startTime": start_time,
+            "endTime": start_time + 60000,
+            "duration": 60000,
+            "totalXP": 10,
+            "exercises": []
+        }]}
+    )
+    poller.join()
+
+    if result.get('data', {}).get('changed'):
+        print(f"✅ Changement reçu (version {result['data']['version']})")
+        return True
+    else:
+        print(f"❌ Changement non signalé : {result.get('data')}")
+        return False
+
 def main():
     """Fonction principale"""
     print("🚀 Tests API Synchronisation FitnessRPG v2")
@@ -187,6 +233,9 @@ def main():
     # Test synchronisation profil
     test_sync_profile(token)
 
+    # Test long-poll sans client_id
+    test_long_poll_without_client_id(token)
+
     print("\n" + "=" * 50)
     print("✅ Tests terminés")
 
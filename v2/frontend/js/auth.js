@@ -74,6 +74,8 @@ const Auth = {
       // Sauvegarder le token et l'utilisateur
       localStorage.setItem('auth_token', data.token);
       localStorage.removeItem('offline_mode');
+      localStorage.removeItem('sync_version');
+      Sync.dataVersion = null;
 
       // Conserver l'XP local si supérieur à celui du serveur
       const serverXP = data.user.total_xp || 0;
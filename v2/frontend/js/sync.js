@@ -11,6 +11,19 @@ const Sync = {
       : `http://${hostname}:5000/api`;
   })(),
 
+  // Dernière version des données connue (flux /sync/events)
+  dataVersion: localStorage.getItem('sync_version') === null
+    ? null
+    : Number(localStorage.getItem('sync_version')),
+  pendingChange: false,
+  eventSource: null,
+  feedActive: false,
+
+  // Historique : taille des pages, et nombre de séances manquantes au-delà
+  // duquel les pages complètes remplacent les détails un par un
+  workoutsPageSize: 200,
+  maxWorkoutDetails: 50,
+
   /**
    * Obtenir les headers avec le token
    */
@@ -18,7 +31,8 @@ const Sync = {
     const token = localStorage.getItem('auth_token');
     return {
       'Content-Type': 'application/json',
-      'Authorization': token ? `Bearer ${token}` : ''
+      'Authorization': token ? `Bearer ${token}` : '',
+      'X-Client-Id': this.getClientId()
     };
   },
 
@@ -55,6 +69,7 @@ const Sync = {
       }
 
       console.log('✅ Profil synchronisé');
+      this.rememberVersion(data.version);
       return { success: true, data };
 
     } catch (error) {
@@ -95,6 +110,7 @@ const Sync = {
       }
 
       console.log(`✅ ${data.synced_count} workouts synchronisés`);
+      this.rememberVersion(data.version);
 
       // Marquer la dernière sync
       localStorage.setItem('last_sync', new Date().toISOString());
@@ -108,33 +124,79 @@ const Sync = {
   },
 
   /**
-   * Récupérer tous les workouts depuis le serveur
+   * Récupérer les workouts du serveur absents en local
+   * L'historique est parcouru en résumés (sans exercices) ; seules les
+   * séances manquantes sont ensuite téléchargées en détail, ou toutes les
+   * pages complètes s'il en manque beaucoup (premier appareil connecté)
    */
-  async fetchWorkouts() {
+  async fetchWorkouts(knownStartTimes = new Set()) {
     if (!this.canSync()) {
       console.log('⚠️ Fetch workouts ignorée (hors ligne ou non connecté)');
       return { success: false, offline: true };
     }
 
     try {
-      const response = await fetch(`${this.apiUrl}/workouts`, {
-        method: 'GET',
-        headers: this.getHeaders()
-      });
+      const summaries = await this.fetchWorkoutPages('summary');
+      const missing = summaries.filter(w => !knownStartTimes.has(w.startTime));
+
+      let workouts;
+      if (missing.length > this.maxWorkoutDetails) {
+        const all = await this.fetchWorkoutPages('full');
+        workouts = all.filter(w => !knownStartTimes.has(w.startTime));
+      } else {
+        workouts = await Promise.all(missing.map(w => this.fetchWorkout(w.id)));
+      }
+
+      console.log(`✅ ${workouts.length} workouts récupérés (${summaries.length} sur le serveur)`);
+      return { success: true, workouts };
+
+    } catch (error) {
+      console.error('❌ Erreur fetch workouts:', error);
+      return { success: false, error: error.message };
+    }
+  },
 
+  /**
+   * Parcourir toutes les pages de GET /api/workouts
+   */
+  async fetchWorkoutPages(fields) {
+    const workouts = [];
+    let cursor = '';
+
+    while (true) {
+      const response = await fetch(
+        `${this.apiUrl}/workouts?fields=${fields}&limit=${this.workoutsPageSize}${cursor}`,
+        { method: 'GET', headers: this.getHeaders() }
+      );
       const data = await response.json();
 
       if (!response.ok) {
         throw new Error(data.error || 'Erreur fetch workouts');
       }
 
-      console.log(`✅ ${data.workouts.length} workouts récupérés`);
-      return { success: true, workouts: data.workouts };
+      workouts.push(...data.workouts);
+      if (!data.next_before) {
+        return workouts;
+      }
+      cursor = `&before=${encodeURIComponent(data.next_before)}&before_id=${data.next_before_id}`;
+    }
+  },
 
-    } catch (error) {
-      console.error('❌ Erreur fetch workouts:', error);
-      return { success: false, error: error.message };
+  /**
+   * Détail complet d'un workout
+   */
+  async fetchWorkout(workoutId) {
+    const response = await fetch(`${this.apiUrl}/workouts/${workoutId}`, {
+      method: 'GET',
+      headers: this.getHeaders()
+    });
+    const data = await response.json();
+
+    if (!response.ok) {
+      throw new Error(data.error || 'Erreur fetch workout');
     }
+
+    return data.workout;
   },
 
   /**
@@ -156,13 +218,12 @@ const Sync = {
         throw new Error('Échec sync workouts');
       }
 
-      // 2. Récupérer tous les workouts depuis le serveur
-      const fetchResult = await this.fetchWorkouts();
+      // 2. Récupérer les workouts du serveur absents en local
+      const localWorkouts = await Storage.getAll('workouts');
+      const localWorkoutIds = new Set(localWorkouts.map(w => w.startTime));
+      const fetchResult = await this.fetchWorkouts(localWorkoutIds);
 
       if (fetchResult.success && fetchResult.workouts) {
-        // Récupérer les workouts locaux
-        const localWorkouts = await Storage.getAll('workouts');
-        const localWorkoutIds = new Set(localWorkouts.map(w => w.startTime));
 
         // Fusionner : ajouter les workouts du serveur qui ne sont pas en local
         for (const serverWorkout of fetchResult.workouts) {
@@ -244,6 +305,7 @@ const Sync = {
       }
 
       console.log(`✅ Workout supprimé du serveur`);
+      this.rememberVersion(data.version);
       return { success: true, data };
 
     } catch (error) {
@@ -272,8 +334,10 @@ const Sync = {
   },
 
   /**
-   * Synchronisation périodique en arrière-plan
-   * Se déclenche toutes les 30 secondes si la page est visible
+   * Synchronisation en arrière-plan, déclenchée par les changements
+   * Le serveur annonce chaque écriture d'un autre appareil sur
+   * /api/sync/events (SSE, ou long-poll sans EventSource) : un onglet
+   * inactif ne fait plus d'appels toutes les 30 secondes
    */
   startPeriodicSync() {
     // Arrêter toute sync existante
@@ -282,19 +346,18 @@ const Sync = {
     // Synchroniser immédiatement
     this.autoSync();
 
-    // Puis toutes les 30 secondes
-    this.syncInterval = setInterval(() => {
-      // Synchroniser seulement si la page est visible
-      if (!document.hidden && this.canSync()) {
-        console.log('🔄 Sync périodique...');
-        this.syncAll();
-      }
-    }, 30000); // 30 secondes
+    this.feedActive = true;
+    if (typeof EventSource !== 'undefined') {
+      this.openEventSource();
+    } else {
+      this.longPoll();
+    }
 
-    // Synchroniser quand la page redevient visible
+    // Changement reçu pendant que la page était cachée : sync au retour
     this.visibilityHandler = () => {
-      if (!document.hidden && this.canSync()) {
+      if (!document.hidden && this.pendingChange && this.canSync()) {
         console.log('🔄 Page visible - sync...');
+        this.pendingChange = false;
         this.syncAll();
       }
     };
@@ -302,16 +365,143 @@ const Sync = {
   },
 
   /**
-   * Arrêter la synchronisation périodique
+   * Arrêter la synchronisation en arrière-plan
    */
   stopPeriodicSync() {
-    if (this.syncInterval) {
-      clearInterval(this.syncInterval);
-      this.syncInterval = null;
+    this.feedActive = false;
+    if (this.eventSource) {
+      this.eventSource.close();
+      this.eventSource = null;
     }
     if (this.visibilityHandler) {
       document.removeEventListener('visibilitychange', this.visibilityHandler);
       this.visibilityHandler = null;
     }
+  },
+
+  /**
+   * Flux SSE, ouvert avec un ticket de courte durée (le token ne passe
+   * jamais dans l'URL). EventSource se reconnecte seul ; quand il abandonne
+   * (ticket expiré à la reconnexion), un nouveau ticket est demandé. Flux
+   * jamais ouvert (serveur sans SSE), on passe au long-poll.
+   */
+  async openEventSource() {
+    let ticket;
+    try {
+      const response = await fetch(`${this.apiUrl}/sync/events/ticket`, {
+        method: 'POST',
+        headers: this.getHeaders()
+      });
+      if (response.status === 401) {
+        return;
+      }
+      if (!response.ok) {
+        throw new Error(`Erreur HTTP: ${response.status}`);
+      }
+      ticket = (await response.json()).ticket;
+    } catch (error) {
+      console.error('❌ Erreur ticket du flux:', error);
+      this.longPoll();
+      return;
+    }
+
+    if (!this.feedActive) {
+      return;
+    }
+
+    const url = `${this.apiUrl}/sync/events?client_id=${this.getClientId()}&ticket=${encodeURIComponent(ticket)}`;
+    const eventSource = new EventSource(url);
+    let opened = false;
+
+    this.eventSource = eventSource;
+    eventSource.onopen = () => {
+      opened = true;
+    };
+    eventSource.addEventListener('version', (event) => {
+      this.handleVersion(JSON.parse(event.data).version);
+    });
+    eventSource.onerror = () => {
+      if (this.eventSource !== eventSource || eventSource.readyState !== EventSource.CLOSED) {
+        return;
+      }
+      this.eventSource = null;
+      if (!this.feedActive) {
+        return;
+      }
+      if (opened) {
+        this.openEventSource();
+      } else {
+        this.longPoll();
+      }
+    };
+  },
+
+  /**
+   * Long-poll : chaque requête attend jusqu'à 25 s un changement
+   */
+  async longPoll() {
+    while (this.feedActive && this.canSync()) {
+      try {
+        const since = this.dataVersion === null ? -1 : this.dataVersion;
+        const response = await fetch(
+          `${this.apiUrl}/sync/events?since=${since}&client_id=${this.getClientId()}`,
+          { headers: this.getHeaders() }
+        );
+
+        if (response.status === 401) {
+          return;
+        }
+        if (!response.ok) {
+          throw new Error(`Erreur HTTP: ${response.status}`);
+        }
+
+        const data = await response.json();
+        this.handleVersion(data.version);
+
+      } catch (error) {
+        console.error('❌ Erreur flux de changements:', error);
+        await new Promise(resolve => setTimeout(resolve, 5000));
+      }
+    }
+  },
+
+  /**
+   * Version des données annoncée par le serveur : synchroniser si elle a changé
+   */
+  handleVersion(version) {
+    const previous = this.dataVersion;
+    this.rememberVersion(version);
+
+    // Première version connue : autoSync() s'occupe de l'état initial
+    if (previous === null || previous === version) {
+      return;
+    }
+
+    if (document.hidden) {
+      this.pendingChange = true;
+      return;
+    }
+
+    console.log('🔄 Changement sur un autre appareil - sync...');
+    this.syncAll();
+  },
+
+  rememberVersion(version) {
+    if (version === undefined || version === null) return;
+    this.dataVersion = version;
+    localStorage.setItem('sync_version', String(version));
+  },
+
+  /**
+   * Identifiant de l'onglet, envoyé avec les écritures (X-Client-Id) :
+   * le serveur ne lui renvoie pas ses propres changements
+   */
+  getClientId() {
+    let clientId = sessionStorage.getItem('sync_client_id');
+    if (!clientId) {
+      clientId = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+      sessionStorage.setItem('sync_client_id', clientId);
+    }
+    return clientId;
   }
 };
@@ -2,7 +2,7 @@
  * Service Worker - Cache basique pour PWA
  */
 
-const CACHE_NAME = 'fitnessrpg-v2.9';
+const CACHE_NAME = 'fitnessrpg-v2.10';
 const URLS_TO_CACHE = [
   '/',
   '/index.html',
@@ -45,6 +45,11 @@ self.addEventListener('activate', (event) => {
 
 // Fetch - Network First, fallback to Cache
 self.addEventListener('fetch', (event) => {
+  // Flux de changements (SSE / long-poll) : jamais mis en cache
+  if (new URL(event.request.url).pathname.startsWith('/api/sync/events')) {
+    return;
+  }
+
   event.respondWith(
     fetch(event.request)
       .then(response => {